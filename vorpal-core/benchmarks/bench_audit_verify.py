@@ -0,0 +1,102 @@
+"""Benchmark audit chain verification inline vs. across worker processes.
+
+Usage:
+    python benchmarks/bench_audit_verify.py [--events 200000] [--chunk-size 5000]
+
+Builds synthetic hash chains in memory (no database) and reports
+verification throughput for each worker count up to the number of cores.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+from datetime import UTC, datetime, timedelta
+
+from vorpal.core.engine.audit_verify import (
+    ChainEvent,
+    ChainVerifier,
+    VerificationExecutor,
+    event_hash,
+)
+
+EVENT_TYPES = ["system.updated", "policy.evaluated", "control.updated", "auth.login"]
+
+
+def make_events(rng: random.Random, count: int, chains: int) -> list[ChainEvent]:
+    events = []
+    start = datetime(2026, 1, 1, tzinfo=UTC)
+    per_chain = count // chains
+    for c in range(chains):
+        chain_id = f"{c:08d}-0000-4000-8000-000000000000"
+        previous_hash = None
+        for sequence in range(1, per_chain + 1):
+            event = ChainEvent(
+                id=f"{c:08d}-{sequence:04x}-4000-8000-{rng.getrandbits(48):012x}",
+                chain_id=chain_id,
+                sequence=sequence,
+                event_type=rng.choice(EVENT_TYPES),
+                action="evaluate",
+                actor_id=f"agent-{rng.randint(1, 50)}",
+                resource_type="policy",
+                resource_id=f"policy-{rng.randint(1, 200)}",
+                details={"allowed": rng.random() < 0.9, "latency_ms": rng.random() * 10},
+                timestamp=start + timedelta(microseconds=sequence * 1000),
+                previous_hash=previous_hash,
+                event_hash="",
+            )
+            event = event._replace(event_hash=event_hash(event))
+            events.append(event)
+            previous_hash = event.event_hash
+    return events
+
+
+async def run(executor: VerificationExecutor, events: list[ChainEvent]) -> float:
+    async def chunks():
+        for start in range(0, len(events), executor.chunk_size):
+            yield events[start : start + executor.chunk_size]
+
+    async for _ in executor.verify(chunks(), ChainVerifier()):  # start workers
+        break
+    verifier = ChainVerifier()
+    started = time.perf_counter()
+    async for _ in executor.verify(chunks(), verifier):
+        pass
+    elapsed = time.perf_counter() - started
+    assert verifier.verified and verifier.total_events == len(events)
+    return elapsed
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--chains", type=int, default=100)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    args = parser.parse_args()
+
+    events = make_events(random.Random(42), args.events, args.chains)
+
+    cores = os.cpu_count() or 1
+    counts = [0] + [n for n in (1, 2, 4, 8, 16, 32, 64) if n <= cores]
+    if cores not in counts:
+        counts.append(cores)
+
+    baseline = None
+    print(f"{len(events)} events in {args.chains} chains, chunk size {args.chunk_size}")
+    print(f"{'workers':>8} {'seconds':>9} {'events/s':>10} {'speedup':>8}")
+    for workers in counts:
+        executor = VerificationExecutor(workers=workers, chunk_size=args.chunk_size)
+        try:
+            elapsed = await run(executor, events)
+        finally:
+            executor.shutdown()
+        baseline = baseline or elapsed
+        label = "inline" if workers == 0 else str(workers)
+        print(
+            f"{label:>8} {elapsed:>9.3f} {len(events) / elapsed:>10.0f} {baseline / elapsed:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
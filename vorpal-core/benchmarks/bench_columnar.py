@@ -0,0 +1,81 @@
+"""Benchmark columnar vs. per-row evaluation of simple rules over a fleet.
+
+Usage:
+    python benchmarks/bench_columnar.py [--systems 100000] [--policies 50]
+"""
+
+import argparse
+import random
+import time
+
+from vorpal.core.engine.evaluator import EvaluationMode, evaluate
+from vorpal.core.engine.executor import evaluate_columnar
+from vorpal.core.engine.snapshot import build_snapshot, compile_definition
+from vorpal.core.models.policy import PolicySeverity
+
+TIERS = ["prohibited", "high", "limited", "minimal"]
+TYPES = ["model", "application", "agent", "pipeline"]
+STATUSES = ["draft", "pending_review", "approved", "deployed"]
+
+RULES = [
+    "system.autonomy_level <= 3",
+    "system.risk_tier in ['high', 'limited'] && system.status != 'draft'",
+    "system.status == 'approved' || system.autonomy_level < 2",
+    "!(system.type == 'agent') || system.autonomy_level <= 2",
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--systems", type=int, default=100_000)
+    parser.add_argument("--policies", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    snapshot = build_snapshot(
+        [
+            compile_definition(
+                f"p{i}",
+                f"p{i}",
+                "1.0.0",
+                {"risk_tier": rng.sample(TIERS, 2)} if rng.random() < 0.5 else {},
+                [{"name": "r", "condition": rng.choice(RULES), "message": "failed"}],
+                PolicySeverity.ERROR,
+            )
+            for i in range(args.policies)
+        ],
+        version=1,
+    )
+    jobs = [
+        (
+            {
+                "id": f"sys-{i}",
+                "type": rng.choice(TYPES),
+                "status": rng.choice(STATUSES),
+                "risk_tier": rng.choice(TIERS),
+                "autonomy_level": rng.choice([None, 1, 2, 3, 4, 5]),
+                "tags": [],
+            },
+            "deploy",
+            {},
+            EvaluationMode.SUMMARY,
+        )
+        for i in range(args.systems)
+    ]
+
+    started = time.perf_counter()
+    per_row = [evaluate(snapshot, *job) for job in jobs]
+    per_row_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    columnar = evaluate_columnar(snapshot, jobs)
+    columnar_seconds = time.perf_counter() - started
+
+    assert [d.allowed for d in columnar] == [d.allowed for d in per_row]
+    print(f"{args.systems} systems x {args.policies} policies")
+    print(f"per-row   {per_row_seconds:8.3f}s")
+    print(f"columnar  {columnar_seconds:8.3f}s  ({per_row_seconds / columnar_seconds:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
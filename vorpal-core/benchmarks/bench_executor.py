@@ -0,0 +1,118 @@
+"""Benchmark bulk policy evaluation inline vs. across worker processes.
+
+Usage:
+    python benchmarks/bench_executor.py [--systems 20000] [--chunk-size 256]
+
+Builds a synthetic policy set and fleet in memory (no database) and
+reports throughput for each worker count up to the number of cores.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+
+from vorpal.core.engine.evaluator import EvaluationMode
+from vorpal.core.engine.executor import EvaluationExecutor
+from vorpal.core.engine.snapshot import build_snapshot, compile_definition
+from vorpal.core.models.policy import PolicySeverity
+
+TIERS = ["prohibited", "high", "limited", "minimal"]
+TYPES = ["model", "application", "agent", "pipeline"]
+TAGS = ["production", "pii", "internal", "beta", "customer-facing"]
+
+RULES = [
+    "system.autonomy_level <= 3",
+    "size(system.tags) > 0 && system.tags.exists(t, t.startsWith('prod'))",
+    "system.metadata.reviewed == true || system.risk_tier != 'high'",
+    "system.controls.all(c, c.status == 'verified' || !c.mandatory)",
+    "system.controls.exists(c, c.id == 'CTRL-BIAS-001' && c.status == 'verified')",
+    "has(system.documentation.model_card) && system.name.matches('^[a-z-]+$')",
+]
+
+
+def make_snapshot(rng: random.Random, policies: int):
+    compiled = []
+    for i in range(policies):
+        criteria = {}
+        if rng.random() < 0.5:
+            criteria["risk_tier"] = rng.sample(TIERS, 2)
+        if rng.random() < 0.3:
+            criteria["type"] = rng.choice(TYPES)
+        rules = [
+            {"name": f"r{j}", "condition": condition, "message": f"rule {j} failed"}
+            for j, condition in enumerate(rng.sample(RULES, 3))
+        ]
+        compiled.append(
+            compile_definition(f"p{i}", f"p{i}", "1.0.0", criteria, rules, PolicySeverity.ERROR)
+        )
+    return build_snapshot(compiled, version=1)
+
+
+def make_system(rng: random.Random, i: int) -> dict:
+    return {
+        "id": f"sys-{i}",
+        "name": f"system-{i}",
+        "type": rng.choice(TYPES),
+        "risk_tier": rng.choice(TIERS),
+        "status": "approved",
+        "autonomy_level": rng.randint(1, 5),
+        "metadata": {"reviewed": rng.random() < 0.5},
+        "documentation": {"model_card": "..."} if rng.random() < 0.7 else {},
+        "tags": rng.sample(TAGS, rng.randint(0, 3)),
+        "controls": [
+            {
+                "id": f"CTRL-BIAS-{n:03d}",
+                "status": rng.choice(["verified", "pending"]),
+                "mandatory": rng.random() < 0.8,
+            }
+            for n in range(1, rng.randint(2, 8))
+        ],
+    }
+
+
+async def run(executor: EvaluationExecutor, snapshot, jobs) -> float:
+    await executor.evaluate(snapshot, jobs[: executor.chunk_size * 2])  # start workers
+    started = time.perf_counter()
+    await executor.evaluate(snapshot, jobs)
+    return time.perf_counter() - started
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--systems", type=int, default=20_000)
+    parser.add_argument("--policies", type=int, default=100)
+    parser.add_argument("--chunk-size", type=int, default=256)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    snapshot = make_snapshot(rng, args.policies)
+    jobs = [
+        (make_system(rng, i), "deploy", {}, EvaluationMode.SUMMARY) for i in range(args.systems)
+    ]
+
+    cores = os.cpu_count() or 1
+    counts = [0] + [n for n in (1, 2, 4, 8, 16, 32, 64) if n <= cores]
+    if cores not in counts:
+        counts.append(cores)
+
+    baseline = None
+    print(f"{args.systems} systems x {args.policies} policies, chunk size {args.chunk_size}")
+    print(f"{'workers':>8} {'seconds':>9} {'evals/s':>10} {'speedup':>8}")
+    for workers in counts:
+        executor = EvaluationExecutor(workers=workers, chunk_size=args.chunk_size)
+        try:
+            elapsed = await run(executor, snapshot, jobs)
+        finally:
+            executor.shutdown()
+        baseline = baseline or elapsed
+        label = "inline" if workers == 0 else str(workers)
+        print(
+            f"{label:>8} {elapsed:>9.3f} {args.systems / elapsed:>10.0f} "
+            f"{baseline / elapsed:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
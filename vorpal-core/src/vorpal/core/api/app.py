@@ -7,16 +7,38 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from vorpal.core.config import get_settings
-from vorpal.core.db import close_db, init_db
+from vorpal.core.db import async_session_maker, close_db, get_session_context, init_db
+from vorpal.core.engine.audit import audit_writer
+from vorpal.core.engine.audit_verify import verification_executor
+from vorpal.core.engine.decision_log import decision_log
+from vorpal.core.engine.executor import evaluation_executor
+from vorpal.core.engine.shadow import shadow_evaluator
+from vorpal.core.engine.store import policy_store, watching
+from vorpal.core.engine.telemetry import publishing
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):  # noqa: ARG001
     """Application lifespan handler."""
+    settings = get_settings()
+
     # Startup
     await init_db()
-    yield
+    async with get_session_context() as session:
+        await policy_store.load(session)
+
+    async with (
+        watching(policy_store, async_session_maker, settings.policy_refresh_interval),
+        shadow_evaluator.running(async_session_maker),
+        decision_log.running(),
+        audit_writer.running(async_session_maker),
+        publishing(async_session_maker, settings.telemetry_publish_interval),
+    ):
+        yield
+
     # Shutdown
+    evaluation_executor.shutdown()
+    verification_executor.shutdown()
     await close_db()
 
 
@@ -44,12 +66,14 @@ def create_app() -> FastAPI:
     )
 
     # Include routers
-    from vorpal.core.api.routes import health, systems, controls, policies, audit
+    from vorpal.core.api.routes import health, metrics, systems, controls, policies, data, audit
 
     app.include_router(health.router, tags=["Health"])
+    app.include_router(metrics.router, tags=["Metrics"])
     app.include_router(systems.router, prefix="/api/v1/systems", tags=["Systems"])
     app.include_router(controls.router, prefix="/api/v1/controls", tags=["Controls"])
     app.include_router(policies.router, prefix="/api/v1/policies", tags=["Policies"])
+    app.include_router(data.router, prefix="/api/v1/data", tags=["Data"])
     app.include_router(audit.router, prefix="/api/v1/audit", tags=["Audit"])
 
     return app
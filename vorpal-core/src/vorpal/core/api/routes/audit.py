@@ -1,19 +1,32 @@
 """Audit API endpoints."""
 
+from collections.abc import AsyncIterator
 from datetime import datetime
 from typing import Any
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from vorpal.core.api.schemas.audit import (
     AuditChainVerification,
+    AuditEventCreate,
     AuditEventResponse,
     AuditListResponse,
+    AuditVerificationProgress,
+    AuditVerificationResult,
 )
 from vorpal.core.api.schemas.common import PaginationMeta
-from vorpal.core.db import get_session
+from vorpal.core.db import get_session, session_stream
+from vorpal.core.engine.audit import audit_writer, chain_of
+from vorpal.core.engine.audit_verify import (
+    ChainVerifier,
+    load_event,
+    read_chunks,
+    verification_executor,
+)
 from vorpal.core.models.audit import AuditEvent
 
 router = APIRouter()
@@ -76,14 +89,39 @@ async def list_audit_events(
     }
 
 
+@router.post("", response_model=AuditEventResponse, status_code=status.HTTP_201_CREATED)
+async def append_audit_event(event_in: AuditEventCreate, request: Request) -> dict[str, Any]:
+    """Append an event to the audit chain.
+
+    Request context not given in the body is taken from the request itself.
+    Concurrent appends are committed together in batches.
+    """
+    values = event_in.model_dump()
+    if values["ip_address"] is None and request.client is not None:
+        values["ip_address"] = request.client.host
+    values["user_agent"] = values["user_agent"] or request.headers.get("user-agent")
+    values["request_id"] = values["request_id"] or request.headers.get("x-request-id")
+
+    try:
+        return await audit_writer.append(**values)
+    except IntegrityError:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"AI system {event_in.system_id} not found",
+        ) from None
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+        ) from None
+
+
 @router.get("/{event_id}", response_model=AuditEventResponse)
 async def get_audit_event(
     event_id: str,
     db: AsyncSession = Depends(get_session),
 ) -> AuditEvent:
     """Get a specific audit event by ID."""
-    from fastapi import HTTPException, status
-
     result = await db.execute(select(AuditEvent).where(AuditEvent.id == event_id))
     event = result.scalar_one_or_none()
 
@@ -101,72 +139,82 @@ async def verify_audit_chain(
     system_id: str | None = None,
     from_date: datetime | None = Query(default=None, alias="from"),
     to_date: datetime | None = Query(default=None, alias="to"),
+    after: str | None = None,
+    full: bool = False,
+    progress: bool = False,
     db: AsyncSession = Depends(get_session),
-) -> AuditChainVerification:
-    """Verify the integrity of the audit event chain.
-
-    This checks that the hash chain is unbroken, which would
-    indicate no tampering has occurred.
+) -> Any:
+    """Verify the integrity of the audit event chains.
+
+    This checks that each chain is unbroken, which would
+    indicate no tampering has occurred. With ``system_id``,
+    only that system's chain is read. Events are streamed
+    and hashed in chunks, so memory use stays constant.
+
+    By default each chain is checked only after its last verified
+    checkpoint, and checkpoints move forward as chains verify; with
+    ``full``, every chain is read from its start. With ``from``,
+    ``to`` or ``after``, just that range is checked and checkpoints
+    are neither used nor moved.
+
+    With ``after``, verification resumes after that event, checking the
+    next event's link to it. With ``progress``, the response is NDJSON:
+    an ``AuditVerificationProgress`` line per chunk followed by an
+    ``AuditVerificationResult`` line.
     """
-    query = select(AuditEvent).order_by(AuditEvent.timestamp.asc())
+    previous = None
+    if after:
+        previous = await load_event(db, after)
+        if previous is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Audit event {after} not found",
+            )
+
+    verifier = ChainVerifier(previous, mid_chain=from_date is not None)
+    filters = {
+        "chain_id": chain_of(system_id) if system_id else None,
+        "from_date": from_date,
+        "to_date": to_date,
+    }
+    incremental = not full and previous is None and from_date is None and to_date is None
+    if progress:
+        return StreamingResponse(
+            session_stream(_verify_stream, verifier, filters, full, incremental),
+            media_type="application/x-ndjson",
+        )
 
-    if system_id:
-        query = query.where(AuditEvent.system_id == system_id)
-    if from_date:
-        query = query.where(AuditEvent.timestamp >= from_date)
-    if to_date:
-        query = query.where(AuditEvent.timestamp <= to_date)
+    async for _ in _verification(db, verifier, filters, full):
+        pass
+    return AuditChainVerification(**verifier.result(), incremental=incremental)
 
-    result = await db.execute(query)
-    events = result.scalars().all()
 
-    if not events:
-        return AuditChainVerification(
-            verified=True,
-            total_events=0,
-            valid_events=0,
-            invalid_events=0,
-            message="No events to verify",
+def _verification(
+    session: AsyncSession, verifier: ChainVerifier, filters: dict[str, Any], full: bool
+) -> AsyncIterator[ChainVerifier]:
+    """Verify whole chains from their checkpoints, or just the range asked for."""
+    if verifier.previous is None and filters["from_date"] is None and filters["to_date"] is None:
+        return verification_executor.verify_chains(
+            session, verifier, chain_id=filters["chain_id"], full=full
         )
-
-    valid_count = 0
-    invalid_count = 0
-    first_invalid_id = None
-    previous_hash = None
-
-    for event in events:
-        # First event should have no previous hash
-        if previous_hash is None and event.previous_hash is not None:
-            # Could be valid if we're starting mid-chain
-            pass
-
-        # Verify this event's hash
-        if event.verify_hash():
-            # Verify chain continuity
-            if previous_hash is not None and event.previous_hash != previous_hash:
-                if first_invalid_id is None:
-                    first_invalid_id = event.id
-                invalid_count += 1
-            else:
-                valid_count += 1
-        else:
-            if first_invalid_id is None:
-                first_invalid_id = event.id
-            invalid_count += 1
-
-        previous_hash = event.event_hash
-
-    is_verified = invalid_count == 0
-
-    return AuditChainVerification(
-        verified=is_verified,
-        total_events=len(events),
-        valid_events=valid_count,
-        invalid_events=invalid_count,
-        first_invalid_event_id=first_invalid_id,
-        message=(
-            "Audit chain integrity verified"
-            if is_verified
-            else f"Chain integrity compromised: {invalid_count} invalid events"
-        ),
+    chunks = read_chunks(
+        session,
+        after=verifier.previous,
+        chunk_size=verification_executor.chunk_size,
+        **filters,
     )
+    return verification_executor.verify(chunks, verifier)
+
+
+async def _verify_stream(
+    session: AsyncSession,
+    verifier: ChainVerifier,
+    filters: dict[str, Any],
+    full: bool,
+    incremental: bool,
+) -> AsyncIterator[str]:
+    """Stream verification progress one chunk at a time."""
+    async for _ in _verification(session, verifier, filters, full):
+        yield AuditVerificationProgress(**verifier.progress()).model_dump_json() + "\n"
+    result = AuditVerificationResult(**verifier.result(), incremental=incremental)
+    yield result.model_dump_json() + "\n"
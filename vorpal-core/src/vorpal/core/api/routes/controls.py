@@ -14,6 +14,7 @@ from vorpal.core.api.schemas.control import (
     ControlUpdate,
 )
 from vorpal.core.db import get_session
+from vorpal.core.engine.invalidation import invalidate_control
 from vorpal.core.models.control import Control, ControlCategory
 
 router = APIRouter()
@@ -132,6 +133,7 @@ async def update_control(
 
     await db.flush()
     await db.refresh(control)
+    await invalidate_control(db, control.id)
 
     return control
 
@@ -151,5 +153,6 @@ async def delete_control(
             detail=f"Control {control_id} not found",
         )
 
+    await invalidate_control(db, control.id)
     await db.delete(control)
     await db.flush()
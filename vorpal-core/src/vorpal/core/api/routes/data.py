@@ -0,0 +1,122 @@
+"""Data document API endpoints."""
+
+from functools import partial
+from typing import Any
+
+from fastapi import APIRouter, Depends, HTTPException, Path, Query, Response, status
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from vorpal.core.api.schemas.common import PaginationMeta
+from vorpal.core.api.schemas.data import (
+    DataDocumentListResponse,
+    DataDocumentPut,
+    DataDocumentResponse,
+)
+from vorpal.core.db import get_session
+from vorpal.core.engine.data import NAME_PATTERN
+from vorpal.core.engine.store import commit_change, policy_store
+from vorpal.core.models.data import DataDocument
+
+router = APIRouter()
+
+DocumentName = Path(..., pattern=NAME_PATTERN, max_length=100)
+
+
+@router.get("", response_model=DataDocumentListResponse)
+async def list_data_documents(
+    page: int = Query(default=1, ge=1),
+    page_size: int = Query(default=50, ge=1, le=100),
+    db: AsyncSession = Depends(get_session),
+) -> dict[str, Any]:
+    """List data documents, without their content."""
+    total = await db.scalar(select(func.count()).select_from(DataDocument)) or 0
+
+    result = await db.execute(
+        select(DataDocument)
+        .order_by(DataDocument.name)
+        .offset((page - 1) * page_size)
+        .limit(page_size)
+    )
+
+    return {
+        "data": result.scalars().all(),
+        "meta": PaginationMeta(
+            page=page,
+            page_size=page_size,
+            total=total,
+            total_pages=(total + page_size - 1) // page_size,
+        ),
+    }
+
+
+@router.get("/{name}", response_model=DataDocumentResponse)
+async def get_data_document(
+    name: str = DocumentName,
+    db: AsyncSession = Depends(get_session),
+) -> DataDocument:
+    """Get a data document by name."""
+    document = await db.get(DataDocument, name)
+
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Data document {name} not found",
+        )
+
+    return document
+
+
+@router.put("/{name}", response_model=DataDocumentResponse)
+async def put_data_document(
+    document_in: DataDocumentPut,
+    response: Response,
+    name: str = DocumentName,
+    db: AsyncSession = Depends(get_session),
+) -> DataDocument:
+    """Create or replace a data document.
+
+    Rules see the new content as ``data.<name>`` on every worker once
+    the policy snapshot is swapped.
+    """
+    document = await db.get(DataDocument, name)
+
+    if document is None:
+        document = DataDocument(
+            name=name,
+            description=document_in.description,
+            content=document_in.content,
+            version=1,
+        )
+        db.add(document)
+        response.status_code = status.HTTP_201_CREATED
+    else:
+        document.content = document_in.content
+        if "description" in document_in.model_fields_set:
+            document.description = document_in.description
+        document.version += 1
+
+    await db.flush()
+    await db.refresh(document)
+    await commit_change(db, partial(policy_store.apply_data, name=name, content=document.content))
+
+    return document
+
+
+@router.delete("/{name}", status_code=status.HTTP_204_NO_CONTENT)
+async def delete_data_document(
+    name: str = DocumentName,
+    db: AsyncSession = Depends(get_session),
+) -> None:
+    """Delete a data document."""
+    document = await db.get(DataDocument, name)
+
+    if not document:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Data document {name} not found",
+        )
+
+    await db.delete(document)
+    await db.flush()
+    await commit_change(db, partial(policy_store.apply_data, name=name, removed=True))
@@ -0,0 +1,78 @@
+"""Metrics endpoint in the Prometheus text exposition format."""
+
+from collections.abc import Iterable
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from vorpal.core.config import get_settings
+from vorpal.core.db import get_session
+from vorpal.core.engine.telemetry import PolicyCounters, cluster_totals
+
+router = APIRouter()
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Upper bounds, in seconds, of the exported policy latency buckets
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5)
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics(db: AsyncSession = Depends(get_session)) -> PlainTextResponse:
+    """Policy evaluation counters and latency histograms, merged across workers."""
+    totals, _ = await cluster_totals(db, get_settings().telemetry_max_age)
+    return PlainTextResponse(render_metrics(totals.values()), media_type=CONTENT_TYPE)
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def render_metrics(policies: Iterable[PolicyCounters]) -> str:
+    """Render policy counters as Prometheus metrics."""
+    evaluations = [
+        "# HELP vorpal_policy_evaluations_total Policy evaluations by outcome.",
+        "# TYPE vorpal_policy_evaluations_total counter",
+    ]
+    rule_evaluations = [
+        "# HELP vorpal_rule_evaluations_total Rule evaluations by outcome.",
+        "# TYPE vorpal_rule_evaluations_total counter",
+    ]
+    rule_errors = [
+        "# HELP vorpal_rule_errors_total Rule evaluations whose condition raised an error.",
+        "# TYPE vorpal_rule_errors_total counter",
+    ]
+    latency = [
+        "# HELP vorpal_policy_evaluation_seconds Time spent evaluating a policy's rules.",
+        "# TYPE vorpal_policy_evaluation_seconds histogram",
+    ]
+    bounds = [round(b * 1_000_000) for b in LATENCY_BUCKETS]
+
+    for counters in policies:
+        labels = f'policy_id="{counters.policy_id}",policy="{_label(counters.policy_name)}"'
+        for outcome, value in (("passed", counters.passed), ("failed", counters.failed)):
+            evaluations.append(
+                f'vorpal_policy_evaluations_total{{{labels},outcome="{outcome}"}} {value}'
+            )
+
+        for name, rule in counters.rules.items():
+            rule_labels = f'{labels},rule="{_label(name)}",severity="{rule.severity}"'
+            for outcome, value in (
+                ("passed", rule.evaluated - rule.failed),
+                ("failed", rule.failed),
+            ):
+                rule_evaluations.append(
+                    f'vorpal_rule_evaluations_total{{{rule_labels},outcome="{outcome}"}} {value}'
+                )
+            rule_errors.append(f"vorpal_rule_errors_total{{{rule_labels}}} {rule.errors}")
+
+        histogram = counters.latency
+        metric = "vorpal_policy_evaluation_seconds"
+        for bound, count in zip(LATENCY_BUCKETS, histogram.cumulative(bounds), strict=True):
+            latency.append(f'{metric}_bucket{{{labels},le="{bound}"}} {count}')
+        latency.append(f'{metric}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+        latency.append(f"{metric}_sum{{{labels}}} {histogram.total_us / 1_000_000}")
+        latency.append(f"{metric}_count{{{labels}}} {histogram.count}")
+
+    return "\n".join([*evaluations, *rule_evaluations, *rule_errors, *latency]) + "\n"
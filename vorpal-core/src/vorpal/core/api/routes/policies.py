@@ -1,29 +1,77 @@
 """Policies API endpoints."""
 
+import asyncio
+import json
+import logging
+import time
+from collections.abc import AsyncIterator
+from datetime import datetime
+from functools import partial
 from typing import Any
-from uuid import uuid4
+from uuid import UUID, uuid4
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import func, select
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, func, select
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.exc import TimeoutError as SQLAlchemyTimeoutError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from vorpal.core.api.schemas.common import PaginationMeta
 from vorpal.core.api.schemas.policy import (
+    DecisionCacheStats,
+    InlineSystem,
+    PolicyBatchEvaluateRequest,
+    PolicyBatchEvaluateResponse,
+    PolicyBatchItemResult,
     PolicyCreate,
     PolicyEvaluateRequest,
     PolicyEvaluateResponse,
     PolicyListResponse,
     PolicyResponse,
     PolicyResult,
+    PolicyScanResult,
+    PolicyScanSummary,
+    PolicyTelemetryResponse,
     PolicyUpdate,
     RuleResult,
+    ShadowStats,
 )
-from vorpal.core.db import get_session
-from vorpal.core.models.policy import Policy, PolicySeverity
-from vorpal.core.models.system import AISystem
+from vorpal.core.config import get_settings
+from vorpal.core.db import get_session, get_session_context, session_stream
+from vorpal.core.engine import CelSyntaxError, compile_expression, cost, program_cache
+from vorpal.core.engine.activation import (
+    CONTROLS,
+    OWNER,
+    TEAM,
+    load_relations,
+    system_activation,
+)
+from vorpal.core.engine.cost import estimate_cost
+from vorpal.core.engine.decision_log import decision_log, read_segments
+from vorpal.core.engine.decisions import (
+    DecisionKey,
+    decision_cache,
+    fingerprint,
+    last_known_decisions,
+)
+from vorpal.core.engine.evaluator import Decision, EvaluationMode, evaluate
+from vorpal.core.engine.executor import EvaluationJob, evaluation_executor
+from vorpal.core.engine.partial import SystemResiduals, residual_store
+from vorpal.core.engine.shadow import shadow_evaluator
+from vorpal.core.engine.snapshot import PolicySnapshot
+from vorpal.core.engine.store import commit_change, policy_store
+from vorpal.core.engine.telemetry import cluster_totals
+from vorpal.core.models.policy import Policy
+from vorpal.core.models.system import AISystem, RiskTier, SystemStatus
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Systems fetched per server-side cursor round trip during a fleet scan
+_SCAN_CHUNK_SIZE = 500
+
 
 @router.get("", response_model=PolicyListResponse)
 async def list_policies(
@@ -81,12 +129,15 @@ async def create_policy(
             detail=f"Policy '{policy_in.name}' already exists",
         )
 
+    _check_rule_conditions([r.model_dump() for r in policy_in.rules])
+
     policy = Policy(
         id=str(uuid4()),
         name=policy_in.name,
         description=policy_in.description,
         version=policy_in.version,
         enabled=policy_in.enabled,
+        shadow=policy_in.shadow,
         match_criteria=policy_in.match_criteria,
         rules=[r.model_dump() for r in policy_in.rules],
         default_severity=policy_in.default_severity,
@@ -98,10 +149,94 @@ async def create_policy(
     db.add(policy)
     await db.flush()
     await db.refresh(policy)
+    await commit_change(db, partial(policy_store.apply, policy=policy))
 
     return policy
 
 
+@router.get("/scan", response_class=StreamingResponse)
+async def scan_policies(
+    action: str,
+    status: SystemStatus | None = None,
+    risk_tier: RiskTier | None = None,
+    team_id: str | None = None,
+    tag: str | None = None,
+    mode: EvaluationMode = EvaluationMode.SUMMARY,
+) -> StreamingResponse:
+    """Evaluate an action against every matching AI system.
+
+    Results are streamed as NDJSON, one ``PolicyScanResult`` line per
+    system followed by a ``PolicyScanSummary`` line. Systems are read
+    through a server-side cursor, so memory use does not grow with the
+    size of the fleet.
+    """
+    query = select(AISystem)
+    if status:
+        query = query.where(AISystem.status == status)
+    if risk_tier:
+        query = query.where(AISystem.risk_tier == risk_tier)
+    if team_id:
+        query = query.where(AISystem.team_id == team_id)
+    if tag:
+        query = query.where(AISystem.tags.contains([tag]))
+    query = query.order_by(AISystem.id)
+
+    return StreamingResponse(
+        session_stream(_scan, query, action, mode), media_type="application/x-ndjson"
+    )
+
+
+async def _scan(
+    session: AsyncSession, query: Select[Any], action: str, mode: EvaluationMode
+) -> AsyncIterator[str]:
+    """Stream scan results one cursor chunk at a time."""
+    started = time.perf_counter()
+    scanned = allowed = 0
+
+    snapshot = await policy_store.get_snapshot(session)
+    result = await session.stream_scalars(query.execution_options(yield_per=_SCAN_CHUNK_SIZE))
+    async for chunk in result.partitions():
+        names = {s.id: s.name for s in chunk}
+        systems = {s.id: system_activation(s) for s in chunk}
+        needs = {
+            system_id: needed
+            for system_id, system in systems.items()
+            if (needed := snapshot.requirements(system, action))
+        }
+        extra = await load_relations(session, systems, needs) if needs else {}
+        session.expunge_all()
+
+        jobs: list[EvaluationJob] = [
+            ({**system, **extra.get(system_id, {})}, action, {}, mode)
+            for system_id, system in systems.items()
+        ]
+        decisions = await evaluation_executor.evaluate(snapshot, jobs)
+
+        lines = []
+        for system_id, decision in zip(systems, decisions, strict=True):
+            allowed += decision.allowed
+            response = _to_response(
+                decision,
+                system_id,
+                action,
+                mode,
+                response_type=PolicyScanResult,
+                system_name=names[system_id],
+            )
+            lines.append(response.model_dump_json())
+        scanned += len(lines)
+        yield "\n".join(lines) + "\n"
+
+    summary = PolicyScanSummary(
+        action=action,
+        scanned=scanned,
+        allowed=allowed,
+        denied=scanned - allowed,
+        duration_ms=(time.perf_counter() - started) * 1000,
+    )
+    yield summary.model_dump_json() + "\n"
+
+
 @router.get("/{policy_id}", response_model=PolicyResponse)
 async def get_policy(
     policy_id: str,
@@ -141,6 +276,7 @@ async def update_policy(
     for field, value in update_data.items():
         if field == "rules" and value is not None:
             value = [r.model_dump() if hasattr(r, "model_dump") else r for r in value]
+            _check_rule_conditions(value)
         if field == "metadata_":
             setattr(policy, "metadata_", value)
         else:
@@ -148,6 +284,8 @@ async def update_policy(
 
     await db.flush()
     await db.refresh(policy)
+    program_cache.invalidate(policy.id)
+    await commit_change(db, partial(policy_store.apply, policy=policy))
 
     return policy
 
@@ -169,22 +307,53 @@ async def delete_policy(
 
     await db.delete(policy)
     await db.flush()
+    program_cache.invalidate(policy_id)
+    await commit_change(db, partial(policy_store.apply, removed_id=policy_id))
 
 
 @router.post("/evaluate", response_model=PolicyEvaluateResponse)
-async def evaluate_policies(
-    request: PolicyEvaluateRequest,
-    db: AsyncSession = Depends(get_session),
-) -> PolicyEvaluateResponse:
+async def evaluate_policies(request: PolicyEvaluateRequest) -> PolicyEvaluateResponse:
     """Evaluate policies against a system action.
 
     This endpoint checks all matching policies and returns
-    whether the action is allowed based on rule evaluation.
+    whether the action is allowed based on rule evaluation. The
+    ``summary`` and ``fail_fast`` modes omit per-rule results.
+
+    If the evaluation misses its ``timeout_ms`` deadline or the database
+    is unavailable, a degraded decision is returned instead of an error.
+    An inline ``system`` document is evaluated in memory, without
+    touching the database. Decisions are sampled into the decision log.
     """
+    started = time.perf_counter()
+    response = await _decide(request)
+    if decision_log.sampled():
+        decision, version = response._decision or (None, None)
+        elapsed = time.perf_counter() - started
+        decision_log.record(_log_entry(request, response, decision, version, elapsed))
+    return response
+
+
+async def _decide(request: PolicyEvaluateRequest) -> PolicyEvaluateResponse:
+    """Evaluate a single request, inline, from the database, or degraded."""
+    if request.system is not None:
+        [response] = await _evaluate_inline(policy_store.snapshot, [(request.system, request)])
+        return response
+
+    deadline = request.timeout_ms / 1000 if request.timeout_ms else None
+    try:
+        async with asyncio.timeout(deadline), get_session_context() as db:
+            return await _evaluate_one(db, request)
+    except TimeoutError:
+        return _degraded_response(request, f"deadline of {request.timeout_ms} ms exceeded")
+    except (OSError, OperationalError, InterfaceError, SQLAlchemyTimeoutError) as e:
+        logger.warning("Policy store unavailable for %s: %s", request.system_id, e)
+        return _degraded_response(request, "policy store unavailable")
+
+
+async def _evaluate_one(db: AsyncSession, request: PolicyEvaluateRequest) -> PolicyEvaluateResponse:
+    """Evaluate a single request, raising 404 if its system does not exist."""
     # Get the system
-    system_result = await db.execute(
-        select(AISystem).where(AISystem.id == request.system_id)
-    )
+    system_result = await db.execute(select(AISystem).where(AISystem.id == request.system_id))
     system = system_result.scalar_one_or_none()
 
     if not system:
@@ -193,144 +362,479 @@ async def evaluate_policies(
             detail=f"System {request.system_id} not found",
         )
 
-    # Get all enabled policies
-    policies_result = await db.execute(
-        select(Policy).where(Policy.enabled == True)  # noqa: E712
-    )
-    policies = policies_result.scalars().all()
+    # Enabled policies come from the in-memory snapshot, not the database
+    snapshot = await policy_store.get_snapshot(db)
 
-    # Evaluate each policy
-    results: list[PolicyResult] = []
-    blocking_failures: list[str] = []
-    warnings: list[str] = []
+    [response] = await _evaluate_requests(db, snapshot, [(system_activation(system), request)])
+    return response
 
-    for policy in policies:
-        # Check if policy matches this system/action
-        if not _policy_matches(policy, system, request.action):
-            continue
 
-        # Evaluate rules
-        rule_results: list[RuleResult] = []
-        policy_passed = True
+def _log_entry(
+    request: PolicyEvaluateRequest,
+    response: PolicyEvaluateResponse,
+    decision: Decision | None,
+    version: int | None,
+    elapsed: float,
+) -> dict[str, Any]:
+    """Decision log record for an evaluation.
 
-        for rule in policy.rules:
-            # For now, use a simple evaluation (CEL integration would go here)
-            rule_passed = _evaluate_rule(rule, system, request.context)
-            severity = PolicySeverity(rule.get("severity", policy.default_severity))
+    The matched policies come from the engine ``decision``, so they are
+    logged in every mode; per-rule outcomes only exist in ``full`` mode.
+    ``version`` is that of the snapshot the decision was evaluated
+    against. Both are None for a degraded decision made without one.
+    """
+    return {
+        "system_id": response.system_id,
+        "action": request.action,
+        "mode": request.mode.value,
+        "input": fingerprint(request.model_dump(mode="json", exclude={"timeout_ms"})).hex(),
+        "policy_set_version": version,
+        "allowed": response.allowed,
+        "cached": response.cached,
+        "degraded": response.degraded,
+        "latency_ms": round(elapsed * 1000, 3),
+        "policies": [
+            {
+                "policy_id": outcome.policy.id,
+                "passed": outcome.passed,
+                "rules": [
+                    {"rule": rule.rule.name, "passed": rule.passed, "error": rule.error}
+                    for rule in outcome.rules
+                ],
+            }
+            for outcome in (decision.policies if decision is not None else [])
+        ],
+        "blocking_failures": response.blocking_failures,
+    }
 
-            rule_result = RuleResult(
-                rule_name=rule["name"],
-                passed=rule_passed,
-                message=rule.get("message") if not rule_passed else None,
-                severity=severity,
+
+def _degraded_response(request: PolicyEvaluateRequest, reason: str) -> PolicyEvaluateResponse:
+    """Answer with the last known decision, or fail closed without one.
+
+    A last known decision is used only if degraded decisions are enabled
+    and it is no older than ``degraded_max_age``.
+    """
+    settings = get_settings()
+    if settings.degraded_decisions and request.system_id is not None:
+        known = last_known_decisions.get(
+            request.system_id, request.action, settings.degraded_max_age
+        )
+        if known is not None:
+            response: PolicyEvaluateResponse
+            response, age = known
+            return response.model_copy(
+                update={"cached": True, "degraded": True, "decision_age_ms": age * 1000}
             )
-            rule_results.append(rule_result)
+    return PolicyEvaluateResponse(
+        allowed=False,
+        system_id=request.system_id,
+        action=request.action,
+        policies_evaluated=0,
+        policies_passed=0,
+        policies_failed=0,
+        blocking_failures=[f"Policy decision unavailable: {reason}"],
+        warnings=[],
+        mode=request.mode,
+        degraded=True,
+    )
+
+
+@router.post("/evaluate/batch", response_model=PolicyBatchEvaluateResponse)
+async def evaluate_policies_batch(
+    request: PolicyBatchEvaluateRequest,
+    db: AsyncSession = Depends(get_session),
+) -> PolicyBatchEvaluateResponse:
+    """Evaluate many system actions in one call.
 
-            if not rule_passed:
-                if severity == PolicySeverity.ERROR:
-                    policy_passed = False
-                    blocking_failures.append(rule["message"])
-                elif severity == PolicySeverity.WARNING:
-                    warnings.append(rule["message"])
+    All referenced systems are loaded with a single query and every
+    item is evaluated against the same policy snapshot. Results are
+    returned in request order; an unknown system fails only its own
+    item.
+    """
+    registered = [(item.system_id, item) for item in request.items if item.system_id is not None]
+    system_ids = {system_id for system_id, _ in registered if _is_uuid(system_id)}
+    systems: dict[str, dict[str, Any]] = {}
+    if system_ids:
+        rows = await db.execute(select(AISystem).where(AISystem.id.in_(system_ids)))
+        systems = {s.id: system_activation(s) for s in rows.scalars().all()}
+
+    snapshot = await policy_store.get_snapshot(db)
+
+    found = [(systems[system_id], item) for system_id, item in registered if system_id in systems]
+    responses = iter(await _evaluate_requests(db, snapshot, found))
+    inline_responses = iter(
+        await _evaluate_inline(snapshot, [(i.system, i) for i in request.items if i.system])
+    )
+
+    results: list[PolicyBatchItemResult] = []
+    for index, item in enumerate(request.items):
+        if item.system is not None:
+            result = next(inline_responses)
+        elif item.system_id in systems:
+            result = next(responses)
+        else:
+            results.append(
+                PolicyBatchItemResult(
+                    index=index,
+                    system_id=item.system_id,
+                    action=item.action,
+                    error=f"System {item.system_id} not found",
+                )
+            )
+            continue
 
         results.append(
-            PolicyResult(
-                policy_id=policy.id,
-                policy_name=policy.name,
-                passed=policy_passed,
-                rule_results=rule_results,
+            PolicyBatchItemResult(
+                index=index,
+                system_id=item.target_id,
+                action=item.action,
+                result=result,
             )
         )
 
-    # Determine overall result
-    policies_failed = sum(1 for r in results if not r.passed)
-    allowed = policies_failed == 0
-
-    return PolicyEvaluateResponse(
-        allowed=allowed,
-        system_id=request.system_id,
-        action=request.action,
-        policies_evaluated=len(results),
-        policies_passed=len(results) - policies_failed,
-        policies_failed=policies_failed,
+    errors = sum(1 for r in results if r.error is not None)
+    return PolicyBatchEvaluateResponse(
         results=results,
-        blocking_failures=blocking_failures,
-        warnings=warnings,
+        evaluated=len(results) - errors,
+        errors=errors,
     )
 
 
-def _policy_matches(policy: Policy, system: AISystem, action: str) -> bool:
-    """Check if a policy's match criteria apply to this system/action."""
-    criteria = policy.match_criteria
-
-    # Check risk_tier match
-    if "risk_tier" in criteria:
-        allowed_tiers = criteria["risk_tier"]
-        if isinstance(allowed_tiers, str):
-            allowed_tiers = [allowed_tiers]
-        if system.risk_tier.value not in allowed_tiers:
-            return False
-
-    # Check action match
-    if "action" in criteria:
-        allowed_actions = criteria["action"]
-        if isinstance(allowed_actions, str):
-            allowed_actions = [allowed_actions]
-        if action not in allowed_actions:
-            return False
-
-    # Check type match
-    if "type" in criteria:
-        allowed_types = criteria["type"]
-        if isinstance(allowed_types, str):
-            allowed_types = [allowed_types]
-        if system.type.value not in allowed_types:
-            return False
-
-    # Check tags match
-    if "tags" in criteria:
-        tag_criteria = criteria["tags"]
-        if "contains" in tag_criteria:
-            required_tags = tag_criteria["contains"]
-            if not any(tag in system.tags for tag in required_tags):
-                return False
+@router.get("/evaluate/cache", response_model=DecisionCacheStats)
+async def get_decision_cache_stats() -> dict[str, Any]:
+    """Get this worker's decision cache counters."""
+    return decision_cache.stats()
 
-    return True
+
+@router.get("/evaluate/shadow", response_model=ShadowStats)
+async def get_shadow_stats() -> dict[str, Any]:
+    """Get this worker's shadow policy outcomes and sampled decisions."""
+    return shadow_evaluator.stats()
 
 
-def _evaluate_rule(
-    rule: dict[str, Any],
-    system: AISystem,
-    context: dict[str, Any],
-) -> bool:
-    """Evaluate a policy rule.
+@router.get("/evaluate/telemetry", response_model=PolicyTelemetryResponse)
+async def get_policy_telemetry(
+    top: int | None = Query(default=None, ge=1),
+    db: AsyncSession = Depends(get_session),
+) -> dict[str, Any]:
+    """Get per-policy and per-rule evaluation counters and latencies.
 
-    This is a simplified evaluation. In production, this would
-    use CEL (Common Expression Language) for complex conditions.
+    Counters are merged across every worker that published them within
+    ``telemetry_max_age`` seconds. Policies are ordered by total
+    evaluation time, so the most expensive come first.
     """
-    condition = rule.get("condition", "true")
+    totals, workers = await cluster_totals(db, get_settings().telemetry_max_age)
+    ranked = sorted(totals.values(), key=lambda c: c.latency.total_us, reverse=True)
+    return {"workers": workers, "policies": [c.summary() for c in ranked[:top]]}
 
-    # For now, implement some basic patterns
-    # In production, integrate with cel-python or OPA
 
-    # Simple always-pass/fail conditions
-    if condition == "true":
-        return True
-    if condition == "false":
-        return False
+@router.get("/evaluate/decisions", response_class=StreamingResponse)
+async def read_decision_log(
+    since: datetime | None = None,
+    limit: int | None = Query(default=None, ge=1),
+) -> StreamingResponse:
+    """Stream the logged decisions as NDJSON, oldest first.
+
+    Segments in the decision log directory are read whichever worker
+    wrote them, so with a shared directory this covers every worker.
+    Only decisions already flushed to disk are returned.
+    """
+    if decision_log.directory is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Decision log is not enabled",
+        )
+    lines = (
+        json.dumps(record, separators=(",", ":")) + "\n"
+        for record in read_segments(decision_log.directory, since, limit)
+    )
+    return StreamingResponse(lines, media_type="application/x-ndjson")
+
+
+async def _evaluate_requests(
+    db: AsyncSession,
+    snapshot: PolicySnapshot,
+    requests: list[tuple[dict[str, Any], PolicyEvaluateRequest]],
+) -> list[PolicyEvaluateResponse]:
+    """Evaluate ``(system activation, request)`` pairs through the decision cache.
+
+    Cache misses whose matching policies read related data (controls,
+    team, owner) get it loaded in one batch before evaluation; requests
+    whose policies only read the system's own columns load nothing more.
+    Misses are evaluated against each system's stored residual rules
+    (see ``engine.partial``), unless there are enough of them to fan
+    out to evaluation workers.
+    """
+    responses: list[PolicyEvaluateResponse | None] = []
+    misses: list[tuple[int, DecisionKey, dict[str, Any], PolicyEvaluateRequest]] = []
+    for position, (system, request) in enumerate(requests):
+        key = decision_cache.key(
+            system, request.action, request.context, snapshot.version, request.mode.value
+        )
+        cached = decision_cache.get(key)
+        if cached is not None:
+            responses.append(cached.model_copy(update={"cached": True}))
+        else:
+            responses.append(None)
+            misses.append((position, key, system, request))
+
+    needs: dict[str, frozenset[str]] = {}
+    for _, _, system, request in misses:
+        needed = snapshot.requirements(system, request.action)
+        if needed:
+            needs[system["id"]] = needs.get(system["id"], frozenset()) | needed
+
+    decisions: list[Decision]
+    if residual_store.enabled and not evaluation_executor.parallel(len(misses)):
+        residuals = await _residuals_for(db, snapshot, {s["id"]: s for _, _, s, _ in misses}, needs)
+        decisions = [
+            evaluate(
+                snapshot,
+                residuals[system["id"]].system,
+                request.action,
+                request.context,
+                request.mode,
+                residuals=residuals[system["id"]],
+            )
+            for _, _, system, request in misses
+        ]
+    else:
+        extra = {}
+        if needs:
+            extra = await load_relations(db, {s["id"]: s for _, _, s, _ in misses}, needs)
+        jobs = [
+            (
+                {**system, **extra.get(system["id"], {})},
+                request.action,
+                request.context,
+                request.mode,
+            )
+            for _, _, system, request in misses
+        ]
+        decisions = await evaluation_executor.evaluate(snapshot, jobs)
+
+    for (position, key, system, request), decision in zip(misses, decisions, strict=True):
+        response = _to_response(decision, system["id"], request.action, request.mode)
+        response._decision = (decision, snapshot.version)
+        decision_cache.put(key, response)
+        last_known_decisions.put(system["id"], request.action, response)
+        responses[position] = response
+
+    for system, request in requests:
+        shadow_evaluator.submit(snapshot, system, request.action, request.context)
+    return [r for r in responses if r is not None]
+
+
+async def _evaluate_inline(
+    snapshot: PolicySnapshot,
+    requests: list[tuple[InlineSystem, PolicyEvaluateRequest]],
+) -> list[PolicyEvaluateResponse]:
+    """Evaluate ``(inline system, request)`` pairs through the decision cache.
+
+    The documents already hold everything rules can read, so nothing is
+    loaded from the database. Their decisions are not kept as last known
+    decisions, and no residuals are stored for them.
+    """
+    responses: list[PolicyEvaluateResponse | None] = []
+    misses: list[tuple[int, DecisionKey, dict[str, Any], PolicyEvaluateRequest]] = []
+    activations = [(_inline_activation(document), request) for document, request in requests]
+    for position, (system, request) in enumerate(activations):
+        key = decision_cache.key(
+            system, request.action, request.context, snapshot.version, request.mode.value
+        )
+        cached = decision_cache.get(key)
+        if cached is not None:
+            responses.append(cached.model_copy(update={"cached": True}))
+        else:
+            responses.append(None)
+            misses.append((position, key, system, request))
+
+    jobs = [
+        (system, request.action, request.context, request.mode) for _, _, system, request in misses
+    ]
+    decisions = await evaluation_executor.evaluate(snapshot, jobs)
+    for (position, key, system, request), decision in zip(misses, decisions, strict=True):
+        response = _to_response(decision, system["id"], request.action, request.mode)
+        response._decision = (decision, snapshot.version)
+        decision_cache.put(key, response)
+        responses[position] = response
+
+    for system, request in activations:
+        shadow_evaluator.submit(snapshot, system, request.action, request.context)
+    return [r for r in responses if r is not None]
+
+
+def _inline_activation(system: InlineSystem) -> dict[str, Any]:
+    """Build the ``system`` variable for an inline system document.
+
+    Controls come from the document; the team and owner are not looked up.
+    """
+    return {
+        "id": system.id,
+        "name": system.name,
+        "description": system.description,
+        "type": system.type.value,
+        "status": system.status.value,
+        "risk_tier": system.risk_tier.value,
+        "autonomy_level": system.autonomy_level,
+        "owner_id": system.owner_id,
+        "team_id": system.team_id,
+        "version": system.version,
+        "metadata": system.metadata_,
+        "documentation": system.documentation,
+        "tags": system.tags,
+        CONTROLS: [
+            {
+                "id": control.id,
+                "name": control.name,
+                "category": control.category.value if control.category else None,
+                "regulation": control.regulation,
+                "mandatory": control.mandatory,
+                "status": control.status.value,
+                "evidence_required": control.evidence_required,
+            }
+            for control in system.controls
+        ],
+        TEAM: None,
+        OWNER: None,
+    }
+
 
-    # Basic autonomy level check
-    if "autonomy_level" in condition and "<=" in condition:
-        if system.autonomy_level is not None:
-            try:
-                # Extract number from condition like "system.autonomy_level <= 3"
-                parts = condition.split("<=")
-                if len(parts) == 2:
-                    threshold = int(parts[1].strip())
-                    return system.autonomy_level <= threshold
-            except (ValueError, IndexError):
-                pass
-
-    # Default to passing (permissive by default for demo)
-    # In production, default to fail for security
+async def _residuals_for(
+    db: AsyncSession,
+    snapshot: PolicySnapshot,
+    systems: dict[str, dict[str, Any]],
+    needs: dict[str, frozenset[str]],
+) -> dict[str, SystemResiduals]:
+    """Get each system's partially evaluated rules, building any that are missing.
+
+    Related data is loaded, in one batch, only for systems whose
+    residuals have to be built.
+    """
+    residuals: dict[str, SystemResiduals] = {}
+    missing: dict[str, dict[str, Any]] = {}
+    generations: dict[str, int] = {}
+    for system_id, system in systems.items():
+        found = residual_store.get(system, snapshot.version, needs.get(system_id, frozenset()))
+        if found is None:
+            missing[system_id] = system
+            generations[system_id] = residual_store.generation(system_id)
+        else:
+            residuals[system_id] = found
+
+    missing_needs = {system_id: needs[system_id] for system_id in missing if system_id in needs}
+    extra = await load_relations(db, missing, missing_needs) if missing_needs else {}
+    for system_id, system in missing.items():
+        built = SystemResiduals(
+            {**system, **extra.get(system_id, {})},
+            snapshot.version,
+            needs.get(system_id, frozenset()),
+            snapshot.data,
+        )
+        residual_store.put(built, generations[system_id])
+        residuals[system_id] = built
+    return residuals
+
+
+def _is_uuid(value: str) -> bool:
+    """System IDs are UUIDs; anything else can never match a row."""
+    try:
+        UUID(value)
+    except ValueError:
+        return False
     return True
+
+
+def _to_response(
+    decision: Decision,
+    system_id: str,
+    action: str,
+    mode: EvaluationMode = EvaluationMode.FULL,
+    response_type: type[PolicyEvaluateResponse] = PolicyEvaluateResponse,
+    **fields: Any,
+) -> PolicyEvaluateResponse:
+    """Convert an engine decision into the API response.
+
+    ``response_type`` and ``fields`` let streaming endpoints build a
+    response subclass carrying extra fields.
+    """
+    policies_evaluated = len(decision.policies)
+    policies_failed = decision.policies_failed
+
+    if mode != EvaluationMode.FULL:
+        return response_type(
+            allowed=decision.allowed,
+            system_id=system_id,
+            action=action,
+            policies_evaluated=policies_evaluated,
+            policies_passed=policies_evaluated - policies_failed,
+            policies_failed=policies_failed,
+            blocking_failures=decision.blocking_failures,
+            warnings=decision.warnings,
+            mode=mode,
+            cost=decision.cost,
+            **fields,
+        )
+
+    results = [
+        PolicyResult(
+            policy_id=outcome.policy.id,
+            policy_name=outcome.policy.name,
+            passed=outcome.passed,
+            rule_results=[
+                RuleResult(
+                    rule_name=r.rule.name,
+                    passed=r.passed,
+                    message=r.rule.message if not r.passed else None,
+                    severity=r.rule.severity,
+                    error=r.error,
+                    cost=r.cost,
+                )
+                for r in outcome.rules
+            ],
+        )
+        for outcome in decision.policies
+    ]
+
+    return response_type(
+        allowed=decision.allowed,
+        system_id=system_id,
+        action=action,
+        policies_evaluated=policies_evaluated,
+        policies_passed=policies_evaluated - policies_failed,
+        policies_failed=policies_failed,
+        results=results,
+        blocking_failures=decision.blocking_failures,
+        warnings=decision.warnings,
+        cost=decision.cost,
+        **fields,
+    )
+
+
+def _check_rule_conditions(rules: list[dict[str, Any]]) -> None:
+    """Reject rules whose conditions do not compile or are estimated too costly."""
+    errors = []
+    for rule in rules:
+        try:
+            program = compile_expression(rule["condition"])
+        except CelSyntaxError as e:
+            errors.append({"rule": rule["name"], "error": str(e)})
+            continue
+        estimated = estimate_cost(program.ast)
+        if cost.rule_cost_budget and estimated > cost.rule_cost_budget:
+            errors.append(
+                {
+                    "rule": rule["name"],
+                    "error": (
+                        f"estimated cost of {estimated} steps exceeds the budget of "
+                        f"{cost.rule_cost_budget}"
+                    ),
+                    "cost": estimated,
+                }
+            )
+
+    if errors:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=errors,
+        )
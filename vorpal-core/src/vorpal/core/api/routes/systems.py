@@ -15,7 +15,12 @@ from vorpal.core.api.schemas.system import (
     SystemUpdate,
 )
 from vorpal.core.api.schemas.control import SystemControlCreate, SystemControlResponse
+from vorpal.core.api.schemas.policy import SystemPoliciesResponse
 from vorpal.core.db import get_session
+from vorpal.core.engine.activation import system_activation
+from vorpal.core.engine.effective import effective_policies
+from vorpal.core.engine.invalidation import invalidate_systems
+from vorpal.core.engine.store import policy_store
 from vorpal.core.models.system import AISystem, RiskTier, SystemStatus, SystemType
 from vorpal.core.models.control import SystemControl, ControlStatus
 
@@ -142,6 +147,7 @@ async def update_system(
 
     await db.flush()
     await db.refresh(system)
+    invalidate_systems(db, [system.id])
 
     return system
 
@@ -164,6 +170,50 @@ async def delete_system(
     # Soft delete by setting status to deprecated
     system.status = SystemStatus.DEPRECATED
     await db.flush()
+    invalidate_systems(db, [system.id])
+
+
+@router.get("/{system_id}/policies", response_model=SystemPoliciesResponse)
+async def list_system_policies(
+    system_id: str,
+    action: str | None = None,
+    db: AsyncSession = Depends(get_session),
+) -> dict[str, Any]:
+    """List the policies whose match criteria apply to a system, by action.
+
+    Served from effective policy sets precomputed per risk tier, type
+    and tags (see ``engine.effective``). Shadow policies are included
+    and flagged.
+    """
+    result = await db.execute(select(AISystem).where(AISystem.id == system_id))
+    system = result.scalar_one_or_none()
+
+    if not system:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"System {system_id} not found",
+        )
+
+    snapshot = await policy_store.get_snapshot(db)
+    actions = effective_policies.policies(snapshot, system_activation(system), action)
+    return {
+        "system_id": system.id,
+        "policy_set_version": snapshot.version,
+        "actions": {
+            name: [
+                {
+                    "id": p.id,
+                    "name": p.name,
+                    "version": p.version,
+                    "shadow": p.shadow,
+                    "default_severity": p.default_severity,
+                    "rule_count": len(p.rules),
+                }
+                for p in policies
+            ]
+            for name, policies in actions.items()
+        },
+    }
 
 
 @router.get("/{system_id}/controls", response_model=list[SystemControlResponse])
@@ -231,5 +281,7 @@ async def assign_control(
     db.add(system_control)
     await db.flush()
     await db.refresh(system_control)
+    await db.refresh(system_control, attribute_names=["control"])
+    invalidate_systems(db, [system_id])
 
     return system_control
@@ -17,8 +17,11 @@ from vorpal.core.api.schemas.policy import (
     PolicyCreate,
     PolicyUpdate,
     PolicyResponse,
+    InlineSystem,
     PolicyEvaluateRequest,
     PolicyEvaluateResponse,
+    PolicyBatchEvaluateRequest,
+    PolicyBatchEvaluateResponse,
 )
 from vorpal.core.api.schemas.audit import AuditEventResponse, AuditQueryParams
 
@@ -36,8 +39,11 @@ __all__ = [
     "PolicyCreate",
     "PolicyUpdate",
     "PolicyResponse",
+    "InlineSystem",
     "PolicyEvaluateRequest",
     "PolicyEvaluateResponse",
+    "PolicyBatchEvaluateRequest",
+    "PolicyBatchEvaluateResponse",
     "AuditEventResponse",
     "AuditQueryParams",
 ]
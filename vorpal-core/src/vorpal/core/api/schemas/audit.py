@@ -1,7 +1,7 @@
 """Schema definitions for Audit Events."""
 
 from datetime import datetime
-from typing import Any
+from typing import Any, Literal
 
 from pydantic import Field
 
@@ -24,11 +24,30 @@ class AuditEventResponse(BaseSchema):
     details: dict[str, Any]
     ip_address: str | None
     request_id: str | None
+    chain_id: str
+    sequence: int
     previous_hash: str | None
     event_hash: str
     timestamp: datetime
 
 
+class AuditEventCreate(BaseSchema):
+    """Schema for appending an Audit Event."""
+
+    system_id: str | None = None
+    event_type: str = Field(..., min_length=1, max_length=50)
+    actor_id: str | None = Field(default=None, max_length=255)
+    actor_type: ActorType
+    actor_name: str | None = Field(default=None, max_length=255)
+    action: str = Field(..., min_length=1, max_length=100)
+    resource_type: str | None = Field(default=None, max_length=50)
+    resource_id: str | None = Field(default=None, max_length=255)
+    details: dict[str, Any] = Field(default_factory=dict)
+    ip_address: str | None = Field(default=None, max_length=45)
+    user_agent: str | None = None
+    request_id: str | None = Field(default=None, max_length=100)
+
+
 class AuditListResponse(PaginatedResponse[AuditEventResponse]):
     """Paginated list of Audit Events."""
 
@@ -57,4 +76,23 @@ class AuditChainVerification(BaseSchema):
     valid_events: int
     invalid_events: int
     first_invalid_event_id: str | None = None
+    last_event_id: str | None = None  # Resume a later verification after this event
+    incremental: bool = False  # Only events after the chain checkpoints were checked
     message: str
+
+
+class AuditVerificationProgress(BaseSchema):
+    """Progress line of a streamed chain verification."""
+
+    type: Literal["progress"] = "progress"
+    total_events: int
+    valid_events: int
+    invalid_events: int
+    first_invalid_event_id: str | None = None
+    last_event_id: str | None = None
+
+
+class AuditVerificationResult(AuditChainVerification):
+    """Final line of a streamed chain verification."""
+
+    type: Literal["result"] = "result"
@@ -0,0 +1,35 @@
+"""Schema definitions for data documents."""
+
+from datetime import datetime
+from typing import Any
+
+from vorpal.core.api.schemas.common import BaseSchema, PaginatedResponse
+
+
+class DataDocumentPut(BaseSchema):
+    """Schema for creating or replacing a data document."""
+
+    content: Any  # Any JSON value; lists of strings get O(1) ``in`` lookups
+    description: str | None = None
+
+
+class DataDocumentSummary(BaseSchema):
+    """Data document metadata, without its content."""
+
+    name: str
+    description: str | None
+    version: int
+    created_at: datetime
+    updated_at: datetime
+
+
+class DataDocumentResponse(DataDocumentSummary):
+    """Schema for data document response."""
+
+    content: Any
+
+
+class DataDocumentListResponse(PaginatedResponse[DataDocumentSummary]):
+    """Paginated list of data documents."""
+
+    pass
@@ -1,12 +1,16 @@
 """Schema definitions for Policies."""
 
 from datetime import datetime
-from typing import Any
+from typing import Any, Literal
 
-from pydantic import Field
+from pydantic import AliasChoices, Field, PrivateAttr, model_validator
 
 from vorpal.core.api.schemas.common import BaseSchema, PaginatedResponse
+from vorpal.core.api.schemas.system import SystemCreate
+from vorpal.core.engine.evaluator import Decision, EvaluationMode
+from vorpal.core.models.control import ControlCategory, ControlStatus
 from vorpal.core.models.policy import PolicySeverity
+from vorpal.core.models.system import SystemStatus
 
 
 class PolicyRuleSchema(BaseSchema):
@@ -25,12 +29,18 @@ class PolicyBase(BaseSchema):
     description: str | None = None
     version: str = "1.0.0"
     enabled: bool = True
+    shadow: bool = False  # Evaluated in the background; never affects decisions
     match_criteria: dict[str, Any] = Field(default_factory=dict)
     rules: list[PolicyRuleSchema] = Field(default_factory=list)
     default_severity: PolicySeverity = PolicySeverity.ERROR
     regulation: str | None = None
     pack_name: str | None = None
-    metadata_: dict[str, Any] = Field(default_factory=dict, alias="metadata")
+    # ORM rows expose the column as `metadata_` (`metadata` is the SQLAlchemy MetaData)
+    metadata_: dict[str, Any] = Field(
+        default_factory=dict,
+        validation_alias=AliasChoices("metadata_", "metadata"),
+        serialization_alias="metadata",
+    )
 
 
 class PolicyCreate(PolicyBase):
@@ -46,6 +56,7 @@ class PolicyUpdate(BaseSchema):
     description: str | None = None
     version: str | None = None
     enabled: bool | None = None
+    shadow: bool | None = None
     match_criteria: dict[str, Any] | None = None
     rules: list[PolicyRuleSchema] | None = None
     default_severity: PolicySeverity | None = None
@@ -69,12 +80,74 @@ class PolicyListResponse(PaginatedResponse[PolicyResponse]):
     pass
 
 
-class PolicyEvaluateRequest(BaseSchema):
-    """Request schema for policy evaluation."""
+class EffectivePolicy(BaseSchema):
+    """A policy whose match criteria apply to a system."""
+
+    id: str
+    name: str
+    version: str
+    shadow: bool  # Evaluated in the background; never affects decisions
+    default_severity: PolicySeverity
+    rule_count: int
+
+
+class SystemPoliciesResponse(BaseSchema):
+    """Policies governing a system, by action."""
 
     system_id: str
+    policy_set_version: int
+    # Action -> policies; "*" holds the policies that apply to every action
+    actions: dict[str, list[EffectivePolicy]]
+
+
+class InlineControl(BaseSchema):
+    """A control's status on an inline system.
+
+    Catalog fields are not looked up; include the ones rules read.
+    """
+
+    id: str
+    status: ControlStatus = ControlStatus.PENDING
+    evidence_required: bool = True
+    name: str | None = None
+    category: ControlCategory | None = None
+    regulation: str | None = None
+    mandatory: bool = True
+
+
+class InlineSystem(SystemCreate):
+    """A system document evaluated without being registered."""
+
+    id: str | None = None
+    status: SystemStatus = SystemStatus.DRAFT
+    controls: list[InlineControl] = Field(default_factory=list)
+
+
+class PolicyEvaluateRequest(BaseSchema):
+    """Request schema for policy evaluation.
+
+    Exactly one of ``system_id`` (a registered system) and ``system``
+    (an inline system document) must be given.
+    """
+
+    system_id: str | None = None
+    system: InlineSystem | None = None
     action: str  # e.g., 'deploy', 'update', 'delete'
     context: dict[str, Any] = Field(default_factory=dict)
+    mode: EvaluationMode = EvaluationMode.FULL
+    timeout_ms: int | None = Field(default=None, ge=1, le=60_000)  # Deadline for the decision
+
+    @model_validator(mode="after")
+    def check_system(self) -> "PolicyEvaluateRequest":
+        """Require exactly one way of identifying the system."""
+        if (self.system_id is None) == (self.system is None):
+            raise ValueError("Provide exactly one of system_id and system")
+        return self
+
+    @property
+    def target_id(self) -> str | None:
+        """ID of the evaluated system; inline systems may have none."""
+        return self.system.id if self.system is not None else self.system_id
 
 
 class RuleResult(BaseSchema):
@@ -84,6 +157,8 @@ class RuleResult(BaseSchema):
     passed: bool
     message: str | None = None
     severity: PolicySeverity
+    error: str | None = None  # Set when the condition failed to evaluate
+    cost: int = 0  # Evaluation steps used
 
 
 class PolicyResult(BaseSchema):
@@ -99,11 +174,159 @@ class PolicyEvaluateResponse(BaseSchema):
     """Response schema for policy evaluation."""
 
     allowed: bool
-    system_id: str
+    system_id: str | None  # None for an inline system without an ID
     action: str
     policies_evaluated: int
     policies_passed: int
     policies_failed: int
-    results: list[PolicyResult]
+    results: list[PolicyResult] = Field(default_factory=list)  # Empty in summary mode
     blocking_failures: list[str]  # Messages from rules that blocked
     warnings: list[str]  # Messages from warning-severity rules
+    mode: EvaluationMode = EvaluationMode.FULL
+    cached: bool = False  # Served from the decision cache
+    cost: int = 0  # Evaluation steps used by all rules
+    degraded: bool = False  # Evaluation could not finish; see decision_age_ms
+    decision_age_ms: float | None = None  # Age of the last known decision served, if any
+
+    # The engine decision and the policy-set version it was evaluated
+    # against, for the decision log; copies served from caches keep it
+    _decision: tuple[Decision, int] | None = PrivateAttr(default=None)
+
+
+class PolicyScanResult(PolicyEvaluateResponse):
+    """One system's result in a fleet scan stream."""
+
+    type: Literal["result"] = "result"
+    system_name: str
+
+
+class PolicyScanSummary(BaseSchema):
+    """Final line of a fleet scan stream."""
+
+    type: Literal["summary"] = "summary"
+    action: str
+    scanned: int
+    allowed: int
+    denied: int
+    duration_ms: float
+
+
+class DecisionCacheStats(BaseSchema):
+    """Decision cache counters."""
+
+    enabled: bool
+    size: int
+    max_size: int
+    ttl_seconds: float
+    hits: int
+    misses: int
+    evictions: int
+    hit_ratio: float
+
+
+class ShadowPolicyStats(BaseSchema):
+    """Outcome counters for one shadow policy."""
+
+    policy_id: str
+    policy_name: str
+    evaluated: int
+    passed: int
+    failed: int
+    errors: int  # Evaluations where a rule raised an error
+    rule_failures: dict[str, int]  # Failures by rule name
+
+
+class ShadowPolicySample(BaseSchema):
+    """One shadow policy's outcome in a sampled decision record."""
+
+    policy_id: str
+    passed: bool
+    failed_rules: list[str]
+
+
+class ShadowDecisionSample(BaseSchema):
+    """A sampled shadow evaluation."""
+
+    system_id: str | None
+    action: str
+    recorded_at: datetime
+    policies: list[ShadowPolicySample]
+
+
+class ShadowStats(BaseSchema):
+    """Shadow policy outcomes on this worker."""
+
+    enabled: bool
+    submitted: int
+    dropped: int  # Not evaluated because the queue was full
+    evaluated: int
+    pending: int
+    policies: list[ShadowPolicyStats]
+    samples: list[ShadowDecisionSample]  # Oldest first
+
+
+class RuleTelemetry(BaseSchema):
+    """Outcome counters for one rule."""
+
+    rule_name: str
+    severity: PolicySeverity
+    evaluated: int
+    failed: int
+    errors: int  # Evaluations where the condition raised an error
+
+
+class PolicyLatency(BaseSchema):
+    """Distribution of a policy's evaluation time."""
+
+    count: int
+    total_ms: float
+    mean_ms: float
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    max_ms: float
+
+
+class PolicyTelemetry(BaseSchema):
+    """Outcome counters and evaluation time for one policy."""
+
+    policy_id: str
+    policy_name: str
+    shadow: bool
+    evaluated: int
+    passed: int
+    failed: int
+    rule_failures: dict[str, int]  # Rule failures by severity
+    latency: PolicyLatency
+    rules: list[RuleTelemetry]
+
+
+class PolicyTelemetryResponse(BaseSchema):
+    """Policy telemetry merged across workers."""
+
+    workers: int  # Workers whose counters are included
+    policies: list[PolicyTelemetry]  # Highest total evaluation time first
+
+
+class PolicyBatchEvaluateRequest(BaseSchema):
+    """Request schema for evaluating many system actions at once."""
+
+    items: list[PolicyEvaluateRequest] = Field(..., min_length=1, max_length=1000)
+
+
+class PolicyBatchItemResult(BaseSchema):
+    """Result for one item of a batch evaluation."""
+
+    index: int  # Position of the item in the request
+    system_id: str | None
+    action: str
+    result: PolicyEvaluateResponse | None = None
+    error: str | None = None  # Set instead of result when the item failed
+
+
+class PolicyBatchEvaluateResponse(BaseSchema):
+    """Response schema for batch policy evaluation."""
+
+    results: list[PolicyBatchItemResult]  # In request order
+    evaluated: int
+    errors: int
@@ -3,7 +3,7 @@
 from datetime import datetime
 from typing import Any
 
-from pydantic import Field, field_validator
+from pydantic import AliasChoices, Field, field_validator
 
 from vorpal.core.api.schemas.common import BaseSchema, PaginatedResponse
 from vorpal.core.models.system import RiskTier, SystemStatus, SystemType
@@ -18,7 +18,12 @@ class SystemBase(BaseSchema):
     risk_tier: RiskTier
     autonomy_level: int | None = Field(default=None, ge=1, le=5)
     version: str | None = None
-    metadata_: dict[str, Any] = Field(default_factory=dict, alias="metadata")
+    # ORM rows expose the column as `metadata_` (`metadata` is the SQLAlchemy MetaData)
+    metadata_: dict[str, Any] = Field(
+        default_factory=dict,
+        validation_alias=AliasChoices("metadata_", "metadata"),
+        serialization_alias="metadata",
+    )
     documentation: dict[str, Any] = Field(default_factory=dict)
     tags: list[str] = Field(default_factory=list)
 
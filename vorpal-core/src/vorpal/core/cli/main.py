@@ -1,6 +1,7 @@
 """Vorpal CLI main entry point."""
 
 import asyncio
+from datetime import datetime
 from typing import Optional
 
 import typer
@@ -251,6 +252,47 @@ def evaluate_policy(
         raise typer.Exit(1)
 
 
+@policies_app.command("decisions")
+def read_decisions(
+    api_url: str = typer.Option("http://localhost:8000", help="API base URL"),
+    directory: str | None = typer.Option(
+        None, "--dir", help="Read segment files from this directory instead of the API"
+    ),
+    since: datetime | None = typer.Option(None, help="Only decisions logged since this time"),
+    limit: int | None = typer.Option(None, min=1, help="Maximum number of decisions"),
+) -> None:
+    """Print logged decisions as NDJSON, oldest first."""
+    import json
+
+    import httpx
+
+    if directory is not None:
+        from vorpal.core.engine.decision_log import read_segments
+
+        for record in read_segments(directory, since, limit):
+            print(json.dumps(record, separators=(",", ":")))
+        return
+
+    params: dict[str, str] = {}
+    if since is not None:
+        params["since"] = since.isoformat()
+    if limit is not None:
+        params["limit"] = str(limit)
+
+    try:
+        with httpx.stream(
+            "GET", f"{api_url}/api/v1/policies/evaluate/decisions", params=params
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if line:
+                    print(line)
+
+    except httpx.HTTPError as e:
+        console.print(f"[red]Error: {e}[/red]")
+        raise typer.Exit(1)
+
+
 # Audit subcommand group
 audit_app = typer.Typer(help="Query audit logs")
 app.add_typer(audit_app, name="audit")
@@ -304,13 +346,20 @@ def list_audit(
 def verify_audit(
     api_url: str = typer.Option("http://localhost:8000", help="API base URL"),
     system_id: Optional[str] = typer.Option(None, help="Filter by system ID"),
+    full: bool = typer.Option(False, help="Re-verify every chain from its start"),
 ) -> None:
-    """Verify audit chain integrity."""
+    """Verify audit chain integrity.
+
+    Only events appended since the last verified checkpoints are checked
+    unless --full is given.
+    """
     import httpx
 
     params = {}
     if system_id:
         params["system_id"] = system_id
+    if full:
+        params["full"] = "true"
 
     try:
         response = httpx.get(f"{api_url}/api/v1/audit/verify/chain", params=params)
@@ -325,6 +374,8 @@ def verify_audit(
         console.print(f"\nTotal events: {data['total_events']}")
         console.print(f"Valid events: {data['valid_events']}")
         console.print(f"Invalid events: {data['invalid_events']}")
+        if data.get("incremental"):
+            console.print("Checked: events since the last verified checkpoints")
 
         if data.get("first_invalid_event_id"):
             console.print(f"\nFirst invalid event: {data['first_invalid_event_id']}")
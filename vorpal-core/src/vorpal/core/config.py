@@ -34,6 +34,37 @@ class Settings(BaseSettings):
     database_pool_size: int = 5
     database_max_overflow: int = 10
 
+    # Policy engine
+    policy_refresh_interval: float = 5.0  # seconds between policy-set version checks
+    decision_cache_size: int = 10000  # 0 disables the decision cache
+    decision_cache_ttl: float = 30.0  # seconds
+    degraded_decisions: bool = True  # serve the last known decision if evaluate cannot finish
+    degraded_max_age: float = 3600.0  # seconds; older last known decisions fail closed
+    residual_cache_size: int = 10000  # systems with partially evaluated rules; 0 disables
+    residual_cache_ttl: float = 30.0  # seconds
+    effective_policy_profiles: int = 10000  # system profiles with precomputed policy sets
+    rule_cost_budget: int = 100000  # estimated steps per rule allowed when saving; 0 disables
+    rule_cost_limit: int = 100000  # steps a rule may use per evaluation; 0 disables
+    evaluation_workers: int = 0  # processes for bulk evaluation; 0 evaluates inline
+    evaluation_chunk_size: int = 256  # evaluations per task sent to a worker
+    shadow_queue_size: int = 10000  # pending shadow evaluations; 0 disables shadow policies
+    shadow_sample_rate: float = 0.01  # fraction of shadow evaluations kept as records
+    shadow_sample_size: int = 1000  # most recent shadow decision records kept
+    decision_log_dir: str | None = None  # directory for decision log segments; None disables
+    decision_log_sample_rate: float = 1.0  # fraction of decisions logged
+    decision_log_buffer_size: int = 10000  # decisions buffered between flushes
+    decision_log_flush_interval: float = 1.0  # seconds between flushes
+    decision_log_segment_bytes: int = 64 * 1024 * 1024  # compressed size of a segment
+    decision_log_max_segments: int = 20  # segments kept; older ones are deleted
+    telemetry_publish_interval: float = 10.0  # seconds between telemetry publishes; 0 disables
+    telemetry_max_age: float = 60.0  # seconds; workers that published earlier are not aggregated
+    audit_batch_size: int = 100  # audit events written per transaction
+    audit_flush_interval: float = 0.005  # seconds to wait for a batch of audit events to fill
+    audit_queue_size: int = 10000  # audit events waiting to be written
+    audit_writers: int = 4  # audit batches written at once, across all chains
+    audit_verify_workers: int = 0  # processes for audit chain verification; 0 verifies inline
+    audit_verify_chunk_size: int = 5000  # audit events read and checked per chunk
+
     # Redis (optional)
     redis_url: RedisDsn | None = None
 
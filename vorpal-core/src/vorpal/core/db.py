@@ -1,9 +1,11 @@
 """Database connection and session management."""
 
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, AsyncIterator, Callable
 from contextlib import asynccontextmanager
 
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import (
+    AsyncConnection,
     AsyncEngine,
     AsyncSession,
     async_sessionmaker,
@@ -55,12 +57,64 @@ async def get_session_context() -> AsyncGenerator[AsyncSession, None]:
             raise
 
 
+async def session_stream(
+    lines: Callable[..., AsyncIterator[str]], *args: object
+) -> AsyncIterator[str]:
+    """Yield the lines of ``lines(session, *args)`` from a session of their own.
+
+    For streamed response bodies, which are produced after the endpoint
+    returns, outside the request-scoped session.
+    """
+    async with get_session_context() as session:
+        async for line in lines(session, *args):
+            yield line
+
+
+# Changes to existing tables, which create_all does not make; each is idempotent
+_UPGRADES = (
+    # Per-system audit chains. Events written before them form a single
+    # chain in timestamp order; they become the start of the global
+    # chain, so their hashes and links still verify.
+    "ALTER TABLE audit_events ADD COLUMN IF NOT EXISTS chain_id VARCHAR(36)",
+    "ALTER TABLE audit_events ADD COLUMN IF NOT EXISTS sequence BIGINT",
+    """
+    UPDATE audit_events SET chain_id = 'global', sequence = numbered.sequence
+    FROM (
+        SELECT id, row_number() OVER (ORDER BY timestamp) AS sequence
+        FROM audit_events WHERE chain_id IS NULL
+    ) AS numbered
+    WHERE audit_events.id = numbered.id
+    """,
+    "ALTER TABLE audit_events ALTER COLUMN chain_id SET NOT NULL",
+    "ALTER TABLE audit_events ALTER COLUMN sequence SET NOT NULL",
+    """
+    DO $$ BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'uq_audit_chain_sequence') THEN
+            ALTER TABLE audit_events
+                ADD CONSTRAINT uq_audit_chain_sequence UNIQUE (chain_id, sequence);
+        END IF;
+    END $$
+    """,
+    # Time-ordered scans across all chains
+    "CREATE INDEX IF NOT EXISTS idx_audit_timestamp ON audit_events (timestamp)",
+    # Shadow policies; existing policies keep blocking
+    "ALTER TABLE policies ADD COLUMN IF NOT EXISTS shadow BOOLEAN NOT NULL DEFAULT false",
+)
+
+
 async def init_db() -> None:
-    """Initialize database (create tables if needed)."""
+    """Initialize database (create tables if needed, then upgrade existing ones)."""
     from vorpal.core.models import Base
 
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await upgrade_db(conn)
+
+
+async def upgrade_db(conn: AsyncConnection) -> None:
+    """Bring tables created by an earlier version up to the current models."""
+    for statement in _UPGRADES:
+        await conn.execute(text(statement))
 
 
 async def close_db() -> None:
@@ -0,0 +1,17 @@
+"""Policy engine: CEL rule compilation and evaluation."""
+
+from vorpal.core.engine.cel import CelError, CelEvaluationError, CelSyntaxError, parse
+from vorpal.core.engine.compiler import Program, compile_expression
+from vorpal.core.engine.programs import ProgramCache, evaluate_rule, program_cache
+
+__all__ = [
+    "CelError",
+    "CelEvaluationError",
+    "CelSyntaxError",
+    "parse",
+    "Program",
+    "compile_expression",
+    "ProgramCache",
+    "evaluate_rule",
+    "program_cache",
+]
@@ -0,0 +1,164 @@
+"""Build rule evaluation inputs from registry models."""
+
+from collections.abc import Collection, Mapping
+from enum import Enum
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
+
+from vorpal.core.engine.cel import Ident, Index, Literal, Node, Select, children
+from vorpal.core.models.control import SystemControl
+from vorpal.core.models.system import AISystem
+from vorpal.core.models.user import Team, User
+
+# Related data a rule can read from ``system`` beyond the row's own columns
+CONTROLS = "controls"
+TEAM = "team"
+OWNER = "owner"
+RELATIONS = frozenset({CONTROLS, TEAM, OWNER})
+
+
+def _enum_value(value: Any) -> Any:
+    """Enum columns are stored as strings; normalise either form to the raw value."""
+    return value.value if isinstance(value, Enum) else value
+
+
+def system_activation(system: AISystem) -> dict[str, Any]:
+    """Convert an AI system row into the ``system`` variable seen by rules.
+
+    Only the row's own columns are included; related data is added by
+    ``load_relations`` for the rules that need it.
+    """
+    return {
+        "id": system.id,
+        "name": system.name,
+        "description": system.description,
+        "type": _enum_value(system.type),
+        "status": _enum_value(system.status),
+        "risk_tier": _enum_value(system.risk_tier),
+        "autonomy_level": system.autonomy_level,
+        "owner_id": system.owner_id,
+        "team_id": system.team_id,
+        "version": system.version,
+        "metadata": system.metadata_ or {},
+        "documentation": system.documentation or {},
+        "tags": system.tags or [],
+    }
+
+
+def required_relations(ast: Node) -> frozenset[str]:
+    """Relations a rule reads from ``system``.
+
+    ``system.controls`` and ``system["controls"]`` are recognised; any
+    other use of ``system`` as a whole (passing it to a function,
+    indexing it with a computed key, ...) conservatively requires every
+    relation.
+    """
+    if isinstance(ast, Ident) and ast.name == "system":
+        return RELATIONS
+    if isinstance(ast, Select) and isinstance(ast.operand, Ident) and ast.operand.name == "system":
+        return RELATIONS & {ast.field}
+    if (
+        isinstance(ast, Index)
+        and isinstance(ast.operand, Ident)
+        and ast.operand.name == "system"
+        and isinstance(ast.index, Literal)
+        and ast.index.kind == "string"
+    ):
+        return RELATIONS & {ast.index.value}
+
+    needed: frozenset[str] = frozenset()
+    for child in children(ast):
+        needed |= required_relations(child)
+    return needed
+
+
+def _control_activation(system_control: SystemControl) -> dict[str, Any]:
+    control = system_control.control
+    return {
+        "id": system_control.control_id,
+        "name": control.name,
+        "category": _enum_value(control.category),
+        "regulation": control.regulation,
+        "mandatory": control.mandatory,
+        "status": _enum_value(system_control.status),
+        "evidence_required": system_control.evidence_required,
+    }
+
+
+def _team_activation(team: Team) -> dict[str, Any]:
+    return {
+        "id": team.id,
+        "name": team.name,
+        "settings": team.settings or {},
+        "is_active": team.is_active,
+    }
+
+
+def _owner_activation(user: User) -> dict[str, Any]:
+    return {
+        "id": user.id,
+        "name": user.name,
+        "email": user.email,
+        "role": user.role,
+        "is_active": user.is_active,
+    }
+
+
+async def load_relations(
+    session: AsyncSession,
+    systems: Mapping[str, Mapping[str, Any]],
+    needs: Mapping[str, Collection[str]],
+) -> dict[str, dict[str, Any]]:
+    """Load the related data each system's matching rules need.
+
+    Each relation is fetched with one query covering every system that
+    needs it, so evaluating many systems never issues a query per system.
+
+    Args:
+        session: Database session.
+        systems: ``system`` activations by system ID.
+        needs: Relations required, by system ID. Systems that need
+            nothing can be omitted.
+
+    Returns:
+        Extra activation fields by system ID, to merge into ``systems``.
+    """
+    wanted: dict[str, set[str]] = {name: set() for name in RELATIONS}
+    for system_id, relations in needs.items():
+        for name in relations:
+            wanted[name].add(system_id)
+
+    extra: dict[str, dict[str, Any]] = {system_id: {} for system_id in needs}
+
+    if wanted[CONTROLS]:
+        for system_id in wanted[CONTROLS]:
+            extra[system_id][CONTROLS] = []
+        result = await session.execute(
+            select(SystemControl)
+            .where(SystemControl.system_id.in_(wanted[CONTROLS]))
+            .options(joinedload(SystemControl.control))
+            .order_by(SystemControl.system_id, SystemControl.control_id)
+        )
+        for system_control in result.scalars():
+            extra[system_control.system_id][CONTROLS].append(_control_activation(system_control))
+
+    if wanted[TEAM]:
+        team_ids = {systems[s]["team_id"] for s in wanted[TEAM]} - {None}
+        teams: dict[str, dict[str, Any]] = {}
+        if team_ids:
+            team_rows = await session.execute(select(Team).where(Team.id.in_(team_ids)))
+            teams = {team.id: _team_activation(team) for team in team_rows.scalars()}
+        for system_id in wanted[TEAM]:
+            extra[system_id][TEAM] = teams.get(systems[system_id]["team_id"])
+
+    if wanted[OWNER]:
+        owner_ids = {systems[s]["owner_id"] for s in wanted[OWNER]}
+        owner_rows = await session.execute(select(User).where(User.id.in_(owner_ids)))
+        owners = {user.id: _owner_activation(user) for user in owner_rows.scalars()}
+        for system_id in wanted[OWNER]:
+            extra[system_id][OWNER] = owners.get(systems[system_id]["owner_id"])
+
+    return extra
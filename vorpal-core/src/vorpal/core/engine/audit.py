@@ -0,0 +1,326 @@
+"""Group-commit appends to the audit hash chains.
+
+Events are partitioned into chains, one per AI system plus a global
+chain for events without a system. Callers enqueue events and wait
+until they are committed. Each chain with pending events has a single
+writer task that drains its queue in batches of up to ``batch_size``
+events, waiting ``flush_interval`` seconds for a batch to fill when the
+queue runs dry. Each batch is written in one transaction: the writer
+takes a transaction-scoped advisory lock on the chain, reads the chain
+head once, numbers, links and hashes the events in order and inserts
+them with one multi-row INSERT. The lock keeps a chain linear when
+several API workers append to it at once, and the head is read once per
+batch rather than once per event. Writers of different chains run in
+parallel, at most ``max_writers`` at a time so that a burst across many
+systems does not take every database connection; a writer waiting for
+its turn keeps collecting events into its next batch.
+
+Event timestamps are taken when an event is enqueued and kept strictly
+increasing along each chain.
+"""
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Any, cast
+from uuid import uuid4
+
+from sqlalchemy import Table, func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from vorpal.core.config import get_settings
+from vorpal.core.models.audit import GLOBAL_CHAIN, ActorType, AuditEvent
+
+logger = logging.getLogger(__name__)
+
+# Advisory lock class for chain appends; the chain ID is hashed into the second key
+CHAIN_LOCK_CLASS = 0x766F7270  # "vorp"
+
+# Smallest timestamp step Postgres stores
+_TICK = timedelta(microseconds=1)
+
+
+def chain_of(system_id: str | None) -> str:
+    """The chain an event for a system belongs to."""
+    return system_id or GLOBAL_CHAIN
+
+
+@dataclass(slots=True)
+class _Pending:
+    values: dict[str, Any]
+    future: asyncio.Future[dict[str, Any]]
+    settled: bool = False
+
+
+class AuditWriter:
+    """Appends audit events to their hash chains in batches.
+
+    Args:
+        batch_size: Most events written per transaction.
+        flush_interval: Seconds to wait for more events before writing
+            a batch that is not full; 0 writes whatever is queued.
+        queue_size: Events waiting to be written across all chains;
+            appends wait for room once it is full.
+        max_writers: Most batches written at once, across all chains.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 100,
+        flush_interval: float = 0.005,
+        queue_size: int = 10_000,
+        max_writers: int = 4,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue_size = queue_size
+        self.max_writers = max_writers
+        self._session_factory: async_sessionmaker[AsyncSession] | None = None
+        self._slots: asyncio.Semaphore | None = None
+        self._turns: asyncio.Semaphore | None = None
+        self._queues: dict[str, asyncio.Queue[_Pending]] = {}
+        self._writers: dict[str, asyncio.Task[None]] = {}
+        self.appended = 0
+        self.batches = 0
+        self.failed = 0
+
+    @property
+    def pending(self) -> int:
+        return sum(queue.qsize() for queue in self._queues.values())
+
+    async def append(
+        self,
+        *,
+        event_type: str,
+        action: str,
+        actor_type: ActorType | str,
+        system_id: str | None = None,
+        actor_id: str | None = None,
+        actor_name: str | None = None,
+        resource_type: str | None = None,
+        resource_id: str | None = None,
+        details: dict[str, Any] | None = None,
+        ip_address: str | None = None,
+        user_agent: str | None = None,
+        request_id: str | None = None,
+    ) -> dict[str, Any]:
+        """Append an event to the chain of its system.
+
+        Returns:
+            The column values of the committed event, including its ID,
+            chain position, timestamp and hashes.
+
+        Raises:
+            RuntimeError: If the writer is not running.
+            IntegrityError: If the event references an unknown system.
+        """
+        if self._slots is None:
+            raise RuntimeError("The audit writer is not running")
+        await self._slots.acquire()
+        if self._session_factory is None or self._turns is None:  # Stopped while waiting
+            self._slots.release()
+            raise RuntimeError("The audit writer is not running")
+
+        chain = chain_of(system_id)
+        pending = _Pending(
+            {
+                "chain_id": chain,
+                "system_id": system_id,
+                "event_type": event_type,
+                "actor_id": actor_id,
+                "actor_type": ActorType(actor_type).value,
+                "actor_name": actor_name,
+                "action": action,
+                "resource_type": resource_type,
+                "resource_id": resource_id,
+                "details": details or {},
+                "ip_address": ip_address,
+                "user_agent": user_agent,
+                "request_id": request_id,
+                "timestamp": datetime.now(UTC),
+            },
+            asyncio.get_running_loop().create_future(),
+        )
+        queue = self._queues.get(chain)
+        if queue is None:
+            queue = self._queues[chain] = asyncio.Queue()
+        queue.put_nowait(pending)
+        if chain not in self._writers:
+            self._writers[chain] = asyncio.create_task(
+                self._run(chain, queue, self._session_factory, self._turns)
+            )
+        return await pending.future
+
+    @contextlib.asynccontextmanager
+    async def running(
+        self, session_factory: async_sessionmaker[AsyncSession]
+    ) -> AsyncIterator[None]:
+        """Accept and write events for the duration of the context.
+
+        Events queued when the context exits are written before it returns.
+        """
+        self._session_factory = session_factory
+        self._slots = asyncio.Semaphore(self.queue_size)
+        self._turns = asyncio.Semaphore(max(self.max_writers, 1))
+        try:
+            yield
+        finally:
+            self._session_factory = None
+            while self._writers:
+                await asyncio.wait(list(self._writers.values()))
+            self._slots = None
+            self._turns = None
+
+    async def _run(
+        self,
+        chain: str,
+        queue: asyncio.Queue[_Pending],
+        session_factory: async_sessionmaker[AsyncSession],
+        turns: asyncio.Semaphore,
+    ) -> None:
+        # Write the chain's queued events, then exit until more arrive
+        try:
+            while not queue.empty():
+                if queue.qsize() < self.batch_size and self.flush_interval > 0:
+                    await asyncio.sleep(self.flush_interval)
+                async with turns:
+                    batch = _drain(queue, [], self.batch_size)
+                    await self._commit(chain, batch, session_factory)
+        finally:
+            del self._writers[chain]
+            del self._queues[chain]
+            if not queue.empty():  # Cancelled with events still queued
+                self._fail(
+                    _drain(queue, [], queue.qsize()), RuntimeError("The audit writer stopped")
+                )
+
+    async def _commit(
+        self,
+        chain: str,
+        batch: list[_Pending],
+        session_factory: async_sessionmaker[AsyncSession],
+    ) -> None:
+        try:
+            written = await self._insert(chain, batch, session_factory)
+        except IntegrityError as e:
+            if len(batch) == 1:
+                self._fail(batch, e)
+                return
+            # Write the events one by one so only the offending ones fail
+            for pending in batch:
+                if not pending.settled:
+                    await self._commit(chain, [pending], session_factory)
+            return
+        except Exception as e:
+            logger.exception("Failed to append audit events to chain %s", chain)
+            self._fail(batch, e)
+            return
+
+        self.batches += 1
+        self.appended += len(written)
+        for pending, row in written:
+            self._settle(pending, row)
+
+    async def _insert(
+        self,
+        chain: str,
+        batch: list[_Pending],
+        session_factory: async_sessionmaker[AsyncSession],
+    ) -> list[tuple[_Pending, dict[str, Any]]]:
+        async with session_factory() as session, session.begin():
+            await session.execute(
+                select(func.pg_advisory_xact_lock(CHAIN_LOCK_CLASS, func.hashtext(chain)))
+            )
+            head = (
+                await session.execute(
+                    select(AuditEvent.event_hash, AuditEvent.timestamp, AuditEvent.sequence)
+                    .where(AuditEvent.chain_id == chain)
+                    .order_by(AuditEvent.sequence.desc())
+                    .limit(1)
+                )
+            ).first()
+            previous_hash, last, sequence = head if head else (None, None, 0)
+
+            written: list[tuple[_Pending, dict[str, Any]]] = []
+            for pending in batch:
+                if pending.settled:
+                    continue
+                values = pending.values
+                timestamp = values["timestamp"]
+                if last is not None and timestamp <= last:
+                    timestamp = last + _TICK
+                event_id = str(uuid4())
+                try:
+                    event_hash = AuditEvent.compute_hash(
+                        event_id=event_id,
+                        event_type=values["event_type"],
+                        action=values["action"],
+                        actor_id=values["actor_id"],
+                        resource_type=values["resource_type"],
+                        resource_id=values["resource_id"],
+                        details=values["details"],
+                        timestamp=timestamp,
+                        previous_hash=previous_hash,
+                    )
+                except (TypeError, ValueError) as e:
+                    self._fail([pending], e)  # Details that are not JSON
+                    continue
+                sequence += 1
+                row = {
+                    **values,
+                    "id": event_id,
+                    "sequence": sequence,
+                    "timestamp": timestamp,
+                    "previous_hash": previous_hash,
+                    "event_hash": event_hash,
+                }
+                written.append((pending, row))
+                previous_hash, last = event_hash, timestamp
+
+            if written:
+                # With RETURNING, the rows are sent as a single multi-row INSERT
+                table = cast(Table, AuditEvent.__table__)
+                await session.execute(
+                    insert(table).returning(table.c.id), [row for _, row in written]
+                )
+        return written
+
+    def _settle(self, pending: _Pending, outcome: dict[str, Any] | BaseException) -> None:
+        if pending.settled:
+            return
+        pending.settled = True
+        if self._slots is not None:
+            self._slots.release()
+        if pending.future.done():  # The caller stopped waiting
+            return
+        if isinstance(outcome, BaseException):
+            pending.future.set_exception(outcome)
+        else:
+            pending.future.set_result(outcome)
+
+    def _fail(self, batch: list[_Pending], error: BaseException) -> None:
+        for pending in batch:
+            if not pending.settled:
+                self.failed += 1
+                self._settle(pending, error)
+
+
+def _drain(queue: asyncio.Queue[_Pending], batch: list[_Pending], limit: int) -> list[_Pending]:
+    # Move queued events into the batch, up to limit events in all
+    while len(batch) < limit and not queue.empty():
+        batch.append(queue.get_nowait())
+    return batch
+
+
+# Process-wide audit writer
+_settings = get_settings()
+audit_writer = AuditWriter(
+    batch_size=_settings.audit_batch_size,
+    flush_interval=_settings.audit_flush_interval,
+    queue_size=_settings.audit_queue_size,
+    max_writers=_settings.audit_writers,
+)
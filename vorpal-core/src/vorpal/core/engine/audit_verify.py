@@ -0,0 +1,457 @@
+"""Streaming, parallel verification of the audit hash chains.
+
+Events are read in ``(chain_id, sequence)`` order in keyset chunks,
+each chunk through a server-side cursor, selecting only the columns an
+event's hash covers. The verifier keeps just the previous event, so
+memory use does not depend on the number of events verified, and a
+verification can resume after any event.
+
+Hashing is CPU-bound. Each chunk's hashes and the links between its own
+events are checked independently, inline or on worker processes; the
+coordinator then stitches the chunks together by checking each chunk's
+first event against the last event of the chunk before it.
+
+Whole chains are verified from checkpoints: a chain verified without
+error records its last event and hash, and later verifications trust it
+up to that event, checking only the events appended since, linked to
+the recorded hash. A full verification reads every chain from its start
+instead, still checking each checkpoint against the event it names.
+"""
+
+import asyncio
+import itertools
+import logging
+from collections import deque
+from collections.abc import AsyncIterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Any, NamedTuple
+
+from sqlalchemy import func, select, text, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from vorpal.core.config import get_settings
+from vorpal.core.engine.executor import spawn_pool, stop_pool
+from vorpal.core.models.audit import AuditCheckpoint, AuditEvent
+
+logger = logging.getLogger(__name__)
+
+# Events read per keyset chunk
+CHUNK_SIZE = 5000
+
+# Checkpoints written per statement
+_CHECKPOINT_BATCH = 1000
+
+# Distinct chain IDs, skipping from one chain to the next on the
+# (chain_id, sequence) index rather than scanning every event
+_CHAIN_IDS = text(
+    """
+    WITH RECURSIVE chains AS (
+        (SELECT chain_id FROM audit_events ORDER BY chain_id LIMIT 1)
+        UNION ALL
+        SELECT (
+            SELECT e.chain_id FROM audit_events e
+            WHERE e.chain_id > chains.chain_id
+            ORDER BY e.chain_id LIMIT 1
+        )
+        FROM chains WHERE chains.chain_id IS NOT NULL
+    )
+    SELECT chain_id FROM chains WHERE chain_id IS NOT NULL
+    """
+)
+
+
+class ChainEvent(NamedTuple):
+    """The columns of an audit event that verification reads."""
+
+    id: str
+    chain_id: str
+    sequence: int
+    event_type: str
+    action: str
+    actor_id: str | None
+    resource_type: str | None
+    resource_id: str | None
+    details: dict[str, Any]
+    timestamp: datetime
+    previous_hash: str | None
+    event_hash: str
+
+
+_COLUMNS = [getattr(AuditEvent, name) for name in ChainEvent._fields]
+
+
+def event_hash(event: ChainEvent) -> str:
+    """The hash of an event's content."""
+    return AuditEvent.compute_hash(
+        event_id=event.id,
+        event_type=event.event_type,
+        action=event.action,
+        actor_id=event.actor_id,
+        resource_type=event.resource_type,
+        resource_id=event.resource_id,
+        details=event.details,
+        timestamp=event.timestamp,
+        previous_hash=event.previous_hash,
+    )
+
+
+def follows(previous: ChainEvent | None, event: ChainEvent, mid_chain: bool = False) -> bool:
+    """Whether an event correctly continues from the event read before it.
+
+    Args:
+        previous: The event read before, if any.
+        event: The event to check.
+        mid_chain: Whether reading may start a chain part-way, as with a
+            from date; the first event read of a chain is then not checked.
+    """
+    if previous is None or previous.chain_id != event.chain_id:
+        return mid_chain or (event.sequence == 1 and event.previous_hash is None)
+    return event.sequence == previous.sequence + 1 and event.previous_hash == previous.event_hash
+
+
+class ChunkCheck(NamedTuple):
+    """Outcome of checking one chunk on its own.
+
+    The first event's link to the chunk before it is left to the caller;
+    the counts cover the events after the first.
+    """
+
+    first_hash_valid: bool
+    valid_events: int
+    invalid_events: int
+    first_invalid_event_id: str | None
+
+
+def check_chunk(events: Sequence[ChainEvent], mid_chain: bool = False) -> ChunkCheck:
+    """Check a chunk's hashes and the links between its events."""
+    valid = invalid = 0
+    first_invalid = None
+    for previous, event in itertools.pairwise(events):
+        if follows(previous, event, mid_chain) and event_hash(event) == event.event_hash:
+            valid += 1
+        else:
+            invalid += 1
+            first_invalid = first_invalid or event.id
+    first = events[0]
+    return ChunkCheck(event_hash(first) == first.event_hash, valid, invalid, first_invalid)
+
+
+def _check_rows(rows: list[tuple[Any, ...]], mid_chain: bool) -> ChunkCheck:
+    # Runs in a worker process; plain tuples pickle at half the cost of ChainEvents
+    return check_chunk([ChainEvent._make(row) for row in rows], mid_chain)
+
+
+class ChainVerifier:
+    """Verifies chunks of events fed in ``(chain_id, sequence)`` order.
+
+    Args:
+        previous: The event to continue from when resuming.
+        mid_chain: Whether reading may start a chain part-way.
+    """
+
+    def __init__(self, previous: ChainEvent | None = None, mid_chain: bool = False):
+        self.previous = previous
+        self.mid_chain = mid_chain
+        self.total_events = 0
+        self.valid_events = 0
+        self.invalid_events = 0
+        self.first_invalid_event_id: str | None = None
+
+    @property
+    def verified(self) -> bool:
+        return self.invalid_events == 0
+
+    def feed(self, events: Sequence[ChainEvent], check: ChunkCheck | None = None) -> None:
+        """Add a chunk of events that follows those already fed.
+
+        Args:
+            events: The chunk, in order.
+            check: The chunk's ``check_chunk`` outcome, if already computed.
+        """
+        if not events:
+            return
+        if check is None:
+            check = check_chunk(events, self.mid_chain)
+        first = events[0]
+        first_valid = check.first_hash_valid and follows(self.previous, first, self.mid_chain)
+
+        self.total_events += len(events)
+        self.valid_events += first_valid + check.valid_events
+        self.invalid_events += (not first_valid) + check.invalid_events
+        if self.first_invalid_event_id is None:
+            self.first_invalid_event_id = check.first_invalid_event_id if first_valid else first.id
+        self.previous = events[-1]
+
+    def reject(self, event_id: str) -> None:
+        """Count an event found invalid outside the chunks fed."""
+        self.total_events += 1
+        self.invalid_events += 1
+        if self.first_invalid_event_id is None:
+            self.first_invalid_event_id = event_id
+
+    def progress(self) -> dict[str, Any]:
+        """Counters so far and the last event checked."""
+        return {
+            "total_events": self.total_events,
+            "valid_events": self.valid_events,
+            "invalid_events": self.invalid_events,
+            "first_invalid_event_id": self.first_invalid_event_id,
+            "last_event_id": self.previous.id if self.previous else None,
+        }
+
+    def result(self) -> dict[str, Any]:
+        """The outcome, as the fields of an ``AuditChainVerification``."""
+        if self.total_events == 0:
+            message = "No events to verify"
+        elif self.verified:
+            message = "Audit chain integrity verified"
+        else:
+            message = f"Chain integrity compromised: {self.invalid_events} invalid events"
+        return {**self.progress(), "verified": self.verified, "message": message}
+
+
+async def load_event(session: AsyncSession, event_id: str) -> ChainEvent | None:
+    """The verified columns of one event."""
+    row = (await session.execute(select(*_COLUMNS).where(AuditEvent.id == event_id))).first()
+    return ChainEvent._make(row) if row else None
+
+
+async def read_chunks(
+    session: AsyncSession,
+    chain_id: str | None = None,
+    from_date: datetime | None = None,
+    to_date: datetime | None = None,
+    after: ChainEvent | None = None,
+    chunk_size: int = CHUNK_SIZE,
+) -> AsyncIterator[list[ChainEvent]]:
+    """Yield events in ``(chain_id, sequence)`` order, a chunk at a time.
+
+    Args:
+        session: Session to read with.
+        chain_id: Read only this chain.
+        from_date: Read only events at or after this time.
+        to_date: Read only events at or before this time.
+        after: Start after this event.
+        chunk_size: Events per chunk.
+    """
+    query = select(*_COLUMNS).order_by(AuditEvent.chain_id, AuditEvent.sequence)
+    if chain_id:
+        query = query.where(AuditEvent.chain_id == chain_id)
+    if from_date:
+        query = query.where(AuditEvent.timestamp >= from_date)
+    if to_date:
+        query = query.where(AuditEvent.timestamp <= to_date)
+
+    position = (after.chain_id, after.sequence) if after else None
+    while True:
+        chunk_query = query.limit(chunk_size)
+        if position is not None:
+            chunk_query = chunk_query.where(
+                tuple_(AuditEvent.chain_id, AuditEvent.sequence) > tuple_(*position)
+            )
+        result = await session.stream(chunk_query)
+        chunk = [ChainEvent._make(row) async for row in result]
+        if not chunk:
+            return
+        yield chunk
+        if len(chunk) < chunk_size:
+            return
+        position = (chunk[-1].chain_id, chunk[-1].sequence)
+
+
+async def chain_ids(session: AsyncSession) -> list[str]:
+    """IDs of every chain that has events, in order."""
+    return list((await session.execute(_CHAIN_IDS)).scalars())
+
+
+def _anchor(checkpoint: AuditCheckpoint) -> ChainEvent:
+    # Stands in for the checkpointed event; follows() reads only its
+    # chain, sequence and hash
+    return ChainEvent(
+        id=checkpoint.event_id,
+        chain_id=checkpoint.chain_id,
+        sequence=checkpoint.sequence,
+        event_type="",
+        action="",
+        actor_id=None,
+        resource_type=None,
+        resource_id=None,
+        details={},
+        timestamp=checkpoint.verified_at,
+        previous_hash=None,
+        event_hash=checkpoint.event_hash,
+    )
+
+
+async def save_checkpoints(session: AsyncSession, events: Sequence[ChainEvent]) -> None:
+    """Record each event as the last verified event of its chain.
+
+    A checkpoint never moves back to an earlier event, so concurrent
+    verifications may finish in any order.
+    """
+    for start in range(0, len(events), _CHECKPOINT_BATCH):
+        stmt = insert(AuditCheckpoint).values(
+            [
+                {
+                    "chain_id": event.chain_id,
+                    "event_id": event.id,
+                    "sequence": event.sequence,
+                    "event_hash": event.event_hash,
+                }
+                for event in events[start : start + _CHECKPOINT_BATCH]
+            ]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[AuditCheckpoint.chain_id],
+            set_={
+                "event_id": stmt.excluded.event_id,
+                "sequence": stmt.excluded.sequence,
+                "event_hash": stmt.excluded.event_hash,
+                "verified_at": func.now(),
+            },
+            where=AuditCheckpoint.sequence < stmt.excluded.sequence,
+        )
+        await session.execute(stmt)
+
+
+class VerificationExecutor:
+    """Checks chunks of events inline or across a pool of worker processes.
+
+    Args:
+        workers: Worker processes; 0 checks every chunk inline.
+        chunk_size: Events read and checked per chunk. Verifications that
+            fit in a single chunk are checked inline, where pickling would
+            cost more than it saves.
+    """
+
+    def __init__(self, workers: int = 0, chunk_size: int = CHUNK_SIZE):
+        self.workers = workers
+        self.chunk_size = max(1, chunk_size)
+        self._pool: ProcessPoolExecutor | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            logger.info("Starting %d audit verification workers", self.workers)
+            self._pool = spawn_pool(self.workers)
+        return self._pool
+
+    async def verify(
+        self, chunks: AsyncIterator[list[ChainEvent]], verifier: ChainVerifier
+    ) -> AsyncIterator[ChainVerifier]:
+        """Feed every chunk to the verifier, yielding it after each chunk.
+
+        With workers, up to two chunks per worker are checked while the
+        next are read; chunks are still fed to the verifier in order.
+        """
+        if not self.enabled:
+            async for chunk in chunks:
+                verifier.feed(chunk)
+                yield verifier
+            return
+
+        loop = asyncio.get_running_loop()
+        in_flight: deque[tuple[list[ChainEvent], asyncio.Future[ChunkCheck]]] = deque()
+
+        async def stitch() -> None:
+            chunk, checking = in_flight.popleft()
+            try:
+                check = await checking
+            except BrokenProcessPool:
+                logger.exception("Audit verification worker died; checking inline")
+                self.shutdown()
+                check = check_chunk(chunk, verifier.mid_chain)
+            verifier.feed(chunk, check)
+
+        async for chunk in chunks:
+            if not in_flight and len(chunk) < self.chunk_size:
+                # The last chunk with nothing ahead of it; not worth shipping
+                verifier.feed(chunk)
+                yield verifier
+                continue
+            rows = [tuple(event) for event in chunk]
+            checking = loop.run_in_executor(self._get_pool(), _check_rows, rows, verifier.mid_chain)
+            in_flight.append((chunk, checking))
+            while in_flight and (len(in_flight) > 2 * self.workers or in_flight[0][1].done()):
+                await stitch()
+                yield verifier
+        while in_flight:
+            await stitch()
+            yield verifier
+
+    async def verify_chains(
+        self,
+        session: AsyncSession,
+        verifier: ChainVerifier,
+        chain_id: str | None = None,
+        full: bool = False,
+    ) -> AsyncIterator[ChainVerifier]:
+        """Verify whole chains from their checkpoints, yielding after each chunk.
+
+        Each chain is read after its checkpoint, its first new event
+        linked to the recorded hash; chains without one are read from
+        their start. A checkpoint whose event is gone or no longer
+        matches it counts as an invalid event. The checkpoints of chains
+        with new events and no invalid ones are moved to their last event.
+
+        Args:
+            session: Session to read and record checkpoints with.
+            verifier: Verifier to feed; it must not start mid-chain.
+            chain_id: Verify only this chain.
+            full: Read every chain from its start.
+        """
+        chains = [chain_id] if chain_id else await chain_ids(session)
+        query = select(AuditCheckpoint, *_COLUMNS).outerjoin(
+            AuditEvent, AuditEvent.id == AuditCheckpoint.event_id
+        )
+        if chain_id:
+            query = query.where(AuditCheckpoint.chain_id == chain_id)
+        checkpoints = {row[0].chain_id: row for row in (await session.execute(query)).all()}
+
+        verified: list[ChainEvent] = []
+        for chain in chains:
+            anchor = None
+            invalid = verifier.invalid_events
+            if chain in checkpoints:
+                checkpoint, *columns = checkpoints[chain]
+                event = ChainEvent._make(columns) if columns[0] is not None else None
+                intact = (
+                    event is not None
+                    and event.sequence == checkpoint.sequence
+                    and event.event_hash == checkpoint.event_hash
+                )
+                if not full:
+                    # Its own hash is checked here; a full read checks it in its chunk
+                    intact = intact and event is not None and event_hash(event) == event.event_hash
+                    anchor = _anchor(checkpoint)
+                if not intact:
+                    verifier.reject(checkpoint.event_id)
+
+            verifier.previous = anchor
+            chunks = read_chunks(session, chain_id=chain, after=anchor, chunk_size=self.chunk_size)
+            async for _ in self.verify(chunks, verifier):
+                yield verifier
+            last = verifier.previous
+            if verifier.invalid_events == invalid and last is not None and last is not anchor:
+                verified.append(last)
+        await save_checkpoints(session, verified)
+
+    def shutdown(self) -> None:
+        """Stop the worker processes; a later verification starts new ones."""
+        if self._pool is not None:
+            stop_pool(self._pool)
+            self._pool = None
+
+
+# Process-wide verification executor
+_settings = get_settings()
+verification_executor = VerificationExecutor(
+    workers=_settings.audit_verify_workers,
+    chunk_size=_settings.audit_verify_chunk_size,
+)
@@ -0,0 +1,509 @@
+"""Parser for the CEL (Common Expression Language) subset used in policy rules.
+
+Conditions are parsed once into an immutable syntax tree which the
+compiler turns into Python closures. The tree nodes are frozen
+dataclasses, so structurally identical expressions compare and hash
+equal.
+"""
+
+from __future__ import annotations
+
+import re
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any
+
+# Maximum nesting of parentheses, arguments and unary operators accepted by the parser
+MAX_DEPTH = 64
+
+# Maximum height of a syntax tree; long operator and field chains nest
+# as deeply as parentheses in the compiler and evaluator
+MAX_HEIGHT = 128
+
+# Macros that bind a variable over a list or map
+COMPREHENSIONS = frozenset({"all", "exists", "exists_one", "map", "filter"})
+
+
+class CelError(Exception):
+    """Base exception for CEL errors."""
+
+
+class CelSyntaxError(CelError):
+    """Raised when an expression cannot be parsed or checked."""
+
+    def __init__(self, message: str, position: int | None = None):
+        if position is not None:
+            message = f"{message} (at offset {position})"
+        super().__init__(message)
+        self.position = position
+
+
+class CelEvaluationError(CelError):
+    """Raised when an expression fails at evaluation time."""
+
+
+# ---------------------------------------------------------------------------
+# Syntax tree
+# ---------------------------------------------------------------------------
+
+
+class Node:
+    """Base class for syntax tree nodes."""
+
+    __slots__ = ()
+
+
+@dataclass(frozen=True, slots=True)
+class Literal(Node):
+    """A constant value.
+
+    ``kind`` is part of equality so that ``1``, ``1.0`` and ``true``
+    never compare equal as tree nodes.
+    """
+
+    value: Any
+    kind: str  # 'int', 'double', 'string', 'bool', 'null'
+
+
+@dataclass(frozen=True, slots=True)
+class Ident(Node):
+    """A reference to a variable."""
+
+    name: str
+
+
+@dataclass(frozen=True, slots=True)
+class Select(Node):
+    """Field selection ``operand.field``, or ``has(operand.field)``."""
+
+    operand: Node
+    field: str
+    test_only: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class Index(Node):
+    """Index access ``operand[index]``."""
+
+    operand: Node
+    index: Node
+
+
+@dataclass(frozen=True, slots=True)
+class Call(Node):
+    """Function call, either global ``f(x)`` or receiver-style ``x.f()``."""
+
+    function: str
+    target: Node | None
+    args: tuple[Node, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class Comprehension(Node):
+    """Macro binding ``var`` over ``range``, e.g. ``list.exists(c, ...)``."""
+
+    kind: str
+    range: Node
+    var: str
+    body: Node
+
+
+@dataclass(frozen=True, slots=True)
+class Unary(Node):
+    """Unary operator ``!`` or ``-``."""
+
+    op: str
+    operand: Node
+
+
+@dataclass(frozen=True, slots=True)
+class Binary(Node):
+    """Binary operator, including ``&&``, ``||`` and ``in``."""
+
+    op: str
+    left: Node
+    right: Node
+
+
+@dataclass(frozen=True, slots=True)
+class Conditional(Node):
+    """Ternary ``cond ? then : otherwise``."""
+
+    cond: Node
+    then: Node
+    otherwise: Node
+
+
+@dataclass(frozen=True, slots=True)
+class ListExpr(Node):
+    """List construction ``[a, b, c]``."""
+
+    elements: tuple[Node, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class MapExpr(Node):
+    """Map construction ``{k: v, ...}``."""
+
+    entries: tuple[tuple[Node, Node], ...]
+
+
+def children(node: Node) -> tuple[Node, ...]:
+    """Direct sub-expressions of a node, in evaluation order."""
+    if isinstance(node, Select):
+        return (node.operand,)
+    if isinstance(node, Index):
+        return (node.operand, node.index)
+    if isinstance(node, Call):
+        return ((node.target,) if node.target is not None else ()) + node.args
+    if isinstance(node, Comprehension):
+        return (node.range, node.body)
+    if isinstance(node, Unary):
+        return (node.operand,)
+    if isinstance(node, Binary):
+        return (node.left, node.right)
+    if isinstance(node, Conditional):
+        return (node.cond, node.then, node.otherwise)
+    if isinstance(node, ListExpr):
+        return node.elements
+    if isinstance(node, MapExpr):
+        return tuple(part for entry in node.entries for part in entry)
+    return ()
+
+
+def height(node: Node) -> int:
+    """Levels of nodes in a syntax tree, counted without recursing."""
+    deepest = 0
+    stack = [(node, 1)]
+    while stack:
+        node, level = stack.pop()
+        deepest = max(deepest, level)
+        stack.extend((child, level + 1) for child in children(node))
+    return deepest
+
+
+def free_variables(node: Node) -> frozenset[str]:
+    """Variables an expression reads that it does not bind itself."""
+    if isinstance(node, Ident):
+        return frozenset({node.name})
+    if isinstance(node, Comprehension):
+        return free_variables(node.range) | (free_variables(node.body) - {node.var})
+    names: frozenset[str] = frozenset()
+    for child in children(node):
+        names |= free_variables(child)
+    return names
+
+
+# ---------------------------------------------------------------------------
+# Lexer
+# ---------------------------------------------------------------------------
+
+_TOKEN_RE = re.compile(
+    r"""
+    (?P<ws>\s+|//[^\n]*)
+  | (?P<float>(?:\d+\.\d+(?:[eE][+-]?\d+)?|\d+[eE][+-]?\d+))
+  | (?P<int>0[xX][0-9a-fA-F]+|\d+)[uU]?
+  | (?P<string>[rR]?(?:"(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*'))
+  | (?P<ident>[A-Za-z_][A-Za-z0-9_]*)
+  | (?P<op>==|!=|<=|>=|&&|\|\||[<>!?:.,()\[\]{}+\-*/%])
+    """,
+    re.VERBOSE,
+)
+
+_ESCAPES = {
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+    "\\": "\\",
+    "'": "'",
+    '"': '"',
+    "`": "`",
+    "?": "?",
+    "a": "\a",
+    "b": "\b",
+    "f": "\f",
+    "v": "\v",
+}
+
+_ESCAPE_RE = re.compile(r"\\(u[0-9a-fA-F]{4}|x[0-9a-fA-F]{2}|.)")
+
+
+def _unescape(body: str, position: int) -> str:
+    def replace(match: re.Match[str]) -> str:
+        seq = match.group(1)
+        if seq[0] in "ux" and len(seq) > 1:
+            return chr(int(seq[1:], 16))
+        if seq in _ESCAPES:
+            return _ESCAPES[seq]
+        raise CelSyntaxError(f"invalid escape sequence '\\{seq}'", position)
+
+    return _ESCAPE_RE.sub(replace, body)
+
+
+@dataclass(frozen=True, slots=True)
+class _Token:
+    kind: str
+    value: Any
+    position: int
+
+
+def _tokenize(source: str) -> list[_Token]:
+    tokens: list[_Token] = []
+    position = 0
+    length = len(source)
+    while position < length:
+        match = _TOKEN_RE.match(source, position)
+        if match is None:
+            raise CelSyntaxError(f"unexpected character {source[position]!r}", position)
+        kind = match.lastgroup or ""
+        text = match.group(kind)
+        if kind == "int":
+            tokens.append(_Token("int", int(text, 0), position))
+        elif kind == "float":
+            tokens.append(_Token("float", float(text), position))
+        elif kind == "string":
+            raw = text[0] in "rR"
+            body = text[2:-1] if raw else text[1:-1]
+            tokens.append(_Token("string", body if raw else _unescape(body, position), position))
+        elif kind in ("ident", "op"):
+            tokens.append(_Token(kind, text, position))
+        position = match.end()
+    tokens.append(_Token("eof", None, length))
+    return tokens
+
+
+# ---------------------------------------------------------------------------
+# Parser
+# ---------------------------------------------------------------------------
+
+_RELATIONS = frozenset({"==", "!=", "<", "<=", ">", ">=", "in"})
+
+
+class _Parser:
+    def __init__(self, source: str):
+        self._tokens = _tokenize(source)
+        self._pos = 0
+        self._depth = 0
+
+    # Token helpers
+
+    def _peek(self) -> _Token:
+        return self._tokens[self._pos]
+
+    def _advance(self) -> _Token:
+        token = self._tokens[self._pos]
+        self._pos += 1
+        return token
+
+    def _at(self, value: str) -> bool:
+        token = self._tokens[self._pos]
+        return token.kind in ("op", "ident") and token.value == value
+
+    def _expect(self, value: str) -> _Token:
+        token = self._peek()
+        if not self._at(value):
+            found = "end of expression" if token.kind == "eof" else repr(token.value)
+            raise CelSyntaxError(f"expected '{value}', found {found}", token.position)
+        return self._advance()
+
+    # Grammar
+
+    def parse(self) -> Node:
+        node = self._expr()
+        token = self._peek()
+        if token.kind != "eof":
+            raise CelSyntaxError(f"unexpected token {token.value!r}", token.position)
+        return node
+
+    def _nested(self, parse: Callable[[], Node]) -> Node:
+        self._depth += 1
+        if self._depth > MAX_DEPTH:
+            raise CelSyntaxError("expression nested too deeply", self._peek().position)
+        try:
+            return parse()
+        finally:
+            self._depth -= 1
+
+    def _expr(self) -> Node:
+        return self._nested(self._conditional)
+
+    def _conditional(self) -> Node:
+        cond = self._or()
+        if self._at("?"):
+            self._advance()
+            then = self._or()
+            self._expect(":")
+            otherwise = self._expr()
+            return Conditional(cond, then, otherwise)
+        return cond
+
+    def _or(self) -> Node:
+        node = self._and()
+        while self._at("||"):
+            self._advance()
+            node = Binary("||", node, self._and())
+        return node
+
+    def _and(self) -> Node:
+        node = self._relation()
+        while self._at("&&"):
+            self._advance()
+            node = Binary("&&", node, self._relation())
+        return node
+
+    def _relation(self) -> Node:
+        node = self._addition()
+        while True:
+            token = self._peek()
+            if token.kind in ("op", "ident") and token.value in _RELATIONS:
+                self._advance()
+                node = Binary(token.value, node, self._addition())
+            else:
+                return node
+
+    def _addition(self) -> Node:
+        node = self._multiplication()
+        while self._at("+") or self._at("-"):
+            op = self._advance().value
+            node = Binary(op, node, self._multiplication())
+        return node
+
+    def _multiplication(self) -> Node:
+        node = self._unary()
+        while self._at("*") or self._at("/") or self._at("%"):
+            op = self._advance().value
+            node = Binary(op, node, self._unary())
+        return node
+
+    def _unary(self) -> Node:
+        if self._at("!") or self._at("-"):
+            op = self._advance().value
+            operand = self._nested(self._unary)
+            if op == "-" and isinstance(operand, Literal) and operand.kind in ("int", "double"):
+                return Literal(-operand.value, operand.kind)
+            return Unary(op, operand)
+        return self._member()
+
+    def _member(self) -> Node:
+        node = self._primary()
+        while True:
+            if self._at("."):
+                self._advance()
+                token = self._advance()
+                if token.kind != "ident":
+                    raise CelSyntaxError("expected field name after '.'", token.position)
+                if self._at("("):
+                    self._advance()
+                    args = self._arguments(")")
+                    node = self._receiver_call(token, node, args)
+                else:
+                    node = Select(node, token.value)
+            elif self._at("["):
+                self._advance()
+                index = self._expr()
+                self._expect("]")
+                node = Index(node, index)
+            else:
+                return node
+
+    def _primary(self) -> Node:
+        token = self._advance()
+        if token.kind == "int":
+            return Literal(token.value, "int")
+        if token.kind == "float":
+            return Literal(token.value, "double")
+        if token.kind == "string":
+            return Literal(token.value, "string")
+        if token.kind == "ident":
+            if token.value == "true":
+                return Literal(True, "bool")
+            if token.value == "false":
+                return Literal(False, "bool")
+            if token.value == "null":
+                return Literal(None, "null")
+            if token.value == "in":
+                raise CelSyntaxError("unexpected keyword 'in'", token.position)
+            if self._at("("):
+                self._advance()
+                args = self._arguments(")")
+                return self._global_call(token, args)
+            return Ident(token.value)
+        if token.kind == "op":
+            if token.value == ".":
+                # Leading-dot qualified identifier: '.system'
+                ident = self._advance()
+                if ident.kind != "ident":
+                    raise CelSyntaxError("expected identifier after '.'", ident.position)
+                return Ident(ident.value)
+            if token.value == "(":
+                node = self._expr()
+                self._expect(")")
+                return node
+            if token.value == "[":
+                return ListExpr(tuple(self._arguments("]")))
+            if token.value == "{":
+                return self._map()
+        found = "end of expression" if token.kind == "eof" else repr(token.value)
+        raise CelSyntaxError(f"unexpected {found}", token.position)
+
+    def _arguments(self, closer: str) -> list[Node]:
+        args: list[Node] = []
+        if self._at(closer):
+            self._advance()
+            return args
+        while True:
+            args.append(self._expr())
+            if self._at(","):
+                self._advance()
+                if self._at(closer):
+                    break
+                continue
+            break
+        self._expect(closer)
+        return args
+
+    def _map(self) -> Node:
+        entries: list[tuple[Node, Node]] = []
+        while not self._at("}"):
+            key = self._expr()
+            self._expect(":")
+            entries.append((key, self._expr()))
+            if not self._at(","):
+                break
+            self._advance()
+        self._expect("}")
+        return MapExpr(tuple(entries))
+
+    def _global_call(self, token: _Token, args: list[Node]) -> Node:
+        if token.value == "has":
+            if len(args) != 1 or not isinstance(args[0], Select):
+                raise CelSyntaxError("has() requires a field selection argument", token.position)
+            return Select(args[0].operand, args[0].field, test_only=True)
+        return Call(token.value, None, tuple(args))
+
+    def _receiver_call(self, token: _Token, target: Node, args: list[Node]) -> Node:
+        if token.value in COMPREHENSIONS:
+            if len(args) != 2 or not isinstance(args[0], Ident):
+                raise CelSyntaxError(
+                    f"{token.value}() requires a variable name and an expression",
+                    token.position,
+                )
+            return Comprehension(token.value, target, args[0].name, args[1])
+        return Call(token.value, target, tuple(args))
+
+
+def parse(source: str) -> Node:
+    """Parse a CEL expression into a syntax tree.
+
+    Raises:
+        CelSyntaxError: If the expression is malformed.
+    """
+    if not source or not source.strip():
+        raise CelSyntaxError("empty expression")
+    try:
+        ast = _Parser(source).parse()
+    except RecursionError:
+        raise CelSyntaxError("expression nested too deeply") from None
+    if height(ast) > MAX_HEIGHT:
+        raise CelSyntaxError("expression nested too deeply")
+    return ast
@@ -0,0 +1,238 @@
+"""Columnar evaluation of simple rules across many systems at once.
+
+Rules built only from comparisons of enum columns (``type``,
+``status``, ``risk_tier``) with string literals, of ``autonomy_level``
+with integer literals, and ``&&`` / ``||`` / ``!`` over those, are
+compiled a second time into NumPy vector predicates. A bulk evaluation
+then loads each column it needs into an array once (enums as small-int
+codes, ``autonomy_level`` as an int array with a null mask) and
+evaluates such a rule for every matching system in one operation (see
+``executor.evaluate_columnar``). Every other rule, and any system for
+which a vector predicate reports an evaluation error, goes through the
+regular per-row program, so results are identical to
+``evaluator.evaluate``.
+
+NumPy is an optional dependency (the ``columnar`` extra); without it
+nothing is vectorised and bulk evaluation stays per-row.
+"""
+
+from collections.abc import Callable, Mapping, Sequence
+from typing import Any
+
+from vorpal.core.engine.cel import Binary, Ident, ListExpr, Literal, Node, Select, Unary
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None  # type: ignore[assignment]
+
+# Columns that can be vectorised
+INT_FIELDS = frozenset({"autonomy_level"})
+ENUM_FIELDS = frozenset({"type", "status", "risk_tier"})
+_VECTOR_FIELDS = tuple(sorted(INT_FIELDS | ENUM_FIELDS))
+
+# Below this many systems, building columns costs more than it saves
+MIN_ROWS = 64
+
+_ORDERING = ("<", "<=", ">", ">=")
+_MIRRORED = {"<": ">", "<=": ">=", ">": "<", ">=": "<=", "==": "==", "!=": "!="}
+
+# A vector predicate maps (columns, row indices) to (value, error) bool
+# arrays; rows flagged as errors must be re-evaluated per row
+VectorPredicate = Callable[["FleetColumns", Any], tuple[Any, Any]]
+
+_MISSING = object()
+
+
+def available() -> bool:
+    """Whether NumPy is installed."""
+    return np is not None
+
+
+class FleetColumns:
+    """Column arrays over a sequence of ``system`` activations, built on demand."""
+
+    def __init__(self, systems: Sequence[Mapping[str, Any]]):
+        self._systems = systems
+        self._ints: dict[str, tuple[Any, Any, Any]] = {}
+        self._enums: dict[str, tuple[Any, dict[str, int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._systems)
+
+    def row_key(self, row: int) -> tuple[Any, ...] | None:
+        """Hashable key of a row's vectorisable fields, or None if unhashable.
+
+        Values are keyed with their type so ``True`` and ``1`` stay apart.
+        """
+        system = self._systems[row]
+        key = tuple((type(v), v) for v in (system.get(name, _MISSING) for name in _VECTOR_FIELDS))
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def int_column(self, name: str) -> tuple[Any, Any, Any]:
+        """``(values, null mask, invalid mask)`` for an integer column.
+
+        Rows whose value is missing or not an integer are flagged
+        invalid, so their rules fall back to per-row evaluation.
+        """
+        column = self._ints.get(name)
+        if column is None:
+            raw = [s.get(name, _MISSING) for s in self._systems]
+            null = np.fromiter((v is None for v in raw), dtype=bool, count=len(raw))
+            invalid = np.fromiter(
+                (v is not None and (type(v) is not int) for v in raw), dtype=bool, count=len(raw)
+            )
+            values = np.fromiter(
+                (v if type(v) is int else 0 for v in raw), dtype=np.int64, count=len(raw)
+            )
+            column = self._ints[name] = (values, null, invalid)
+        return column
+
+    def enum_column(self, name: str) -> tuple[Any, dict[str, int]]:
+        """``(codes, code by value)`` for a string column; non-strings get code -1."""
+        column = self._enums.get(name)
+        if column is None:
+            mapping: dict[str, int] = {}
+            codes = np.fromiter(
+                (
+                    mapping.setdefault(v, len(mapping)) if isinstance(v, str) else -1
+                    for v in (s.get(name) for s in self._systems)
+                ),
+                dtype=np.int32,
+                count=len(self._systems),
+            )
+            column = self._enums[name] = (codes, mapping)
+        return column
+
+
+def _system_field(node: Node) -> str | None:
+    if (
+        isinstance(node, Select)
+        and not node.test_only
+        and isinstance(node.operand, Ident)
+        and node.operand.name == "system"
+    ):
+        return node.field
+    return None
+
+
+def _constant(value: bool) -> VectorPredicate:
+    def predicate(_columns: FleetColumns, rows: Any) -> tuple[Any, Any]:
+        return np.full(len(rows), value), np.zeros(len(rows), dtype=bool)
+
+    return predicate
+
+
+def _int_comparison(field: str, op: str, literal: int) -> VectorPredicate:
+    compare = {
+        "<": np.less,
+        "<=": np.less_equal,
+        ">": np.greater,
+        ">=": np.greater_equal,
+        "==": np.equal,
+        "!=": np.not_equal,
+    }[op]
+
+    def predicate(columns: FleetColumns, rows: Any) -> tuple[Any, Any]:
+        values, null, invalid = columns.int_column(field)
+        null, invalid = null[rows], invalid[rows]
+        result = compare(values[rows], literal) & ~null
+        if op == "!=":
+            result |= null  # null != 3 is true in CEL
+        if op in _ORDERING:
+            return result, invalid | null  # ordering null is a no-overload error
+        return result, invalid
+
+    return predicate
+
+
+def _enum_membership(field: str, literals: Sequence[str], negate: bool) -> VectorPredicate:
+    def predicate(columns: FleetColumns, rows: Any) -> tuple[Any, Any]:
+        codes, mapping = columns.enum_column(field)
+        wanted = [mapping[v] for v in literals if v in mapping]
+        result = np.isin(codes[rows], wanted)
+        if negate:
+            result = ~result
+        return result, codes[rows] < 0
+
+    return predicate
+
+
+def _not(operand: VectorPredicate) -> VectorPredicate:
+    def predicate(columns: FleetColumns, rows: Any) -> tuple[Any, Any]:
+        value, error = operand(columns, rows)
+        return ~value & ~error, error
+
+    return predicate
+
+
+def _logical(op: str, left: VectorPredicate, right: VectorPredicate) -> VectorPredicate:
+    # CEL's commutative error absorption: false && error is false,
+    # true || error is true; otherwise an error on either side wins
+    def predicate(columns: FleetColumns, rows: Any) -> tuple[Any, Any]:
+        left_value, left_error = left(columns, rows)
+        right_value, right_error = right(columns, rows)
+        if op == "&&":
+            decided = (~left_value & ~left_error) | (~right_value & ~right_error)
+            error = ~decided & (left_error | right_error)
+            return ~decided & ~error, error
+        decided = (left_value & ~left_error) | (right_value & ~right_error)
+        return decided, ~decided & (left_error | right_error)
+
+    return predicate
+
+
+def vectorize(ast: Node) -> VectorPredicate | None:
+    """Compile a rule into a vector predicate, or None if it has no columnar form."""
+    if np is None:
+        return None
+    return _vectorize(ast)
+
+
+def _vectorize(node: Node) -> VectorPredicate | None:
+    if isinstance(node, Literal) and node.kind == "bool":
+        return _constant(node.value)
+
+    if isinstance(node, Unary) and node.op == "!":
+        operand = _vectorize(node.operand)
+        return _not(operand) if operand else None
+
+    if not isinstance(node, Binary):
+        return None
+
+    if node.op in ("&&", "||"):
+        first, second = _vectorize(node.left), _vectorize(node.right)
+        return _logical(node.op, first, second) if first and second else None
+
+    op, left, right = node.op, node.left, node.right
+    if _system_field(left) is None and _system_field(right) is not None and op in _MIRRORED:
+        op, left, right = _MIRRORED[op], right, left
+    field = _system_field(left)
+    if field is None or not isinstance(right, Literal | ListExpr):
+        return None
+
+    if (
+        field in INT_FIELDS
+        and isinstance(right, Literal)
+        and right.kind == "int"
+        and op in _MIRRORED
+    ):
+        return _int_comparison(field, op, right.value)
+
+    if field in ENUM_FIELDS:
+        if op in ("==", "!=") and isinstance(right, Literal):
+            literals = [right.value] if right.kind == "string" else []
+            return _enum_membership(field, literals, negate=op == "!=")
+        if (
+            op == "in"
+            and isinstance(right, ListExpr)
+            and all(isinstance(e, Literal) and e.kind == "string" for e in right.elements)
+        ):
+            literals = [e.value for e in right.elements if isinstance(e, Literal)]
+            return _enum_membership(field, literals, negate=False)
+
+    return None
@@ -0,0 +1,848 @@
+"""Compile CEL syntax trees into Python closures.
+
+Each node becomes a small closure over its already-compiled children,
+so evaluating a rule is a chain of direct Python calls with no string
+handling or tree walking at request time.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import Counter
+from collections.abc import Callable, Hashable, Iterable, Mapping, Sequence
+from typing import Any
+
+from vorpal.core.engine.cel import (
+    Binary,
+    Call,
+    CelEvaluationError,
+    CelSyntaxError,
+    Comprehension,
+    Conditional,
+    Ident,
+    Index,
+    ListExpr,
+    Literal,
+    MapExpr,
+    Node,
+    Select,
+    Unary,
+    children,
+    free_variables,
+    parse,
+)
+from vorpal.core.engine.cost import CostLimitExceeded, Meter, base_cost
+
+Activation = dict[str, Any]
+Evaluator = Callable[[Activation], Any]
+
+# Variables available to every rule condition
+ROOT_VARIABLES = frozenset({"system", "context", "data"})
+
+# Activation key holding one evaluation's results of shared sub-expressions;
+# not a valid identifier, so it can never clash with a variable
+MEMO = "@memo"
+
+# Activation key holding the ``Meter`` that charges evaluation steps, if any
+METER = "@meter"
+
+_MISSING = object()
+
+
+# ---------------------------------------------------------------------------
+# Value semantics
+# ---------------------------------------------------------------------------
+
+
+def type_name(value: Any) -> str:
+    """Return the CEL type name of a Python value."""
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "bool"
+    if isinstance(value, int):
+        return "int"
+    if isinstance(value, float):
+        return "double"
+    if isinstance(value, str):
+        return "string"
+    if isinstance(value, Mapping):
+        return "map"
+    if isinstance(value, list | tuple | set | frozenset):
+        return "list"
+    return type(value).__name__
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, int | float) and not isinstance(value, bool)
+
+
+def _no_overload(op: str, *values: Any) -> CelEvaluationError:
+    types = ", ".join(type_name(v) for v in values)
+    return CelEvaluationError(f"no such overload: {op}({types})")
+
+
+def cel_equals(left: Any, right: Any) -> bool:
+    """CEL equality: values of different types are never equal."""
+    if isinstance(left, str) or isinstance(right, str):
+        return isinstance(left, str) and isinstance(right, str) and left == right
+    if isinstance(left, bool) or isinstance(right, bool):
+        return isinstance(left, bool) and isinstance(right, bool) and left is right
+    if left is None or right is None:
+        return left is right
+    if _is_number(left) and _is_number(right):
+        return bool(left == right)
+    if isinstance(left, Mapping) and isinstance(right, Mapping):
+        if len(left) != len(right):
+            return False
+        for key, value in left.items():
+            if key not in right or not cel_equals(value, right[key]):
+                return False
+        return True
+    if isinstance(left, list | tuple) and isinstance(right, list | tuple):
+        return len(left) == len(right) and all(
+            cel_equals(a, b) for a, b in zip(left, right, strict=True)
+        )
+    return False
+
+
+def cel_in(element: Any, container: Any) -> bool:
+    """CEL ``in``: key membership for maps, element membership for lists."""
+    if isinstance(container, Mapping):
+        try:
+            return element in container
+        except TypeError:
+            return False
+    if isinstance(container, set | frozenset):
+        try:
+            return element in container
+        except TypeError:
+            return any(cel_equals(element, item) for item in container)
+    if isinstance(container, list | tuple):
+        if isinstance(element, str):
+            return element in container
+        return any(cel_equals(element, item) for item in container)
+    raise _no_overload("in", element, container)
+
+
+def _compare(op: str, left: Any, right: Any) -> bool:
+    if (
+        (_is_number(left) and _is_number(right))
+        or (isinstance(left, str) and isinstance(right, str))
+        or (isinstance(left, bool) and isinstance(right, bool))
+    ):
+        if op == "<":
+            return bool(left < right)
+        if op == "<=":
+            return bool(left <= right)
+        if op == ">":
+            return bool(left > right)
+        return bool(left >= right)
+    raise _no_overload(op, left, right)
+
+
+def _add(left: Any, right: Any) -> Any:
+    if _is_number(left) and _is_number(right):
+        return left + right
+    if isinstance(left, str) and isinstance(right, str):
+        return left + right
+    if isinstance(left, list | tuple) and isinstance(right, list | tuple):
+        return [*left, *right]
+    raise _no_overload("+", left, right)
+
+
+def _arith(op: str, left: Any, right: Any) -> Any:
+    if not (_is_number(left) and _is_number(right)):
+        raise _no_overload(op, left, right)
+    if op == "-":
+        return left - right
+    if op == "*":
+        return left * right
+    if op == "/":
+        if right == 0:
+            raise CelEvaluationError("division by zero")
+        if isinstance(left, int) and isinstance(right, int):
+            quotient = abs(left) // abs(right)
+            return quotient if (left >= 0) == (right >= 0) else -quotient
+        return left / right
+    # '%' is only defined for integers and takes the sign of the dividend
+    if isinstance(left, float) or isinstance(right, float):
+        raise _no_overload(op, left, right)
+    if right == 0:
+        raise CelEvaluationError("modulus by zero")
+    remainder = abs(left) % abs(right)
+    return remainder if left >= 0 else -remainder
+
+
+def select_field(operand: Any, field: str) -> Any:
+    """Resolve ``operand.field``."""
+    if isinstance(operand, Mapping):
+        try:
+            return operand[field]
+        except KeyError:
+            raise CelEvaluationError(f"no such key: '{field}'") from None
+    raise CelEvaluationError(f"type '{type_name(operand)}' does not support field selection")
+
+
+def _has_field(operand: Any, field: str) -> bool:
+    if isinstance(operand, Mapping):
+        return field in operand
+    raise CelEvaluationError(f"type '{type_name(operand)}' does not support field selection")
+
+
+def _index(operand: Any, index: Any) -> Any:
+    if isinstance(operand, list | tuple):
+        if isinstance(index, bool) or not isinstance(index, int | float) or index != int(index):
+            raise _no_overload("_[_]", operand, index)
+        position = int(index)
+        if position < 0 or position >= len(operand):
+            raise CelEvaluationError(f"index out of range: {position}")
+        return operand[position]
+    if isinstance(operand, Mapping):
+        try:
+            return operand[index]
+        except (KeyError, TypeError):
+            raise CelEvaluationError(f"no such key: {index!r}") from None
+    raise _no_overload("_[_]", operand, index)
+
+
+def _iteration_range(value: Any) -> Iterable[Any]:
+    if isinstance(value, list | tuple | set | frozenset):
+        return value
+    if isinstance(value, Mapping):
+        return list(value.keys())
+    raise CelEvaluationError(f"type '{type_name(value)}' cannot be iterated")
+
+
+def _require_bool(op: str, value: Any) -> bool:
+    if value is True or value is False:
+        return value
+    raise _no_overload(op, value)
+
+
+# ---------------------------------------------------------------------------
+# Functions
+# ---------------------------------------------------------------------------
+
+
+def _size(value: Any) -> int:
+    if isinstance(value, str | list | tuple | set | frozenset | Mapping):
+        return len(value)
+    raise _no_overload("size", value)
+
+
+def _string_fn(name: str, check: Callable[[str, str], bool]) -> Callable[[Any, Any], bool]:
+    def fn(target: Any, arg: Any) -> bool:
+        if isinstance(target, str) and isinstance(arg, str):
+            return check(target, arg)
+        raise _no_overload(name, target, arg)
+
+    return fn
+
+
+def _matches(target: Any, pattern: Any) -> bool:
+    if isinstance(target, str) and isinstance(pattern, str):
+        try:
+            return re.search(pattern, target) is not None
+        except re.error as e:
+            raise CelEvaluationError(f"invalid regular expression: {e}") from None
+    raise _no_overload("matches", target, pattern)
+
+
+def _lower(target: Any) -> str:
+    if isinstance(target, str):
+        return target.lower()
+    raise _no_overload("lowerAscii", target)
+
+
+def _upper(target: Any) -> str:
+    if isinstance(target, str):
+        return target.upper()
+    raise _no_overload("upperAscii", target)
+
+
+def _to_int(value: Any) -> int:
+    if isinstance(value, bool):
+        raise _no_overload("int", value)
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value)
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            raise CelEvaluationError(f"cannot convert {value!r} to int") from None
+    raise _no_overload("int", value)
+
+
+def _to_double(value: Any) -> float:
+    if _is_number(value):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            raise CelEvaluationError(f"cannot convert {value!r} to double") from None
+    raise _no_overload("double", value)
+
+
+def _to_string(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if _is_number(value):
+        return str(value)
+    raise _no_overload("string", value)
+
+
+# Receiver-style functions: target.fn(args...)
+MEMBER_FUNCTIONS: dict[str, tuple[int, Callable[..., Any]]] = {
+    "size": (0, _size),
+    "contains": (1, _string_fn("contains", lambda s, sub: sub in s)),
+    "startsWith": (1, _string_fn("startsWith", str.startswith)),
+    "endsWith": (1, _string_fn("endsWith", str.endswith)),
+    "matches": (1, _matches),
+    "lowerAscii": (0, _lower),
+    "upperAscii": (0, _upper),
+}
+
+# Global functions: fn(args...)
+GLOBAL_FUNCTIONS: dict[str, tuple[int, Callable[..., Any]]] = {
+    "size": (1, _size),
+    "matches": (2, _matches),
+    "int": (1, _to_int),
+    "double": (1, _to_double),
+    "string": (1, _to_string),
+}
+
+
+# ---------------------------------------------------------------------------
+# Compiler
+# ---------------------------------------------------------------------------
+
+
+class _Compiler:
+    def __init__(self, variables: frozenset[str], shared: Mapping[Node, int] | None = None):
+        self._variables = variables
+        self._shared = shared or {}
+        self.memo_slots: set[int] = set()
+
+    def compile(self, node: Node, bound: frozenset[str]) -> Evaluator:
+        fn = self._compile(node, bound)
+        if self._shared:
+            slot = self._shared.get(node)
+            if slot is not None and not free_variables(node) & bound:
+                self.memo_slots.add(slot)
+                return _memoized(slot, fn)
+        return fn
+
+    def _compile(self, node: Node, bound: frozenset[str]) -> Evaluator:
+        if isinstance(node, Literal):
+            value = node.value
+            return lambda _act: value
+        if isinstance(node, Ident):
+            return self._ident(node, bound)
+        if isinstance(node, Select):
+            return self._select(node, bound)
+        if isinstance(node, Index):
+            operand = self.compile(node.operand, bound)
+            index = self.compile(node.index, bound)
+            return lambda act: _index(operand(act), index(act))
+        if isinstance(node, Unary):
+            return self._unary(node, bound)
+        if isinstance(node, Binary):
+            return self._binary(node, bound)
+        if isinstance(node, Conditional):
+            cond = self.compile(node.cond, bound)
+            then = self.compile(node.then, bound)
+            otherwise = self.compile(node.otherwise, bound)
+            return lambda act: then(act) if _require_bool("_?_:_", cond(act)) else otherwise(act)
+        if isinstance(node, Call):
+            return self._call(node, bound)
+        if isinstance(node, Comprehension):
+            return self._comprehension(node, bound)
+        if isinstance(node, ListExpr):
+            elements = [self.compile(e, bound) for e in node.elements]
+            return lambda act: [e(act) for e in elements]
+        if isinstance(node, MapExpr):
+            entries = [(self.compile(k, bound), self.compile(v, bound)) for k, v in node.entries]
+            return lambda act: {k(act): v(act) for k, v in entries}
+        raise CelSyntaxError(f"unsupported expression node {type(node).__name__}")
+
+    def _ident(self, node: Ident, bound: frozenset[str]) -> Evaluator:
+        name = node.name
+        if name not in bound and name not in self._variables:
+            raise CelSyntaxError(f"undeclared reference to '{name}'")
+
+        def ident(act: Activation) -> Any:
+            try:
+                return act[name]
+            except KeyError:
+                raise CelEvaluationError(f"no value bound for '{name}'") from None
+
+        return ident
+
+    def _select(self, node: Select, bound: frozenset[str]) -> Evaluator:
+        operand = self.compile(node.operand, bound)
+        field = node.field
+        if node.test_only:
+            return lambda act: _has_field(operand(act), field)
+
+        def select(act: Activation) -> Any:
+            value = operand(act)
+            if type(value) is dict:
+                try:
+                    return value[field]
+                except KeyError:
+                    raise CelEvaluationError(f"no such key: '{field}'") from None
+            return select_field(value, field)
+
+        return select
+
+    def _unary(self, node: Unary, bound: frozenset[str]) -> Evaluator:
+        operand = self.compile(node.operand, bound)
+        if node.op == "!":
+            return lambda act: not _require_bool("!_", operand(act))
+
+        def negate(act: Activation) -> Any:
+            value = operand(act)
+            if _is_number(value):
+                return -value
+            raise _no_overload("-_", value)
+
+        return negate
+
+    def _binary(self, node: Binary, bound: frozenset[str]) -> Evaluator:
+        left = self.compile(node.left, bound)
+        right = self.compile(node.right, bound)
+        op = node.op
+
+        if op == "&&":
+            return _logical(left, right, short_circuit=False, op="_&&_")
+        if op == "||":
+            return _logical(left, right, short_circuit=True, op="_||_")
+        if op == "==":
+            return lambda act: cel_equals(left(act), right(act))
+        if op == "!=":
+            return lambda act: not cel_equals(left(act), right(act))
+        if op == "in":
+            return lambda act: cel_in(left(act), right(act))
+        if op in ("<", "<=", ">", ">="):
+            return lambda act: _compare(op, left(act), right(act))
+        if op == "+":
+            return lambda act: _add(left(act), right(act))
+        return lambda act: _arith(op, left(act), right(act))
+
+    def _call(self, node: Call, bound: frozenset[str]) -> Evaluator:
+        table = GLOBAL_FUNCTIONS if node.target is None else MEMBER_FUNCTIONS
+        if node.function not in table:
+            raise CelSyntaxError(f"undeclared reference to function '{node.function}'")
+        arity, fn = table[node.function]
+        if len(node.args) != arity:
+            raise CelSyntaxError(
+                f"function '{node.function}' expects {arity} argument(s), got {len(node.args)}"
+            )
+
+        # Precompile literal regular expressions so bad patterns fail at compile time
+        if node.function == "matches" and isinstance(node.args[-1], Literal):
+            pattern = node.args[-1].value
+            if not isinstance(pattern, str):
+                raise CelSyntaxError("matches() requires a string pattern")
+            try:
+                regex = re.compile(pattern)
+            except re.error as e:
+                raise CelSyntaxError(f"invalid regular expression: {e}") from None
+            subject = self.compile(node.target if node.target is not None else node.args[0], bound)
+
+            def match(act: Activation) -> bool:
+                value = subject(act)
+                if not isinstance(value, str):
+                    raise _no_overload("matches", value)
+                return regex.search(value) is not None
+
+            return match
+
+        operands = [self.compile(a, bound) for a in node.args]
+        if node.target is not None:
+            operands.insert(0, self.compile(node.target, bound))
+        if len(operands) == 1:
+            (only,) = operands
+            return lambda act: fn(only(act))
+        if len(operands) == 2:
+            first, second = operands
+            return lambda act: fn(first(act), second(act))
+        return lambda act: fn(*(o(act) for o in operands))
+
+    def _comprehension(self, node: Comprehension, bound: frozenset[str]) -> Evaluator:
+        source = self.compile(node.range, bound)
+        body = self.compile(node.body, bound | {node.var})
+        return _COMPREHENSION_BUILDERS[node.kind](source, body, node.var, base_cost(node.body))
+
+
+class _Raised:
+    __slots__ = ("error",)
+
+    def __init__(self, error: Exception):
+        self.error = error
+
+
+def _memoized(slot: int, fn: Evaluator) -> Evaluator:
+    """Evaluate ``fn`` at most once per activation memo, errors included.
+
+    Running out of cost budget is not memoized: the budget belongs to
+    the rule that ran out, and another rule reading the same value
+    evaluates it on its own budget.
+    """
+
+    def memoized(act: Activation) -> Any:
+        memo = act.get(MEMO)
+        if memo is None:
+            return fn(act)
+        try:
+            value = memo[slot]
+        except KeyError:
+            try:
+                value = fn(act)
+            except CostLimitExceeded:
+                raise
+            except Exception as e:
+                memo[slot] = _Raised(e)
+                raise
+            memo[slot] = value
+            return value
+        if type(value) is _Raised:
+            raise value.error
+        return value
+
+    return memoized
+
+
+def _logical(left: Evaluator, right: Evaluator, short_circuit: bool, op: str) -> Evaluator:
+    """Build ``&&`` / ``||`` with CEL's commutative error handling.
+
+    An error on one side is absorbed if the other side alone decides
+    the result (``false && err`` is false, ``true || err`` is true).
+    """
+
+    decisive, other = short_circuit, not short_circuit
+
+    def logical(act: Activation) -> bool:
+        error: CelEvaluationError | None = None
+        try:
+            value = left(act)
+        except CostLimitExceeded:
+            raise
+        except CelEvaluationError as e:
+            error = e
+        else:
+            if value is decisive:
+                return short_circuit
+            if value is not other:
+                error = _no_overload(op, value)
+        value = right(act)
+        if value is decisive:
+            return short_circuit
+        if value is not other:
+            raise _no_overload(op, value)
+        if error is not None:
+            raise error
+        return not short_circuit
+
+    return logical
+
+
+def _bind(
+    act: Activation,
+    var: str,
+    items: Iterable[Any],
+    step: Callable[[Any], bool | None],
+    cost: int,
+) -> None:
+    """Run ``step`` for each item with ``var`` bound, restoring the activation after.
+
+    Each iteration charges ``cost`` steps to the activation's meter.
+    """
+    meter: Meter | None = act.get(METER)
+    previous = act.get(var, _MISSING)
+    try:
+        for item in items:
+            if meter is not None:
+                meter.charge(cost)
+            act[var] = item
+            if step(item):
+                break
+    finally:
+        if previous is _MISSING:
+            act.pop(var, None)
+        else:
+            act[var] = previous
+
+
+Builder = Callable[[Evaluator, Evaluator, str, int], Evaluator]
+
+
+def _quantifier(stop_on: bool) -> Builder:
+    """Build ``exists`` (stops on true) or ``all`` (stops on false)."""
+
+    def build(source: Evaluator, body: Evaluator, var: str, cost: int) -> Evaluator:
+        def quantify(act: Activation) -> bool:
+            items = _iteration_range(source(act))
+            found = False
+            errors: list[CelEvaluationError] = []
+
+            def step(_item: Any) -> bool:
+                nonlocal found
+                try:
+                    value = body(act)
+                except CostLimitExceeded:
+                    raise
+                except CelEvaluationError as e:
+                    errors.append(e)
+                    return False
+                if value is stop_on:
+                    found = True
+                    return True
+                if value is not (not stop_on):
+                    errors.append(_no_overload("exists" if stop_on else "all", value))
+                return False
+
+            _bind(act, var, items, step, cost)
+            if found:
+                return stop_on
+            if errors:
+                raise errors[0]
+            return not stop_on
+
+        return quantify
+
+    return build
+
+
+def _exists_one(source: Evaluator, body: Evaluator, var: str, cost: int) -> Evaluator:
+    def exists_one(act: Activation) -> bool:
+        items = _iteration_range(source(act))
+        count = 0
+
+        def step(_item: Any) -> bool:
+            nonlocal count
+            if _require_bool("exists_one", body(act)):
+                count += 1
+            return False
+
+        _bind(act, var, items, step, cost)
+        return count == 1
+
+    return exists_one
+
+
+def _map(source: Evaluator, body: Evaluator, var: str, cost: int) -> Evaluator:
+    def transform(act: Activation) -> list[Any]:
+        items = _iteration_range(source(act))
+        out: list[Any] = []
+        _bind(act, var, items, lambda _item: out.append(body(act)), cost)
+        return out
+
+    return transform
+
+
+def _filter(source: Evaluator, body: Evaluator, var: str, cost: int) -> Evaluator:
+    def select(act: Activation) -> list[Any]:
+        items = _iteration_range(source(act))
+        out: list[Any] = []
+
+        def step(item: Any) -> bool:
+            if _require_bool("filter", body(act)):
+                out.append(item)
+            return False
+
+        _bind(act, var, items, step, cost)
+        return out
+
+    return select
+
+
+_COMPREHENSION_BUILDERS: dict[str, Builder] = {
+    "exists": _quantifier(stop_on=True),
+    "all": _quantifier(stop_on=False),
+    "exists_one": _exists_one,
+    "map": _map,
+    "filter": _filter,
+}
+
+
+# ---------------------------------------------------------------------------
+# Programs
+# ---------------------------------------------------------------------------
+
+
+class Program:
+    """A compiled CEL expression, ready to evaluate against an activation.
+
+    ``cost`` is the number of steps charged up front on each evaluation
+    (see ``cost.base_cost``); comprehensions charge more per iteration.
+    ``memo_slots`` are the memo slots of the shared sub-expressions it
+    reads and writes.
+    """
+
+    __slots__ = ("source", "ast", "cost", "memo_slots", "_fn")
+
+    def __init__(
+        self, source: str, ast: Node, fn: Evaluator, memo_slots: frozenset[int] = frozenset()
+    ):
+        self.source = source
+        self.ast = ast
+        self.cost = base_cost(ast)
+        self.memo_slots = memo_slots
+        self._fn = fn
+
+    def evaluate(self, activation: Activation) -> Any:
+        """Evaluate the expression.
+
+        Steps are charged to the activation's ``METER``, if it has one.
+
+        Raises:
+            CelEvaluationError: If evaluation fails (missing key, type error, ...).
+            CostLimitExceeded: If the meter's limit is exceeded.
+        """
+        meter: Meter | None = activation.get(METER)
+        try:
+            if meter is not None:
+                meter.charge(self.cost)
+            return self._fn(activation)
+        except CelEvaluationError:
+            raise
+        except (TypeError, ValueError, ArithmeticError, RecursionError) as e:
+            raise CelEvaluationError(str(e)) from e
+
+    def __repr__(self) -> str:
+        return f"<Program({self.source!r})>"
+
+
+def compile_ast(
+    ast: Node,
+    source: str = "",
+    variables: frozenset[str] = ROOT_VARIABLES,
+    shared: Mapping[Node, int] | None = None,
+) -> Program:
+    """Compile an already-parsed syntax tree.
+
+    Args:
+        ast: The syntax tree.
+        source: The expression text, for display.
+        variables: Root variable names the expression may reference.
+        shared: Memo slots of sub-expressions shared with other programs
+            (see ``shared_subexpressions``). Their results are stored in
+            the activation's ``MEMO`` dict, when it has one, and reused
+            by every program evaluated against that activation.
+
+    Raises:
+        CelSyntaxError: If the expression references unknown variables
+            or functions, or is nested too deeply to compile.
+    """
+    compiler = _Compiler(variables, shared)
+    try:
+        fn = compiler.compile(ast, frozenset())
+    except RecursionError:
+        raise CelSyntaxError("expression nested too deeply") from None
+    return Program(source, ast, fn, frozenset(compiler.memo_slots))
+
+
+def compile_expression(source: str, variables: frozenset[str] = ROOT_VARIABLES) -> Program:
+    """Parse and compile a CEL expression.
+
+    Args:
+        source: The expression text.
+        variables: Root variable names the expression may reference.
+
+    Returns:
+        The compiled program.
+
+    Raises:
+        CelSyntaxError: If the expression is malformed or references
+            unknown variables or functions.
+    """
+    return compile_ast(parse(source), source, variables)
+
+
+# ---------------------------------------------------------------------------
+# Common sub-expressions
+# ---------------------------------------------------------------------------
+
+
+def _trivial(node: Node) -> bool:
+    # Cheaper to evaluate than to look up in the memo
+    return isinstance(node, Literal | Ident) or (
+        isinstance(node, Select) and isinstance(node.operand, Ident)
+    )
+
+
+def candidates(ast: Node) -> list[tuple[Node, int]]:
+    """The sub-expressions of ``ast`` that could be shared, in evaluation order.
+
+    Each comes with the index just past the candidates nested inside it.
+    Leaves are left out, as are sub-expressions reading a comprehension
+    variable, which differ per iteration.
+    """
+    entries: list[list[Any]] = []  # [node, candidate, end], in evaluation order
+
+    def walk(node: Node, bound: frozenset[str]) -> frozenset[str]:
+        entry = [node, False, 0]
+        entries.append(entry)
+        if isinstance(node, Ident):
+            names = frozenset({node.name})
+        elif isinstance(node, Comprehension):
+            names = walk(node.range, bound) | (walk(node.body, bound | {node.var}) - {node.var})
+        else:
+            names = frozenset()
+            for child in children(node):
+                names |= walk(child, bound)
+        entry[1] = not _trivial(node) and not names & bound
+        entry[2] = len(entries)
+        return names
+
+    walk(ast, frozenset())
+    # Renumber the ends over the candidates alone
+    before = [0]
+    for _, candidate, _ in entries:
+        before.append(before[-1] + candidate)
+    return [(node, before[end]) for node, candidate, end in entries if candidate]
+
+
+def repeated(occurrences: Iterable[Sequence[tuple[Hashable, int]]]) -> set[Hashable]:
+    """The sub-expressions evaluated more than once, given each expression's ``candidates``.
+
+    Inside a repeated sub-expression, only its first occurrence is ever
+    evaluated, so the candidates nested in the other occurrences are not
+    counted.
+    """
+    occurrences = list(occurrences)
+    counts: Counter[Hashable] = Counter(node for found in occurrences for node, _ in found)
+    evaluated: Counter[Hashable] = Counter()
+    for found in occurrences:
+        i = 0
+        while i < len(found):
+            node, end = found[i]
+            evaluated[node] += 1
+            i = i + 1 if counts[node] == 1 or evaluated[node] == 1 else end
+    return {node for node, count in evaluated.items() if count > 1}
+
+
+def shared_subexpressions(asts: Iterable[Node]) -> dict[Node, int]:
+    """Assign memo slots to the sub-expressions that occur more than once.
+
+    Sub-expressions are compared as syntax trees, so whitespace, quoting
+    and redundant parentheses do not matter. Whole conditions count too:
+    a rule repeated across policies is evaluated once. Sub-expressions
+    reading a comprehension variable differ per iteration and are never
+    shared.
+    """
+    occurrences = [candidates(ast) for ast in asts]
+    shared = repeated(occurrences)
+    slots: dict[Node, int] = {}
+    for found in occurrences:
+        for node, _ in found:
+            if node in shared and node not in slots:
+                slots[node] = len(slots)
+    return slots
@@ -0,0 +1,109 @@
+"""Static cost estimates and runtime cost metering for rule conditions.
+
+Cost is measured in evaluation steps: each node of a condition costs
+one step, plus a surcharge for functions whose work grows with their
+input. A comprehension (``exists``, ``all``, ``map``, ...) costs its
+body once per element.
+
+The static estimate, checked when a policy is saved, has to guess the
+size of lists it cannot see and assumes ``ASSUMED_SIZE`` elements. At
+evaluation time a ``Meter`` charges the actual number of iterations and
+aborts a rule that goes over its limit.
+"""
+
+from vorpal.core.config import get_settings
+from vorpal.core.engine.cel import (
+    Call,
+    CelEvaluationError,
+    Comprehension,
+    ListExpr,
+    MapExpr,
+    Node,
+    children,
+)
+
+# Elements assumed for a list or map whose size is only known at evaluation
+ASSUMED_SIZE = 100
+
+# Extra steps for functions that scan or build strings
+_CALL_COSTS = {
+    "matches": 20,
+    "contains": 2,
+    "startsWith": 1,
+    "endsWith": 1,
+    "lowerAscii": 2,
+    "upperAscii": 2,
+}
+
+
+class CostLimitExceeded(CelEvaluationError):
+    """Raised when an evaluation goes over its cost limit.
+
+    Unlike other evaluation errors, it is never absorbed by ``&&``,
+    ``||`` or a comprehension; it always aborts the rule.
+    """
+
+
+def _size(node: Node) -> int:
+    if isinstance(node, ListExpr):
+        return len(node.elements)
+    if isinstance(node, MapExpr):
+        return len(node.entries)
+    return ASSUMED_SIZE
+
+
+def estimate_cost(node: Node) -> int:
+    """Estimated worst-case steps to evaluate an expression."""
+    if isinstance(node, Comprehension):
+        return 1 + estimate_cost(node.range) + _size(node.range) * estimate_cost(node.body)
+    cost = 1 + sum(estimate_cost(child) for child in children(node))
+    if isinstance(node, Call):
+        cost += _CALL_COSTS.get(node.function, 0)
+    return cost
+
+
+def base_cost(node: Node) -> int:
+    """Steps charged up front when an expression is evaluated.
+
+    Comprehension bodies are left out; they are charged per iteration.
+    """
+    if isinstance(node, Comprehension):
+        return 1 + base_cost(node.range)
+    cost = 1 + sum(base_cost(child) for child in children(node))
+    if isinstance(node, Call):
+        cost += _CALL_COSTS.get(node.function, 0)
+    return cost
+
+
+class Meter:
+    """Counts the steps used by one rule evaluation.
+
+    Args:
+        limit: Steps allowed per rule; 0 means unlimited.
+    """
+
+    __slots__ = ("limit", "used")
+
+    def __init__(self, limit: int = 0):
+        self.limit = limit
+        self.used = 0
+
+    def reset(self) -> None:
+        """Start metering a new rule."""
+        self.used = 0
+
+    def charge(self, steps: int) -> None:
+        """Record steps, aborting the evaluation if the limit is exceeded.
+
+        Raises:
+            CostLimitExceeded: If the rule is over its limit.
+        """
+        self.used += steps
+        if self.limit and self.used > self.limit:
+            raise CostLimitExceeded(f"cost limit of {self.limit} steps exceeded")
+
+
+# Process-wide limits
+_settings = get_settings()
+rule_cost_budget = _settings.rule_cost_budget
+rule_cost_limit = _settings.rule_cost_limit
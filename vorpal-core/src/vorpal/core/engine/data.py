@@ -0,0 +1,54 @@
+"""Reference data documents that rule conditions read through ``data``.
+
+Each stored document is exposed to rules as ``data.<name>``. Documents
+are loaded into the policy snapshot, so they are versioned with the
+policy set: changing one bumps the policy-set version, which swaps the
+snapshot on every worker and invalidates cached decisions and residuals.
+
+Lists of strings are loaded as ``StringSet`` so that
+``x in data.approved_vendors`` is a hash lookup instead of a scan.
+"""
+
+from collections.abc import Iterable, Mapping
+from types import MappingProxyType
+from typing import Any
+
+# Data document names must be CEL identifiers so ``data.<name>`` parses
+NAME_PATTERN = r"^[A-Za-z_][A-Za-z0-9_]*$"
+
+
+class StringSet(list[str]):
+    """A list of strings with constant-time membership.
+
+    It behaves as a CEL list in every other respect (indexing, ``size``,
+    comprehensions, equality), so rules see no difference.
+    """
+
+    def __init__(self, items: Iterable[str] = ()):
+        super().__init__(items)
+        self._members = frozenset(self)
+
+    def __contains__(self, item: object) -> bool:
+        try:
+            return item in self._members
+        except TypeError:
+            return False
+
+
+def load_document(content: Any) -> Any:
+    """Prepare stored JSON content for evaluation.
+
+    Lists made only of strings, at any depth, become ``StringSet``.
+    """
+    if isinstance(content, Mapping):
+        return {key: load_document(value) for key, value in content.items()}
+    if isinstance(content, list):
+        if content and all(isinstance(item, str) for item in content):
+            return StringSet(content)
+        return [load_document(item) for item in content]
+    return content
+
+
+def load_documents(documents: Mapping[str, Any]) -> Mapping[str, Any]:
+    """Prepare documents by name into the read-only ``data`` variable."""
+    return MappingProxyType({name: load_document(c) for name, c in documents.items()})
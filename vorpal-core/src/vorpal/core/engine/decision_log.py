@@ -0,0 +1,210 @@
+"""Sampled decision log, written off the request path.
+
+Sampled requests append decision records to a bounded in-memory ring
+buffer; when it is full the oldest unwritten records are dropped. A
+background task drains the buffer every ``flush_interval`` seconds and
+appends the records, one JSON object per line, to gzip-compressed
+segment files in ``directory``. Each flush is written as its own gzip member, so a
+segment is readable at any time, including while it is being written.
+A segment is closed once it reaches ``segment_bytes`` and the oldest
+segments beyond ``max_segments`` are deleted.
+"""
+
+import asyncio
+import contextlib
+import gzip
+import json
+import logging
+import os
+import random
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Iterator
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+from vorpal.core.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_PREFIX = "decisions-"
+SEGMENT_SUFFIX = ".ndjson.gz"
+
+
+def segment_paths(directory: str | os.PathLike[str]) -> list[Path]:
+    """Segment files in a directory, oldest first."""
+    root = Path(directory)
+    if not root.is_dir():
+        return []
+    return sorted(root.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}"))
+
+
+def read_segments(
+    directory: str | os.PathLike[str],
+    since: datetime | None = None,
+    limit: int | None = None,
+) -> Iterator[dict[str, Any]]:
+    """Yield logged decision records, oldest first.
+
+    Args:
+        directory: Directory holding the segment files.
+        since: Only yield records timestamped at or after this time;
+            naive times are taken as UTC.
+        limit: Stop after this many records.
+    """
+    if since is not None and since.tzinfo is None:
+        since = since.replace(tzinfo=UTC)
+    count = 0
+    for path in segment_paths(directory):
+        try:
+            with gzip.open(path, "rt", encoding="utf-8") as segment:
+                for line in segment:
+                    record = json.loads(line)
+                    if since is not None and datetime.fromisoformat(record["ts"]) < since:
+                        continue
+                    yield record
+                    count += 1
+                    if limit is not None and count >= limit:
+                        return
+        except FileNotFoundError:
+            continue  # Deleted by retention while listing
+        except EOFError:
+            continue  # A flush cut short by a crash; keep what was read
+
+
+class DecisionLog:
+    """Samples decision records into a ring buffer and writes them to disk.
+
+    Args:
+        directory: Where segment files are written; None disables the log.
+        sample_rate: Fraction of decisions recorded.
+        buffer_size: Records held in memory between flushes.
+        segment_bytes: Compressed size at which a segment is closed.
+        max_segments: Segments kept; older ones are deleted.
+        flush_interval: Seconds between flushes.
+        rng: Source of uniform [0, 1) numbers for sampling.
+        clock: Returns the current time for record timestamps.
+    """
+
+    def __init__(
+        self,
+        directory: str | None = None,
+        sample_rate: float = 1.0,
+        buffer_size: int = 10_000,
+        segment_bytes: int = 64 * 1024 * 1024,
+        max_segments: int = 20,
+        flush_interval: float = 1.0,
+        rng: Callable[[], float] = random.random,
+        clock: Callable[[], datetime] = lambda: datetime.now(UTC),
+    ):
+        self.directory = Path(directory) if directory else None
+        self.sample_rate = sample_rate
+        self.segment_bytes = segment_bytes
+        self.max_segments = max_segments
+        self.flush_interval = flush_interval
+        self._rng = rng
+        self._clock = clock
+        self._buffer: deque[dict[str, Any]] = deque(maxlen=buffer_size)
+        self._segment: Path | None = None
+        self._sequence = 0
+        self.recorded = 0
+        self.dropped = 0
+        self.written = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.directory is not None and self.sample_rate > 0
+
+    def sampled(self) -> bool:
+        """Whether to record the next decision.
+
+        Callers check this before building a record, so decisions that
+        are not sampled cost nothing to serialize.
+        """
+        return self.enabled and (self.sample_rate >= 1 or self._rng() < self.sample_rate)
+
+    def record(self, entry: dict[str, Any]) -> None:
+        """Buffer a sampled decision record; never blocks."""
+        if not self.enabled:
+            return
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+        self._buffer.append({"ts": self._clock().isoformat(), **entry})
+        self.recorded += 1
+
+    async def flush(self) -> int:
+        """Write buffered records to the current segment.
+
+        Returns:
+            The number of records written.
+        """
+        if not self._buffer:
+            return 0
+        records = list(self._buffer)
+        self._buffer.clear()
+        payload = "".join(json.dumps(r, separators=(",", ":"), default=str) + "\n" for r in records)
+        await asyncio.to_thread(self._write, payload.encode())
+        self.written += len(records)
+        return len(records)
+
+    def _write(self, payload: bytes) -> None:
+        assert self.directory is not None
+        if self._segment is None or (
+            self._segment.exists() and self._segment.stat().st_size >= self.segment_bytes
+        ):
+            self._segment = self._new_segment()
+        with open(self._segment, "ab") as segment:
+            segment.write(gzip.compress(payload))
+
+    def _new_segment(self) -> Path:
+        assert self.directory is not None
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._sequence += 1
+        stamp = self._clock().strftime("%Y%m%dT%H%M%S")
+        path = self.directory / (
+            f"{SEGMENT_PREFIX}{stamp}-{os.getpid()}-{self._sequence:06d}{SEGMENT_SUFFIX}"
+        )
+        # Keep room for the new segment within max_segments
+        existing = segment_paths(self.directory)
+        for old in existing[: max(0, len(existing) - self.max_segments + 1)]:
+            with contextlib.suppress(FileNotFoundError):
+                old.unlink()
+        return path
+
+    @contextlib.asynccontextmanager
+    async def running(self) -> AsyncIterator[None]:
+        """Flush in the background for the duration of the context."""
+        if not self.enabled:
+            yield
+            return
+        task = asyncio.create_task(self._run())
+        try:
+            yield
+        finally:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+            try:
+                await self.flush()
+            except OSError:
+                logger.exception("Failed to flush the decision log")
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except OSError:
+                logger.exception("Failed to write the decision log")
+
+
+# Process-wide decision log
+_settings = get_settings()
+decision_log = DecisionLog(
+    directory=_settings.decision_log_dir,
+    sample_rate=_settings.decision_log_sample_rate,
+    buffer_size=_settings.decision_log_buffer_size,
+    segment_bytes=_settings.decision_log_segment_bytes,
+    max_segments=_settings.decision_log_max_segments,
+    flush_interval=_settings.decision_log_flush_interval,
+)
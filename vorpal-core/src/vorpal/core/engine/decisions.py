@@ -0,0 +1,173 @@
+"""LRU + TTL cache of policy decisions."""
+
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Mapping
+from typing import Any
+
+from vorpal.core.config import get_settings
+
+DecisionKey = tuple[str, int, int, bytes]
+
+
+def fingerprint(*parts: Any) -> bytes:
+    """Stable digest of JSON-compatible values."""
+    serialized = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(serialized.encode(), digest_size=16).digest()
+
+
+class DecisionCache:
+    """Caches evaluation results for identical requests.
+
+    Keys combine the system ID, a per-system generation (bumped when
+    the system or its controls change in this process, once the change
+    commits), the policy-set version, and a fingerprint of the system
+    fields, action, context and evaluation mode. Because the
+    fingerprint covers the system fields that rules can see, changes
+    made through another worker are also picked up; the TTL bounds
+    staleness for changes the fingerprint cannot see.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10_000,
+        ttl: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._generations: dict[str, int] = {}
+        self._policy_version: int | None = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl > 0
+
+    def key(
+        self,
+        system: Mapping[str, Any],
+        action: str,
+        context: Mapping[str, Any],
+        policy_version: int,
+        mode: str = "full",
+    ) -> DecisionKey:
+        """Build the cache key for an evaluation."""
+        system_id = system["id"]
+        return (
+            system_id,
+            self._generations.get(system_id, 0),
+            policy_version,
+            fingerprint(system, action, context, mode),
+        )
+
+    def get(self, key: DecisionKey) -> Any | None:
+        """Return a cached decision, or None on miss or expiry."""
+        self._check_policy_version(key[2])
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: DecisionKey, value: Any) -> None:
+        """Store a decision."""
+        if not self.enabled:
+            return
+        self._check_policy_version(key[2])
+        self._entries[key] = (self._clock() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate_system(self, system_id: str) -> None:
+        """Invalidate every cached decision for a system."""
+        self._generations[system_id] = self._generations.get(system_id, 0) + 1
+
+    def clear(self) -> None:
+        """Drop all cached decisions."""
+        self._entries.clear()
+
+    def _check_policy_version(self, version: int) -> None:
+        # Entries for an older policy set can never hit again
+        if version != self._policy_version:
+            if self._policy_version is not None:
+                self._entries.clear()
+            self._policy_version = version
+
+    def stats(self) -> dict[str, Any]:
+        """Hit/miss counters and current size."""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class LastKnownDecisions:
+    """The most recent decision per (system, action), for degraded responses.
+
+    Entries never expire; readers pass the oldest age they accept. Only
+    ``max_size`` pairs are kept, least recently updated first out.
+    """
+
+    def __init__(self, max_size: int = 10_000, clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self._clock = clock
+        self._entries: OrderedDict[tuple[str, str], tuple[float, Any]] = OrderedDict()
+
+    def put(self, system_id: str, action: str, value: Any) -> None:
+        """Record the latest decision for a system and action."""
+        if self.max_size <= 0:
+            return
+        key = (system_id, action)
+        self._entries[key] = (self._clock(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def get(self, system_id: str, action: str, max_age: float) -> tuple[Any, float] | None:
+        """Return ``(decision, age in seconds)``, or None if unknown or too old."""
+        entry = self._entries.get((system_id, action))
+        if entry is None:
+            return None
+        recorded_at, value = entry
+        age = self._clock() - recorded_at
+        if age > max_age:
+            return None
+        return value, age
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Process-wide decision caches
+_settings = get_settings()
+decision_cache = DecisionCache(
+    max_size=_settings.decision_cache_size,
+    ttl=_settings.decision_cache_ttl,
+)
+last_known_decisions = LastKnownDecisions(max_size=_settings.decision_cache_size)
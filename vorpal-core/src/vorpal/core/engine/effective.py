@@ -0,0 +1,154 @@
+"""Precomputed effective policy sets per system.
+
+Which policies govern a system depends only on its risk tier, type and
+tags, and on the action. Systems that share those attributes share a
+profile, and the mapping is kept per profile, so a fleet needs only as
+many entries as it has distinct profiles. A system whose risk tier,
+type or tags change simply maps to another profile; nothing is
+recomputed for it.
+
+For each profile the mapping holds the policies that apply to every
+action and, per action named in some policy's match criteria, the
+policies limited to that action. When the policy set changes, only the
+policies whose match criteria changed are re-matched against each
+known profile.
+"""
+
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from typing import Any
+
+from vorpal.core.config import get_settings
+from vorpal.core.engine.index import policy_actions, policy_matches
+from vorpal.core.engine.snapshot import CompiledPolicy, PolicySnapshot
+
+# (risk_tier, type, tags)
+Profile = tuple[str, str, frozenset[str]]
+
+
+def profile_of(system: Mapping[str, Any]) -> Profile:
+    """The attributes of a system that match criteria can read."""
+    return system["risk_tier"], system["type"], frozenset(system.get("tags") or ())
+
+
+@dataclass(slots=True)
+class EffectiveSet:
+    """Policy IDs that apply to one profile."""
+
+    any_action: set[str] = field(default_factory=set)
+    by_action: dict[str, set[str]] = field(default_factory=dict)
+
+    def add(self, profile: Profile, policy_id: str, criteria: Mapping[str, Any]) -> None:
+        """Add a policy if its criteria match the profile."""
+        risk_tier, system_type, tags = profile
+        scoped = {k: v for k, v in criteria.items() if k != "action"}
+        if not policy_matches(scoped, risk_tier, system_type, "", tags):
+            return
+        actions = policy_actions(criteria)
+        if actions is None:
+            self.any_action.add(policy_id)
+            return
+        for action in actions:
+            if isinstance(action, str):
+                self.by_action.setdefault(action, set()).add(policy_id)
+
+    def discard(self, policy_id: str) -> None:
+        """Remove a policy wherever it appears."""
+        self.any_action.discard(policy_id)
+        for action, ids in list(self.by_action.items()):
+            ids.discard(policy_id)
+            if not ids:
+                del self.by_action[action]
+
+    def for_action(self, action: str) -> set[str]:
+        """IDs of the policies that apply to an action."""
+        return self.any_action | self.by_action.get(action, set())
+
+
+class EffectivePolicies:
+    """Effective policy sets per profile, kept in step with the policy set.
+
+    Args:
+        max_profiles: Profiles kept; the least recently used are dropped
+            and rebuilt on their next lookup.
+    """
+
+    def __init__(self, max_profiles: int = 10_000):
+        self.max_profiles = max_profiles
+        self._version: int | None = None
+        self._criteria: dict[str, Mapping[str, Any]] = {}
+        self._profiles: OrderedDict[Profile, EffectiveSet] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, snapshot: PolicySnapshot, system: Mapping[str, Any]) -> EffectiveSet:
+        """The effective set for a system at the snapshot's version."""
+        self._sync(snapshot)
+        profile = profile_of(system)
+        entry = self._profiles.get(profile)
+        if entry is not None:
+            self._profiles.move_to_end(profile)
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        entry = EffectiveSet()
+        for policy_id, criteria in self._criteria.items():
+            entry.add(profile, policy_id, criteria)
+        self._profiles[profile] = entry
+        while len(self._profiles) > self.max_profiles:
+            self._profiles.popitem(last=False)
+        return entry
+
+    def policies(
+        self, snapshot: PolicySnapshot, system: Mapping[str, Any], action: str | None = None
+    ) -> dict[str, list[CompiledPolicy]]:
+        """Policies governing a system, keyed by action.
+
+        Key ``"*"`` holds the policies that apply to every action; each
+        named action lists those plus the policies limited to it. With
+        ``action``, only that action is returned. Policies are ordered
+        by name.
+        """
+        entry = self.lookup(snapshot, system)
+        by_id = {p.id: p for p in snapshot.all_policies}
+
+        def resolve(ids: set[str]) -> list[CompiledPolicy]:
+            return sorted((by_id[i] for i in ids if i in by_id), key=lambda p: p.name)
+
+        if action is not None:
+            return {action: resolve(entry.for_action(action))}
+        result = {"*": resolve(entry.any_action)}
+        for name in sorted(entry.by_action):
+            result[name] = resolve(entry.for_action(name))
+        return result
+
+    def _sync(self, snapshot: PolicySnapshot) -> None:
+        # Re-match only the policies whose match criteria changed
+        if snapshot.version == self._version:
+            return
+        current = {p.id: p.match_criteria for p in snapshot.all_policies}
+        changed = {
+            policy_id
+            for policy_id in current.keys() | self._criteria.keys()
+            if current.get(policy_id) != self._criteria.get(policy_id)
+        }
+        if len(changed) > len(current) // 2:
+            self._profiles.clear()  # Cheaper to rebuild entries as they are looked up
+        else:
+            for profile, entry in self._profiles.items():
+                for policy_id in changed:
+                    entry.discard(policy_id)
+                    if policy_id in current:
+                        entry.add(profile, policy_id, current[policy_id])
+        self._criteria = current
+        self._version = snapshot.version
+
+    def __len__(self) -> int:
+        return len(self._profiles)
+
+
+# Process-wide effective policy sets
+_settings = get_settings()
+effective_policies = EffectivePolicies(max_profiles=_settings.effective_policy_profiles)
@@ -0,0 +1,149 @@
+"""Evaluate a policy snapshot against a system action."""
+
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass, field
+from enum import StrEnum
+from typing import Any
+
+from vorpal.core.engine import cost
+from vorpal.core.engine.compiler import MEMO, METER
+from vorpal.core.engine.cost import Meter
+from vorpal.core.engine.partial import SystemResiduals
+from vorpal.core.engine.programs import evaluate_rule
+from vorpal.core.engine.snapshot import CompiledPolicy, CompiledRule, PolicySnapshot
+from vorpal.core.engine.telemetry import telemetry
+from vorpal.core.models.policy import PolicySeverity
+
+
+class EvaluationMode(StrEnum):
+    """How much detail an evaluation produces."""
+
+    FULL = "full"  # Every rule of every matching policy
+    SUMMARY = "summary"  # Every rule, but no per-rule outcomes
+    FAIL_FAST = "fail_fast"  # Stop at the first blocking failure
+
+
+@dataclass(slots=True)
+class RuleOutcome:
+    """Result of evaluating one rule."""
+
+    rule: CompiledRule
+    passed: bool
+    error: str | None = None
+    cost: int = 0  # Evaluation steps used
+
+
+@dataclass(slots=True)
+class PolicyOutcome:
+    """Result of evaluating one policy."""
+
+    policy: CompiledPolicy
+    passed: bool
+    rules: list[RuleOutcome]
+
+
+@dataclass(slots=True)
+class Decision:
+    """Aggregate result of evaluating every matching policy."""
+
+    policies: list[PolicyOutcome] = field(default_factory=list)
+    blocking_failures: list[str] = field(default_factory=list)
+    warnings: list[str] = field(default_factory=list)
+    cost: int = 0  # Evaluation steps used by all rules
+
+    @property
+    def policies_failed(self) -> int:
+        return sum(1 for p in self.policies if not p.passed)
+
+    @property
+    def allowed(self) -> bool:
+        return self.policies_failed == 0
+
+
+def check_rule(rule: CompiledRule, activation: dict[str, Any]) -> tuple[bool, str | None]:
+    """Evaluate a compiled rule; rules that failed to compile count as failed."""
+    if rule.program is None:
+        return False, rule.compile_error
+    return evaluate_rule(rule.program, activation)
+
+
+def evaluate(
+    snapshot: PolicySnapshot,
+    system: Mapping[str, Any],
+    action: str,
+    context: Mapping[str, Any],
+    mode: EvaluationMode = EvaluationMode.FULL,
+    residuals: SystemResiduals | None = None,
+    cost_limit: int | None = None,
+) -> Decision:
+    """Evaluate every policy in the snapshot that matches the system/action.
+
+    Args:
+        snapshot: The policy snapshot to evaluate against.
+        system: The ``system`` activation (see ``system_activation``).
+        action: The action being performed.
+        context: Caller-supplied request context.
+        mode: ``SUMMARY`` skips per-rule outcomes; ``FAIL_FAST`` also
+            stops at the first ERROR-severity failure, so later
+            policies are neither evaluated nor counted.
+        residuals: The rules partially evaluated against ``system``
+            (see ``partial``); only the residuals are run.
+        cost_limit: Steps each rule may use before it is aborted and
+            fails with an error; defaults to ``VORPAL_RULE_COST_LIMIT``.
+
+    Returns:
+        The decision, with per-policy and (in ``FULL`` mode) per-rule
+        outcomes.
+    """
+    meter = Meter(cost.rule_cost_limit if cost_limit is None else cost_limit)
+    activation = {
+        "system": system,
+        "context": context,
+        "data": snapshot.data,
+        MEMO: {},
+        METER: meter,
+    }
+    decision = Decision()
+    detailed = mode == EvaluationMode.FULL
+    fail_fast = mode == EvaluationMode.FAIL_FAST
+    shard = telemetry.shard()
+
+    for policy in snapshot.matching(system, action):
+        started = time.perf_counter()
+        outcomes: list[RuleOutcome] = []
+        policy_passed = True
+        residual_rules = residuals.rules(policy) if residuals is not None else None
+        counters = shard.policy(policy)
+        rule_counters = counters.bind(policy)
+
+        for position, rule in enumerate(policy.rules):
+            meter.reset()
+            if residual_rules is None:
+                passed, error = check_rule(rule, activation)
+            else:
+                passed, error = residual_rules[position].check(activation)
+            decision.cost += meter.used
+            if detailed:
+                outcomes.append(RuleOutcome(rule, passed, error, meter.used))
+
+            tally = rule_counters[position]
+            tally.evaluated += 1
+            if not passed:
+                tally.failed += 1
+                if error is not None:
+                    tally.errors += 1
+                if rule.severity == PolicySeverity.ERROR:
+                    policy_passed = False
+                    decision.blocking_failures.append(rule.message)
+                    if fail_fast:
+                        break
+                elif rule.severity == PolicySeverity.WARNING:
+                    decision.warnings.append(rule.message)
+
+        decision.policies.append(PolicyOutcome(policy, policy_passed, outcomes))
+        counters.record(policy_passed, time.perf_counter() - started)
+        if fail_fast and not policy_passed:
+            break
+
+    return decision
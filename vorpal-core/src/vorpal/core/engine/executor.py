@@ -0,0 +1,405 @@
+"""Process-pool execution of bulk policy evaluations.
+
+Rule evaluation is pure CPU. Small jobs run inline on the event loop;
+large ones (batch evaluation, fleet scans) are split into chunks and
+fanned out to worker processes so they use every core and do not
+starve other requests.
+
+Each worker holds its own copy of the policy snapshot. The pool lives
+for the life of the process: each policy-set version is pickled once,
+to a file, and chunks carry only its version and path with the systems
+to evaluate. A worker loads the snapshot the first time a chunk needs
+a version it does not hold, and keeps the latest one; rebuilding it
+reuses the worker's compiled programs for the rules that did not
+change. Decisions come back as plain tuples that reference policies
+by ID and rules by position, and are rebuilt against the caller's
+snapshot.
+"""
+
+import asyncio
+import contextlib
+import logging
+import multiprocessing
+import os
+import pickle
+import shutil
+import tempfile
+import time
+from collections.abc import Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any
+
+from vorpal.core.config import get_settings
+from vorpal.core.engine import columnar, cost
+from vorpal.core.engine.columnar import FleetColumns
+from vorpal.core.engine.compiler import MEMO, METER
+from vorpal.core.engine.cost import Meter
+from vorpal.core.engine.evaluator import (
+    Decision,
+    EvaluationMode,
+    PolicyOutcome,
+    RuleOutcome,
+    check_rule,
+    evaluate,
+)
+from vorpal.core.engine.snapshot import CompiledRule, PolicySnapshot
+from vorpal.core.engine.telemetry import telemetry
+from vorpal.core.models.policy import PolicySeverity
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+# (system activation, action, context, mode)
+EvaluationJob = tuple[Mapping[str, Any], str, Mapping[str, Any], EvaluationMode]
+
+# (policy outcomes, blocking failures, warnings, cost); each policy
+# outcome is (policy ID, passed, ((rule passed, rule error, rule cost), ...))
+PackedDecision = tuple[
+    tuple[tuple[str, bool, tuple[tuple[bool, str | None, int], ...]], ...],
+    list[str],
+    list[str],
+    int,
+]
+
+
+def spawn_pool(workers: int) -> ProcessPoolExecutor:
+    """Start a pool of worker processes for use from the event loop."""
+    # Spawn rather than fork: the parent has an event loop and
+    # open database connections that must not be inherited
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+    )
+
+
+def stop_pool(pool: ProcessPoolExecutor) -> None:
+    """Stop a pool without waiting for its workers."""
+    # Tasks already submitted still complete on the old pool
+    pool.shutdown(wait=False)
+
+
+def evaluate_jobs(snapshot: PolicySnapshot, jobs: Sequence[EvaluationJob]) -> list[Decision]:
+    """Evaluate jobs in the current thread.
+
+    Large job lists sharing one evaluation mode go through the columnar
+    path when the snapshot has rules with a columnar form.
+    """
+    if (
+        snapshot.vectorized
+        and columnar.available()
+        and len(jobs) >= columnar.MIN_ROWS
+        and len({job[3] for job in jobs}) == 1
+    ):
+        return evaluate_columnar(snapshot, jobs)
+    return [evaluate(snapshot, *job) for job in jobs]
+
+
+def evaluate_columnar(snapshot: PolicySnapshot, jobs: Sequence[EvaluationJob]) -> list[Decision]:
+    """Evaluate jobs that share an evaluation mode, column-at-a-time.
+
+    Produces the same decisions as calling ``evaluate`` for each job.
+    """
+    mode = jobs[0][3]
+    detailed = mode == EvaluationMode.FULL
+    fail_fast = mode == EvaluationMode.FAIL_FAST
+
+    systems = [job[0] for job in jobs]
+    columns = FleetColumns(systems)
+    decisions = [Decision() for _ in jobs]
+    activations: list[dict[str, Any] | None] = [None] * len(jobs)
+    stopped = np.zeros(len(jobs), dtype=bool)
+    row_cost = np.zeros(len(jobs), dtype=np.int64)
+    meter = Meter(cost.rule_cost_limit)
+    shard = telemetry.shard()
+
+    def activation(row: int) -> dict[str, Any]:
+        act = activations[row]
+        if act is None:
+            act = activations[row] = {
+                "system": systems[row],
+                "context": jobs[row][2],
+                "data": snapshot.data,
+                MEMO: {},
+                METER: meter,
+            }
+        return act
+
+    def check(rule: CompiledRule, row: int) -> tuple[bool, str | None, int]:
+        meter.reset()
+        passed, error = check_rule(rule, activation(row))
+        return passed, error, meter.used
+
+    # Systems with the same match mask share the same candidate policies
+    groups: dict[int, list[int]] = {}
+    for row, (system, action, _, _) in enumerate(jobs):
+        mask = snapshot.index.mask(
+            system["risk_tier"], system["type"], action, system.get("tags") or ()
+        )
+        groups.setdefault(mask, []).append(row)
+
+    for position, policy in enumerate(snapshot.policies):
+        bit = 1 << position
+        matched = [rows for mask, rows in groups.items() if mask & bit]
+        if not matched:
+            continue
+        rows = np.sort(np.concatenate([np.asarray(r, dtype=np.intp) for r in matched]))
+        if fail_fast:
+            rows = rows[~stopped[rows]]
+            if not len(rows):
+                continue
+
+        started = time.perf_counter()
+        counters = shard.policy(policy)
+        policy_failed = np.zeros(len(rows), dtype=bool)
+        active = np.ones(len(rows), dtype=bool)
+        outcomes: list[list[RuleOutcome]] | None = [[] for _ in rows] if detailed else None
+
+        for rule, tally in zip(policy.rules, counters.bind(policy), strict=True):
+            positions = np.flatnonzero(active) if fail_fast else np.arange(len(rows))
+            if not len(positions):
+                break
+            subset = rows[positions]
+            errors: dict[int, str | None] = {}
+
+            if (
+                rule.columnar is not None
+                and rule.program is not None
+                and (not meter.limit or rule.program.cost <= meter.limit)
+            ):
+                # Without comprehensions a rule always costs its base steps
+                passed, error = rule.columnar(columns, subset)
+                costs = np.full(len(subset), rule.program.cost, dtype=np.int64)
+                fallback = np.flatnonzero(error).tolist()
+                if fallback:
+                    # A columnar rule reads nothing but the vectorised
+                    # columns, so rows with equal values share a result
+                    memo: dict[Any, tuple[bool, str | None, int]] = {}
+                    for i in fallback:
+                        row = int(subset[i])
+                        key = columns.row_key(row)
+                        result = memo.get(key) if key is not None else None
+                        if result is None:
+                            result = check(rule, row)
+                            if key is not None:
+                                memo[key] = result
+                        passed[i], errors[i], costs[i] = result
+            else:
+                passed = np.empty(len(subset), dtype=bool)
+                costs = np.empty(len(subset), dtype=np.int64)
+                for i, row in enumerate(subset.tolist()):
+                    passed[i], errors[i], costs[i] = check(rule, row)
+            row_cost[subset] += costs
+
+            if outcomes is not None:
+                for i, (position_in_policy, ok, used) in enumerate(
+                    zip(positions.tolist(), passed.tolist(), costs.tolist(), strict=True)
+                ):
+                    outcomes[position_in_policy].append(RuleOutcome(rule, ok, errors.get(i), used))
+
+            failed = np.flatnonzero(~passed)
+            tally.evaluated += len(subset)
+            tally.failed += len(failed)
+            tally.errors += sum(1 for e in errors.values() if e is not None)
+            if rule.severity == PolicySeverity.ERROR:
+                policy_failed[positions[failed]] = True
+                for row in subset[failed].tolist():
+                    decisions[row].blocking_failures.append(rule.message)
+                if fail_fast:
+                    active[positions[failed]] = False
+            elif rule.severity == PolicySeverity.WARNING:
+                for row in subset[failed].tolist():
+                    decisions[row].warnings.append(rule.message)
+
+        if outcomes is not None:
+            for row, failed_policy, rule_outcomes in zip(
+                rows.tolist(), policy_failed.tolist(), outcomes, strict=True
+            ):
+                decisions[row].policies.append(
+                    PolicyOutcome(policy, not failed_policy, rule_outcomes)
+                )
+        else:
+            # Outcomes without per-rule detail are interchangeable; share them
+            shared = (PolicyOutcome(policy, True, []), PolicyOutcome(policy, False, []))
+            for row, failed_policy in zip(rows.tolist(), policy_failed.tolist(), strict=True):
+                decisions[row].policies.append(shared[failed_policy])
+
+        if fail_fast:
+            stopped[rows[policy_failed]] = True
+
+        # Rows are evaluated together; each is charged an equal share
+        share = (time.perf_counter() - started) / len(rows)
+        failures = int(policy_failed.sum())
+        if failures < len(rows):
+            counters.record(True, share, len(rows) - failures)
+        if failures:
+            counters.record(False, share, failures)
+
+    for decision, used in zip(decisions, row_cost.tolist(), strict=True):
+        decision.cost = used
+    return decisions
+
+
+def pack_decision(decision: Decision) -> PackedDecision:
+    """Reduce a decision to picklable primitives."""
+    policies = tuple(
+        (
+            outcome.policy.id,
+            outcome.passed,
+            tuple((rule.passed, rule.error, rule.cost) for rule in outcome.rules),
+        )
+        for outcome in decision.policies
+    )
+    return policies, decision.blocking_failures, decision.warnings, decision.cost
+
+
+def unpack_decision(snapshot: PolicySnapshot, packed: PackedDecision) -> Decision:
+    """Rebuild a decision against the snapshot it was evaluated with."""
+    policies, blocking_failures, warnings, used = packed
+    outcomes = []
+    for policy_id, passed, rules in policies:
+        policy = snapshot.by_id[policy_id]
+        outcomes.append(
+            PolicyOutcome(
+                policy,
+                passed,
+                [RuleOutcome(policy.rules[i], *rule) for i, rule in enumerate(rules)],
+            )
+        )
+    return Decision(outcomes, blocking_failures, warnings, used)
+
+
+# Worker-process state: the snapshot of the latest version a chunk needed
+_worker_snapshot: PolicySnapshot | None = None
+
+
+def _snapshot_for(version: int, path: str) -> PolicySnapshot:
+    global _worker_snapshot
+    if _worker_snapshot is None or _worker_snapshot.version != version:
+        with open(path, "rb") as f:
+            _worker_snapshot = pickle.load(f)
+    return _worker_snapshot
+
+
+def _evaluate_chunk(
+    version: int,
+    path: str,
+    jobs: Sequence[EvaluationJob],
+) -> tuple[list[PackedDecision], dict[str, Any]]:
+    snapshot = _snapshot_for(version, path)
+    decisions = [pack_decision(d) for d in evaluate_jobs(snapshot, jobs)]
+    # The worker's telemetry goes back to the parent with its results
+    return decisions, telemetry.drain()
+
+
+class EvaluationExecutor:
+    """Runs evaluation jobs inline or across a pool of worker processes.
+
+    Args:
+        workers: Worker processes; 0 evaluates everything inline.
+        chunk_size: Jobs per task sent to a worker. Jobs that fit in a
+            single chunk are evaluated inline, where pickling would
+            cost more than it saves.
+    """
+
+    def __init__(self, workers: int = 0, chunk_size: int = 256):
+        self.workers = workers
+        self.chunk_size = max(1, chunk_size)
+        self._pool: ProcessPoolExecutor | None = None
+        self._directory: str | None = None
+        # Pickled snapshots by version: (path, evaluations using it)
+        self._snapshots: dict[int, tuple[str, int]] = {}
+        self._latest: int | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0
+
+    def parallel(self, count: int) -> bool:
+        """Whether ``count`` jobs would be fanned out to worker processes."""
+        return self.enabled and count > self.chunk_size
+
+    def _pool_for(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            logger.info("Starting %d evaluation workers", self.workers)
+            self._pool = spawn_pool(self.workers)
+        return self._pool
+
+    def _acquire(self, snapshot: PolicySnapshot) -> str:
+        # The path of the pickled snapshot, written on first use of its version
+        entry = self._snapshots.get(snapshot.version)
+        if entry is None:
+            if self._directory is None:
+                self._directory = tempfile.mkdtemp(prefix="vorpal-snapshots-")
+            path = os.path.join(self._directory, f"{snapshot.version}.pickle")
+            with open(path, "wb") as f:
+                pickle.dump(snapshot, f)
+            entry = (path, 0)
+            if self._latest is None or snapshot.version > self._latest:
+                self._latest = snapshot.version
+        self._snapshots[snapshot.version] = (entry[0], entry[1] + 1)
+        return entry[0]
+
+    def _release(self, version: int) -> None:
+        path, users = self._snapshots[version]
+        self._snapshots[version] = (path, users - 1)
+        self._discard_unused()
+
+    def _discard_unused(self) -> None:
+        # Older versions go once no evaluation uses them; workers never need them again
+        for version, (path, users) in list(self._snapshots.items()):
+            if users == 0 and (version != self._latest or self._pool is None):
+                del self._snapshots[version]
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(path)
+        if not self._snapshots and self._directory is not None:
+            shutil.rmtree(self._directory, ignore_errors=True)
+            self._directory = None
+            self._latest = None
+
+    async def evaluate(
+        self, snapshot: PolicySnapshot, jobs: Sequence[EvaluationJob]
+    ) -> list[Decision]:
+        """Evaluate jobs, in order, without blocking the event loop."""
+        if not self.parallel(len(jobs)):
+            return evaluate_jobs(snapshot, jobs)
+
+        pool = self._pool_for()
+        path = self._acquire(snapshot)
+        loop = asyncio.get_running_loop()
+        chunks = [jobs[i : i + self.chunk_size] for i in range(0, len(jobs), self.chunk_size)]
+        try:
+            packed = await asyncio.gather(
+                *(
+                    loop.run_in_executor(pool, _evaluate_chunk, snapshot.version, path, chunk)
+                    for chunk in chunks
+                )
+            )
+        except BrokenProcessPool:
+            logger.exception("Evaluation worker died; evaluating inline")
+            self.shutdown()
+            return evaluate_jobs(snapshot, jobs)
+        finally:
+            self._release(snapshot.version)
+        for _, counters in packed:
+            telemetry.merge(counters)
+        return [unpack_decision(snapshot, d) for chunk, _ in packed for d in chunk]
+
+    def shutdown(self) -> None:
+        """Stop the worker processes; a later evaluation starts new ones."""
+        if self._pool is not None:
+            stop_pool(self._pool)
+            self._pool = None
+        self._discard_unused()
+
+
+# Process-wide executor
+_settings = get_settings()
+evaluation_executor = EvaluationExecutor(
+    workers=_settings.evaluation_workers,
+    chunk_size=_settings.evaluation_chunk_size,
+)
@@ -0,0 +1,141 @@
+"""Inverted index from match criteria to candidate policies.
+
+Each policy is a bit position in the snapshot. For every criterion
+(risk_tier, type, action, tag) the index maps a value to the bitmask
+of policies that accept it, plus a mask of policies that do not
+constrain that criterion at all. Finding the policies that apply to a
+request is then a handful of dict lookups and integer ANDs, no matter
+how many policies are loaded.
+"""
+
+from collections.abc import Iterable, Iterator, Mapping, Sequence
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from vorpal.core.engine.snapshot import CompiledPolicy
+
+# Criteria matched by value equality against a single system attribute
+_SCALAR_CRITERIA = ("risk_tier", "type", "action")
+
+# Bound on memoised (risk_tier, type, action) masks; actions are caller-supplied
+_MAX_MEMO = 4096
+
+
+def _criterion_values(value: Any) -> list[Any]:
+    if isinstance(value, str):
+        return [value]
+    if isinstance(value, Iterable) and not isinstance(value, Mapping):
+        return list(value)
+    return [value]
+
+
+def _required_tags(criteria: Mapping[str, Any]) -> list[Any] | None:
+    """Tags a policy requires (any-of), or None if it does not filter on tags."""
+    tag_criteria = criteria.get("tags")
+    if not isinstance(tag_criteria, Mapping) or "contains" not in tag_criteria:
+        return None
+    return _criterion_values(tag_criteria["contains"])
+
+
+def policy_actions(criteria: Mapping[str, Any]) -> list[Any] | None:
+    """Actions a policy is limited to, or None if it applies to every action."""
+    if "action" not in criteria:
+        return None
+    return _criterion_values(criteria["action"])
+
+
+def policy_matches(
+    criteria: Mapping[str, Any],
+    risk_tier: str,
+    system_type: str,
+    action: str,
+    tags: Iterable[str],
+) -> bool:
+    """Check a single policy's match criteria against a system/action."""
+    attributes = {"risk_tier": risk_tier, "type": system_type, "action": action}
+    for name in _SCALAR_CRITERIA:
+        if name in criteria and attributes[name] not in _criterion_values(criteria[name]):
+            return False
+
+    required = _required_tags(criteria)
+    if required is not None:
+        system_tags = set(tags)
+        if not any(tag in system_tags for tag in required):
+            return False
+
+    return True
+
+
+class MatchIndex:
+    """Bitmask index over a sequence of policies."""
+
+    __slots__ = ("_policies", "_values", "_unconstrained", "_tags", "_untagged", "_memo")
+
+    def __init__(self, policies: Sequence["CompiledPolicy"]):
+        self._policies = tuple(policies)
+        self._values: dict[str, dict[Any, int]] = {name: {} for name in _SCALAR_CRITERIA}
+        self._unconstrained: dict[str, int] = dict.fromkeys(_SCALAR_CRITERIA, 0)
+        self._tags: dict[Any, int] = {}
+        self._untagged = 0
+        self._memo: dict[tuple[str, str, str], int] = {}
+
+        for position, policy in enumerate(self._policies):
+            bit = 1 << position
+            criteria = policy.match_criteria
+            for name in _SCALAR_CRITERIA:
+                if name not in criteria:
+                    self._unconstrained[name] |= bit
+                    continue
+                values = self._values[name]
+                for value in _criterion_values(criteria[name]):
+                    try:
+                        values[value] = values.get(value, 0) | bit
+                    except TypeError:
+                        continue  # Unhashable value can never equal a string attribute
+
+            required = _required_tags(criteria)
+            if required is None:
+                self._untagged |= bit
+                continue
+            for tag in required:
+                try:
+                    self._tags[tag] = self._tags.get(tag, 0) | bit
+                except TypeError:
+                    continue
+
+    def _base_mask(self, risk_tier: str, system_type: str, action: str) -> int:
+        key = (risk_tier, system_type, action)
+        mask = self._memo.get(key)
+        if mask is None:
+            mask = -1
+            for name, value in zip(_SCALAR_CRITERIA, key, strict=True):
+                mask &= self._values[name].get(value, 0) | self._unconstrained[name]
+            if len(self._memo) >= _MAX_MEMO:
+                self._memo.clear()
+            self._memo[key] = mask
+        return mask
+
+    def mask(self, risk_tier: str, system_type: str, action: str, tags: Iterable[str]) -> int:
+        """Bitmask of policies whose criteria match."""
+        mask = self._base_mask(risk_tier, system_type, action)
+        if not mask:
+            return 0
+        tag_mask = self._untagged
+        for tag in tags:
+            tag_mask |= self._tags.get(tag, 0)
+        return mask & tag_mask
+
+    def candidates(
+        self,
+        risk_tier: str,
+        system_type: str,
+        action: str,
+        tags: Iterable[str],
+    ) -> Iterator["CompiledPolicy"]:
+        """Yield matching policies in snapshot order."""
+        mask = self.mask(risk_tier, system_type, action, tags)
+        policies = self._policies
+        while mask:
+            low = mask & -mask
+            yield policies[low.bit_length() - 1]
+            mask ^= low
@@ -0,0 +1,39 @@
+"""Invalidate what is cached about systems when their data changes."""
+
+from collections.abc import Iterable
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from vorpal.core.engine.decisions import decision_cache
+from vorpal.core.engine.partial import residual_store
+from vorpal.core.models.control import SystemControl
+
+
+def invalidate_systems(session: AsyncSession, system_ids: Iterable[str]) -> None:
+    """Invalidate systems' cached decisions and residuals once ``session`` commits.
+
+    Invalidating earlier would let a concurrent evaluation, still reading
+    the uncommitted rows' old values, cache its decision under the new
+    generation. Nothing is invalidated if the session rolls back.
+    """
+    ids = list(system_ids)
+
+    def invalidate(_session: Session) -> None:
+        for system_id in ids:
+            decision_cache.invalidate_system(system_id)
+            residual_store.invalidate_system(system_id)
+
+    event.listen(session.sync_session, "after_commit", invalidate, once=True)
+
+
+async def invalidate_control(session: AsyncSession, control_id: str) -> None:
+    """Invalidate every system a catalog control is assigned to, once ``session`` commits.
+
+    Call before the control is deleted, while its assignments still exist.
+    """
+    result = await session.execute(
+        select(SystemControl.system_id).where(SystemControl.control_id == control_id)
+    )
+    invalidate_systems(session, result.scalars())
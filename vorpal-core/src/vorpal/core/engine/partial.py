@@ -0,0 +1,325 @@
+"""Partial evaluation of rules against a known system.
+
+Rule conditions mostly read facts that change rarely (``system``
+columns, controls, team, owner, and ``data`` documents) and only
+sometimes the per-request ``context``. Given a system, every
+sub-expression that reads nothing but ``system`` and ``data`` is
+evaluated once and replaced by its value, leaving a residual expression
+over ``context``. Rules that collapse to a constant
+become a stored outcome, so evaluating them is a lookup.
+
+Folding is metered against the rule cost limit. A rule whose folding
+goes over the limit is not partially evaluated; the original program
+runs per request and is aborted exactly as without residuals.
+
+Residuals are computed lazily, per policy, the first time a system is
+evaluated after it (or the policy set) changes, and kept in a
+per-process ``ResidualStore``.
+"""
+
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Collection, Mapping
+from dataclasses import dataclass
+from typing import Any
+
+from vorpal.core.config import get_settings
+from vorpal.core.engine import cost
+from vorpal.core.engine.activation import RELATIONS
+from vorpal.core.engine.cel import (
+    Binary,
+    Call,
+    CelEvaluationError,
+    CelSyntaxError,
+    Comprehension,
+    Conditional,
+    Index,
+    ListExpr,
+    Literal,
+    MapExpr,
+    Node,
+    Select,
+    Unary,
+    free_variables,
+)
+from vorpal.core.engine.compiler import METER, Activation, Program, compile_ast, type_name
+from vorpal.core.engine.cost import CostLimitExceeded, Meter
+from vorpal.core.engine.decisions import fingerprint
+from vorpal.core.engine.programs import evaluate_rule
+from vorpal.core.engine.snapshot import CompiledPolicy, CompiledRule
+
+_STATIC = frozenset({"system", "data"})
+
+
+def residualize(
+    ast: Node,
+    system: Mapping[str, Any],
+    data: Mapping[str, Any] | None = None,
+    cost_limit: int = 0,
+) -> Node:
+    """Fold every sub-expression that only reads ``system`` and ``data`` into a literal.
+
+    Sub-expressions whose evaluation fails are left in place, so the
+    error is raised, with the same message, when the residual runs.
+    Evaluating the residual against
+    ``{"system": system, "data": data, "context": c}`` always gives the
+    same result as the original expression.
+
+    Args:
+        cost_limit: Steps all folding may use; 0 means unlimited.
+
+    Raises:
+        CostLimitExceeded: If folding goes over ``cost_limit``.
+    """
+    activation = {"system": system, "data": data or {}, METER: Meter(cost_limit)}
+    return _fold(ast, activation, _STATIC)
+
+
+def _fold(node: Node, activation: Activation, static: frozenset[str]) -> Node:
+    if isinstance(node, Literal):
+        return node
+    if free_variables(node) <= static:
+        try:
+            value = compile_ast(node).evaluate(activation)
+        except CostLimitExceeded:
+            raise
+        except CelEvaluationError:
+            pass
+        else:
+            return Literal(value, type_name(value))
+
+    def fold(child: Node) -> Node:
+        return _fold(child, activation, static)
+
+    if isinstance(node, Select):
+        return Select(fold(node.operand), node.field, node.test_only)
+    if isinstance(node, Index):
+        return Index(fold(node.operand), fold(node.index))
+    if isinstance(node, Call):
+        target = fold(node.target) if node.target is not None else None
+        return Call(node.function, target, tuple(fold(a) for a in node.args))
+    if isinstance(node, Comprehension):
+        # The bound variable shadows a root variable of the same name
+        body = _fold(node.body, activation, static - {node.var})
+        return Comprehension(node.kind, fold(node.range), node.var, body)
+    if isinstance(node, Unary):
+        return Unary(node.op, fold(node.operand))
+    if isinstance(node, Binary):
+        left, right = fold(node.left), fold(node.right)
+        # false && x is false and true || x is true, even if x fails
+        decisive = node.op == "||"
+        if node.op in ("&&", "||"):
+            for side in (left, right):
+                if isinstance(side, Literal) and side.value is decisive:
+                    return side
+        return Binary(node.op, left, right)
+    if isinstance(node, Conditional):
+        cond = fold(node.cond)
+        if isinstance(cond, Literal) and isinstance(cond.value, bool):
+            return fold(node.then if cond.value else node.otherwise)
+        return Conditional(cond, fold(node.then), fold(node.otherwise))
+    if isinstance(node, ListExpr):
+        return ListExpr(tuple(fold(e) for e in node.elements))
+    if isinstance(node, MapExpr):
+        return MapExpr(tuple((fold(k), fold(v)) for k, v in node.entries))
+    return node  # Ident
+
+
+@dataclass(frozen=True, slots=True)
+class ResidualRule:
+    """A rule partially evaluated against one system.
+
+    Either ``program`` is the residual to run per request, or the rule
+    did not depend on the request and ``outcome`` is its result.
+    """
+
+    program: Program | None
+    outcome: tuple[bool, str | None] = (False, None)
+
+    def check(self, activation: Activation) -> tuple[bool, str | None]:
+        """Evaluate the rule; same result as ``evaluator.check_rule``."""
+        if self.program is None:
+            return self.outcome
+        return evaluate_rule(self.program, activation)
+
+
+def residual_rule(
+    rule: CompiledRule,
+    system: Mapping[str, Any],
+    data: Mapping[str, Any] | None = None,
+    cost_limit: int | None = None,
+) -> ResidualRule:
+    """Partially evaluate a compiled rule against a system and data documents.
+
+    Args:
+        cost_limit: Steps folding may use before the rule is left
+            unfolded; defaults to ``VORPAL_RULE_COST_LIMIT``.
+    """
+    if rule.program is None:
+        return ResidualRule(None, (False, rule.compile_error))
+    try:
+        residual = residualize(
+            rule.program.ast,
+            system,
+            data,
+            cost.rule_cost_limit if cost_limit is None else cost_limit,
+        )
+    except CostLimitExceeded:
+        # Run the whole rule per request, metered as without residuals
+        return ResidualRule(rule.program)
+    try:
+        program = compile_ast(residual, rule.condition)
+    except CelSyntaxError:
+        # A folded value the compiler checks statically (a ``matches``
+        # pattern read from the system); keep evaluating the original
+        return ResidualRule(rule.program)
+    if isinstance(residual, Literal) or free_variables(residual) <= _STATIC:
+        return ResidualRule(None, evaluate_rule(program, {"system": system, "data": data or {}}))
+    return ResidualRule(program)
+
+
+class SystemResiduals:
+    """The policy set's rules partially evaluated against one system.
+
+    Args:
+        system: The ``system`` activation, including the related data
+            listed in ``relations``.
+        version: Policy-set version the residuals belong to.
+        relations: Relations loaded into ``system``.
+        data: The policy set's ``data`` documents at ``version``.
+        cost_limit: Steps folding each rule may use; defaults to
+            ``VORPAL_RULE_COST_LIMIT``.
+    """
+
+    def __init__(
+        self,
+        system: Mapping[str, Any],
+        version: int,
+        relations: Collection[str] = frozenset(),
+        data: Mapping[str, Any] | None = None,
+        cost_limit: int | None = None,
+    ):
+        self.system = system
+        self.version = version
+        self.relations = frozenset(relations)
+        self.data = data
+        self.cost_limit = cost_limit
+        self.fingerprint = fingerprint(_own_columns(system))
+        self._policies: dict[str, tuple[ResidualRule, ...]] = {}
+
+    def rules(self, policy: CompiledPolicy) -> tuple[ResidualRule, ...]:
+        """Residuals of a policy's rules, in rule order."""
+        residuals = self._policies.get(policy.id)
+        if residuals is None:
+            residuals = tuple(
+                residual_rule(rule, self.system, self.data, self.cost_limit)
+                for rule in policy.rules
+            )
+            self._policies[policy.id] = residuals
+        return residuals
+
+
+def _own_columns(system: Mapping[str, Any]) -> dict[str, Any]:
+    # Related data is not part of the fingerprint; the TTL bounds its staleness
+    return {k: v for k, v in system.items() if k not in RELATIONS}
+
+
+class ResidualStore:
+    """Per-system residuals, LRU-bounded and expiring after ``ttl``.
+
+    An entry is used only for the same policy-set version and the same
+    system columns it was built from; invalidating a system (after it
+    or its controls change) discards it, and bumps the system's
+    generation so residuals built from data read before the change are
+    not stored. Related data changed through another worker is picked
+    up when the entry expires.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 10_000,
+        ttl: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: OrderedDict[str, tuple[float, SystemResiduals]] = OrderedDict()
+        self._generations: dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl > 0
+
+    def get(
+        self,
+        system: Mapping[str, Any],
+        version: int,
+        relations: Collection[str] = frozenset(),
+    ) -> SystemResiduals | None:
+        """Return usable residuals for a system, or None.
+
+        Args:
+            system: The system's current ``system`` activation, without
+                related data.
+            version: Current policy-set version.
+            relations: Relations the evaluation needs.
+        """
+        entry = self._entries.get(system["id"])
+        if entry is not None:
+            expires_at, residuals = entry
+            if (
+                expires_at > self._clock()
+                and residuals.version == version
+                and residuals.relations >= frozenset(relations)
+                and residuals.fingerprint == fingerprint(_own_columns(system))
+            ):
+                self._entries.move_to_end(system["id"])
+                self.hits += 1
+                return residuals
+            del self._entries[system["id"]]
+        self.misses += 1
+        return None
+
+    def generation(self, system_id: str) -> int:
+        """How many times a system has been invalidated in this process."""
+        return self._generations.get(system_id, 0)
+
+    def put(self, residuals: SystemResiduals, generation: int | None = None) -> None:
+        """Store residuals, replacing any previous entry for the system.
+
+        Args:
+            residuals: The residuals to store.
+            generation: The system's ``generation`` before the data the
+                residuals were built from was read; if the system has
+                been invalidated since, nothing is stored.
+        """
+        system_id = residuals.system["id"]
+        if not self.enabled or generation not in (None, self.generation(system_id)):
+            return
+        self._entries[system_id] = (self._clock() + self.ttl, residuals)
+        self._entries.move_to_end(system_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate_system(self, system_id: str) -> None:
+        """Discard a system's residuals."""
+        self._generations[system_id] = self.generation(system_id) + 1
+        self._entries.pop(system_id, None)
+
+    def clear(self) -> None:
+        """Discard all residuals."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Process-wide residual store
+_settings = get_settings()
+residual_store = ResidualStore(
+    max_size=_settings.residual_cache_size,
+    ttl=_settings.residual_cache_ttl,
+)
@@ -0,0 +1,171 @@
+"""Caches of compiled rule conditions."""
+
+from collections import OrderedDict
+from collections.abc import Sequence
+from typing import Any
+
+from vorpal.core.engine.cel import CelError, CelSyntaxError, Node
+from vorpal.core.engine.compiler import (
+    Activation,
+    Program,
+    candidates,
+    compile_ast,
+    compile_expression,
+    repeated,
+    type_name,
+)
+
+ProgramKey = tuple[str, str, str]  # (policy id, policy version, rule name)
+
+
+class ProgramCache:
+    """Compiled programs keyed by (policy id, policy version, rule name).
+
+    Each entry also remembers the condition text it was compiled from,
+    so an edited rule is recompiled even if the policy version string
+    was not bumped. Conditions that fail to compile are cached as
+    errors to avoid re-parsing them on every evaluation.
+    """
+
+    def __init__(self, max_size: int = 10_000):
+        self._max_size = max_size
+        self._entries: OrderedDict[ProgramKey, tuple[str, Program | CelSyntaxError]] = OrderedDict()
+
+    def get(
+        self,
+        policy_id: str,
+        policy_version: str,
+        rule_name: str,
+        condition: str,
+    ) -> Program:
+        """Return the compiled program for a rule, compiling on first use.
+
+        Raises:
+            CelSyntaxError: If the condition does not compile.
+        """
+        key = (policy_id, policy_version, rule_name)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] != condition:
+            compiled: Program | CelSyntaxError
+            try:
+                compiled = compile_expression(condition)
+            except CelSyntaxError as e:
+                compiled = e
+            entry = (condition, compiled)
+            self._entries[key] = entry
+            if len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+        else:
+            self._entries.move_to_end(key)
+
+        if isinstance(entry[1], CelSyntaxError):
+            raise entry[1]
+        return entry[1]
+
+    def invalidate(self, policy_id: str) -> None:
+        """Drop all cached programs for a policy."""
+        for key in [k for k in self._entries if k[0] == policy_id]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        """Drop all cached programs."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SharedProgramCache:
+    """Programs that memoize the sub-expressions shared across a policy set.
+
+    Sub-expressions are numbered once, the first time they are seen, and
+    the number is the memo slot; numbers are never reused, so a slot
+    always means the same sub-expression. A rule's program only has to
+    be recompiled when the shared sub-expressions it contains change,
+    and only edited rules are walked again, so editing one policy
+    neither re-analyses nor recompiles the rules of the others.
+    Programs are kept for the rules of the policy set shared last.
+    """
+
+    def __init__(self) -> None:
+        self._numbers: dict[Node, int] = {}
+        self._nodes: dict[int, Node] = {}
+        self._next_number = 0
+        # id(ast) -> (ast, its candidates as numbers); the ast keeps the id valid
+        self._candidates: dict[int, tuple[Node, list[tuple[int, int]]]] = {}
+        self._programs: dict[tuple[str, int, frozenset[int]], Program] = {}
+
+    def share(self, programs: Sequence[Program]) -> list[Program]:
+        """Programs equivalent to ``programs`` that share repeated sub-expressions.
+
+        Args:
+            programs: Every rule program of the policy set, either as
+                compiled from its condition or as returned by an earlier
+                call.
+        """
+        found = {id(p.ast): self._candidates_of(p.ast) for p in programs}
+        self._candidates = {id(p.ast): (p.ast, found[id(p.ast)]) for p in programs}
+        shared = repeated(found.values())
+
+        kept: dict[tuple[str, int, frozenset[int]], Program] = {}
+        result: list[Program] = []
+        for program in programs:
+            used = frozenset(n for n, _ in found[id(program.ast)] if n in shared)
+            key = (program.source, id(program.ast), used)
+            compiled = kept.get(key) or self._programs.get(key)
+            if compiled is None:
+                if program.memo_slots == used:
+                    compiled = program
+                else:
+                    slots = {self._nodes[n]: n for n in used}
+                    compiled = compile_ast(program.ast, program.source, shared=slots)
+            kept[key] = compiled
+            result.append(compiled)
+        self._programs = kept
+
+        live = {n for numbers in found.values() for n, _ in numbers}
+        if len(self._numbers) > 4 * len(live) + 1024:
+            # Forget sub-expressions no rule contains any more
+            self._nodes = {n: node for n, node in self._nodes.items() if n in live}
+            self._numbers = {node: n for n, node in self._nodes.items()}
+        return result
+
+    def _candidates_of(self, ast: Node) -> list[tuple[int, int]]:
+        entry = self._candidates.get(id(ast))
+        if entry is not None and entry[0] is ast:
+            return entry[1]
+        numbered: list[tuple[int, int]] = []
+        for node, end in candidates(ast):
+            number = self._numbers.get(node)
+            if number is None:
+                number = self._numbers[node] = self._next_number
+                self._nodes[number] = node
+                self._next_number += 1
+            numbered.append((number, end))
+        return numbered
+
+    def __len__(self) -> int:
+        return len(self._programs)
+
+
+def evaluate_rule(program: Program, activation: Activation) -> tuple[bool, str | None]:
+    """Evaluate a rule condition.
+
+    Rules fail closed: an evaluation error or a non-boolean result
+    counts as a failed rule.
+
+    Returns:
+        Tuple of (passed, error message).
+    """
+    try:
+        result: Any = program.evaluate(activation)
+    except CelError as e:
+        return False, str(e)
+    if result is True or result is False:
+        return result, None
+    return False, f"condition evaluated to {type_name(result)}, expected bool"
+
+
+# Process-wide program caches
+program_cache = ProgramCache()
+shared_programs = SharedProgramCache()
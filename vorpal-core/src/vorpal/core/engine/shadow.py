@@ -0,0 +1,241 @@
+"""Background evaluation of shadow policies.
+
+A shadow policy is evaluated against real evaluation traffic without
+taking part in the decision. Requests only enqueue their inputs; a
+background task evaluates the snapshot's shadow policies after the
+response has been sent and keeps per-policy pass/fail counters and a
+sample of decision records. When the queue is full, shadow work is
+dropped rather than slowing requests down.
+"""
+
+import asyncio
+import contextlib
+import logging
+import random
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Mapping
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from vorpal.core.config import get_settings
+from vorpal.core.engine.activation import load_relations
+from vorpal.core.engine.evaluator import Decision, EvaluationMode, evaluate
+from vorpal.core.engine.snapshot import PolicySnapshot
+
+logger = logging.getLogger(__name__)
+
+# (shadow snapshot, system activation, action, context)
+ShadowJob = tuple[PolicySnapshot, Mapping[str, Any], str, Mapping[str, Any]]
+
+# Jobs evaluated per round, sharing one query per relation
+_BATCH_SIZE = 256
+
+
+@dataclass(slots=True)
+class ShadowPolicyStats:
+    """Outcome counters for one shadow policy."""
+
+    policy_id: str
+    policy_name: str
+    evaluated: int = 0
+    passed: int = 0
+    failed: int = 0
+    errors: int = 0  # Evaluations where a rule raised an error
+    rule_failures: dict[str, int] = field(default_factory=dict)
+
+
+class ShadowEvaluator:
+    """Queues shadow evaluations and runs them in the background.
+
+    Args:
+        queue_size: Pending evaluations kept; 0 disables shadow evaluation.
+        sample_rate: Fraction of evaluations kept as decision records.
+        sample_size: Most recent decision records kept.
+        rng: Source of uniform [0, 1) numbers for sampling.
+    """
+
+    def __init__(
+        self,
+        queue_size: int = 10_000,
+        sample_rate: float = 0.01,
+        sample_size: int = 1000,
+        rng: Callable[[], float] = random.random,
+    ):
+        self.queue_size = queue_size
+        self.sample_rate = sample_rate
+        self._rng = rng
+        self._queue: asyncio.Queue[ShadowJob] | None = None
+        self._policies: dict[str, ShadowPolicyStats] = {}
+        self._samples: deque[dict[str, Any]] = deque(maxlen=sample_size)
+        self.submitted = 0
+        self.dropped = 0
+        self.evaluated = 0
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def submit(
+        self,
+        snapshot: PolicySnapshot,
+        system: Mapping[str, Any],
+        action: str,
+        context: Mapping[str, Any],
+    ) -> None:
+        """Queue the snapshot's shadow policies for evaluation; never blocks."""
+        if snapshot.shadow is None:
+            return
+        self.submitted += 1
+        if self._queue is None:
+            self.dropped += 1
+            return
+        try:
+            self._queue.put_nowait((snapshot.shadow, system, action, context))
+        except asyncio.QueueFull:
+            self.dropped += 1
+
+    @contextlib.asynccontextmanager
+    async def running(
+        self, session_factory: async_sessionmaker[AsyncSession]
+    ) -> AsyncIterator[None]:
+        """Accept and evaluate shadow work for the duration of the context."""
+        if self.queue_size <= 0:
+            yield
+            return
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        task = asyncio.create_task(self._run(self._queue, session_factory))
+        try:
+            yield
+        finally:
+            self._queue = None
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    async def _run(
+        self,
+        queue: asyncio.Queue[ShadowJob],
+        session_factory: async_sessionmaker[AsyncSession],
+    ) -> None:
+        while True:
+            jobs = [await queue.get()]
+            while len(jobs) < _BATCH_SIZE and not queue.empty():
+                jobs.append(queue.get_nowait())
+            try:
+                await self._evaluate(jobs, session_factory)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Shadow evaluation failed")
+
+    async def _evaluate(
+        self,
+        jobs: list[ShadowJob],
+        session_factory: async_sessionmaker[AsyncSession],
+    ) -> None:
+        # Related data the shadow policies read but the request did not load
+        systems: dict[str, Mapping[str, Any]] = {}
+        needs: dict[str, frozenset[str]] = {}
+        for shadow, system, action, _ in jobs:
+            needed = shadow.requirements(system, action) - system.keys()
+            if needed and system["id"] is not None:
+                systems[system["id"]] = system
+                needs[system["id"]] = needs.get(system["id"], frozenset()) | needed
+        extra: dict[str, dict[str, Any]] = {}
+        if needs:
+            async with session_factory() as session:
+                extra = await load_relations(session, systems, needs)
+
+        prepared: list[ShadowJob] = [
+            (shadow, {**system, **extra.get(system["id"], {})}, action, context)
+            for shadow, system, action, context in jobs
+        ]
+        decisions = await asyncio.to_thread(_evaluate_jobs, prepared)
+        for (_, system, action, _), decision in zip(prepared, decisions, strict=True):
+            self._record(system, action, decision)
+
+    def _record(self, system: Mapping[str, Any], action: str, decision: Decision) -> None:
+        self.evaluated += 1
+        for outcome in decision.policies:
+            stats = self._policies.get(outcome.policy.id)
+            if stats is None or stats.policy_name != outcome.policy.name:
+                stats = self._policies[outcome.policy.id] = ShadowPolicyStats(
+                    outcome.policy.id, outcome.policy.name
+                )
+            stats.evaluated += 1
+            if outcome.passed:
+                stats.passed += 1
+            else:
+                stats.failed += 1
+            if any(r.error is not None for r in outcome.rules):
+                stats.errors += 1
+            for rule in outcome.rules:
+                if not rule.passed:
+                    stats.rule_failures[rule.rule.name] = (
+                        stats.rule_failures.get(rule.rule.name, 0) + 1
+                    )
+
+        if decision.policies and self._rng() < self.sample_rate:
+            self._samples.append(
+                {
+                    "system_id": system["id"],
+                    "action": action,
+                    "recorded_at": datetime.now(UTC),
+                    "policies": [
+                        {
+                            "policy_id": outcome.policy.id,
+                            "passed": outcome.passed,
+                            "failed_rules": [r.rule.name for r in outcome.rules if not r.passed],
+                        }
+                        for outcome in decision.policies
+                    ],
+                }
+            )
+
+    def stats(self) -> dict[str, Any]:
+        """Counters, per-policy outcomes and sampled decision records."""
+        return {
+            "enabled": self.queue_size > 0,
+            "submitted": self.submitted,
+            "dropped": self.dropped,
+            "evaluated": self.evaluated,
+            "pending": self.pending,
+            "policies": [
+                {
+                    "policy_id": s.policy_id,
+                    "policy_name": s.policy_name,
+                    "evaluated": s.evaluated,
+                    "passed": s.passed,
+                    "failed": s.failed,
+                    "errors": s.errors,
+                    "rule_failures": dict(s.rule_failures),
+                }
+                for s in self._policies.values()
+            ],
+            "samples": list(self._samples),
+        }
+
+    def reset(self) -> None:
+        """Discard counters and samples."""
+        self._policies.clear()
+        self._samples.clear()
+        self.submitted = self.dropped = self.evaluated = 0
+
+
+def _evaluate_jobs(jobs: list[ShadowJob]) -> list[Decision]:
+    return [
+        evaluate(shadow, system, action, context, EvaluationMode.FULL)
+        for shadow, system, action, context in jobs
+    ]
+
+
+# Process-wide shadow evaluator
+_settings = get_settings()
+shadow_evaluator = ShadowEvaluator(
+    queue_size=_settings.shadow_queue_size,
+    sample_rate=_settings.shadow_sample_rate,
+    sample_size=_settings.shadow_sample_size,
+)
@@ -0,0 +1,231 @@
+"""Immutable, pre-compiled view of the enabled policy set."""
+
+from collections.abc import Iterable, Iterator, Mapping
+from dataclasses import dataclass, field, replace
+from types import MappingProxyType
+from typing import Any
+
+from vorpal.core.engine.activation import required_relations
+from vorpal.core.engine.cel import CelSyntaxError
+from vorpal.core.engine.columnar import VectorPredicate, vectorize
+from vorpal.core.engine.compiler import Program
+from vorpal.core.engine.index import MatchIndex
+from vorpal.core.engine.programs import program_cache, shared_programs
+from vorpal.core.models.policy import Policy, PolicySeverity
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledRule:
+    """A policy rule with its condition compiled."""
+
+    name: str
+    condition: str
+    message: str
+    severity: PolicySeverity
+    program: Program | None
+    compile_error: str | None = None
+    requires: frozenset[str] = frozenset()  # Relations read from ``system``
+    columnar: VectorPredicate | None = field(default=None, compare=False, repr=False)
+
+
+@dataclass(frozen=True, slots=True)
+class CompiledPolicy:
+    """A detached, read-only copy of an enabled policy."""
+
+    id: str
+    name: str
+    version: str
+    match_criteria: Mapping[str, Any]
+    rules: tuple[CompiledRule, ...]
+    default_severity: PolicySeverity
+    requires: frozenset[str] = frozenset()  # Union of the rules' relations
+    shadow: bool = False  # Evaluated off the request path; never affects decisions
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        # Compiled programs are closures; pickle the definition and
+        # recompile on load (e.g. when shipping a snapshot to a worker)
+        rules = [
+            {
+                "name": r.name,
+                "condition": r.condition,
+                "message": r.message,
+                "severity": r.severity,
+            }
+            for r in self.rules
+        ]
+        return (
+            compile_definition,
+            (
+                self.id,
+                self.name,
+                self.version,
+                dict(self.match_criteria),
+                rules,
+                self.default_severity,
+                self.shadow,
+            ),
+        )
+
+
+@dataclass(frozen=True)
+class PolicySnapshot:
+    """The enabled policy set at a given policy-set version.
+
+    Snapshots are never mutated; changes produce a new snapshot that
+    replaces the current one, so an evaluation that already holds a
+    snapshot keeps a consistent view for its whole duration.
+
+    ``policies`` are the enforced policies; shadow policies form a
+    separate snapshot, ``shadow``, at the same version.
+    """
+
+    version: int
+    policies: tuple[CompiledPolicy, ...]
+    data: Mapping[str, Any] = field(default_factory=lambda: MappingProxyType({}))
+    shadow: "PolicySnapshot | None" = None
+    by_id: Mapping[str, CompiledPolicy] = field(init=False)
+    index: MatchIndex = field(init=False)
+    vectorized: bool = field(init=False)  # Any rule has a columnar form
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "by_id", MappingProxyType({p.id: p for p in self.policies}))
+        object.__setattr__(self, "index", MatchIndex(self.policies))
+        object.__setattr__(
+            self,
+            "vectorized",
+            any(r.columnar is not None for p in self.policies for r in p.rules),
+        )
+
+    def matching(self, system: Mapping[str, Any], action: str) -> Iterator[CompiledPolicy]:
+        """Yield the policies whose match criteria apply to a system/action.
+
+        Args:
+            system: The ``system`` activation (see ``system_activation``).
+            action: The action being performed.
+        """
+        return self.index.candidates(
+            system["risk_tier"], system["type"], action, system.get("tags") or ()
+        )
+
+    def requirements(self, system: Mapping[str, Any], action: str) -> frozenset[str]:
+        """Relations needed by the policies that match a system/action."""
+        needed: frozenset[str] = frozenset()
+        for policy in self.matching(system, action):
+            needed |= policy.requires
+        return needed
+
+    @property
+    def all_policies(self) -> tuple[CompiledPolicy, ...]:
+        """Enforced and shadow policies."""
+        if self.shadow is None:
+            return self.policies
+        return self.policies + self.shadow.policies
+
+    def __len__(self) -> int:
+        return len(self.policies)
+
+    def __reduce__(self) -> tuple[Any, ...]:
+        return (build_snapshot, (self.all_policies, self.version, dict(self.data)))
+
+
+def compile_policy(policy: Policy) -> CompiledPolicy:
+    """Compile a policy row into its snapshot form.
+
+    Programs come from the shared program cache, so rebuilding a
+    snapshot only compiles rules that actually changed.
+    """
+    return compile_definition(
+        policy.id,
+        policy.name,
+        policy.version,
+        policy.match_criteria or {},
+        policy.rules,
+        PolicySeverity(policy.default_severity),
+        policy.shadow,
+    )
+
+
+def compile_definition(
+    policy_id: str,
+    name: str,
+    version: str,
+    match_criteria: Mapping[str, Any],
+    rules: Iterable[Mapping[str, Any]],
+    default_severity: PolicySeverity,
+    shadow: bool = False,
+) -> CompiledPolicy:
+    """Compile a policy from its plain definition (see ``compile_policy``)."""
+    compiled: list[CompiledRule] = []
+    for rule in rules:
+        condition = rule.get("condition", "true")
+        program: Program | None = None
+        error: str | None = None
+        try:
+            program = program_cache.get(policy_id, version, rule["name"], condition)
+        except CelSyntaxError as e:
+            error = str(e)
+        compiled.append(
+            CompiledRule(
+                name=rule["name"],
+                condition=condition,
+                message=rule.get("message", ""),
+                severity=PolicySeverity(rule.get("severity", default_severity)),
+                program=program,
+                compile_error=error,
+                requires=required_relations(program.ast) if program else frozenset(),
+                columnar=vectorize(program.ast) if program else None,
+            )
+        )
+
+    return CompiledPolicy(
+        id=policy_id,
+        name=name,
+        version=version,
+        match_criteria=MappingProxyType(dict(match_criteria)),
+        rules=tuple(compiled),
+        default_severity=default_severity,
+        requires=frozenset().union(*(rule.requires for rule in compiled)),
+        shadow=shadow,
+    )
+
+
+def build_snapshot(
+    policies: Iterable[CompiledPolicy],
+    version: int,
+    data: Mapping[str, Any] | None = None,
+) -> PolicySnapshot:
+    """Assemble a snapshot from compiled policies and data documents.
+
+    Rules are compiled so that sub-expressions repeated anywhere in
+    the policy set (the same check in several regulatory packs, say)
+    are evaluated at most once per evaluation. Only rules whose shared
+    sub-expressions changed are recompiled (see ``SharedProgramCache``).
+
+    Args:
+        policies: The enabled policies, in evaluation order. Shadow
+            policies are split off into the snapshot's ``shadow``.
+        version: Policy-set version.
+        data: The ``data`` variable (see ``data.load_documents``).
+    """
+    shared = _share_subexpressions(tuple(policies))
+    documents = MappingProxyType(dict(data or {}))
+    shadows = tuple(p for p in shared if p.shadow)
+    return PolicySnapshot(
+        version=version,
+        policies=tuple(p for p in shared if not p.shadow),
+        data=documents,
+        shadow=PolicySnapshot(version, shadows, documents) if shadows else None,
+    )
+
+
+def _share_subexpressions(policies: tuple[CompiledPolicy, ...]) -> tuple[CompiledPolicy, ...]:
+    programs = [rule.program for policy in policies for rule in policy.rules if rule.program]
+    shared = iter(shared_programs.share(programs))
+
+    def share(rule: CompiledRule) -> CompiledRule:
+        if rule.program is None:
+            return rule
+        program = next(shared)
+        return rule if program is rule.program else replace(rule, program=program)
+
+    return tuple(replace(p, rules=tuple(share(r) for r in p.rules)) for p in policies)
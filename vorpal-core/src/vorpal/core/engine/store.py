@@ -0,0 +1,241 @@
+"""In-process store holding the current policy snapshot."""
+
+import asyncio
+import contextlib
+import logging
+from collections.abc import AsyncIterator, Awaitable, Callable
+from typing import Any
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from vorpal.core.engine.data import load_document, load_documents
+from vorpal.core.engine.snapshot import (
+    CompiledPolicy,
+    PolicySnapshot,
+    build_snapshot,
+    compile_policy,
+)
+from vorpal.core.models.data import DataDocument
+from vorpal.core.models.policy import Policy, PolicySetState
+
+logger = logging.getLogger(__name__)
+
+_STATE_ID = 1
+
+
+async def read_policy_set_version(session: AsyncSession) -> int:
+    """Read the current policy-set version (0 if never bumped)."""
+    version = await session.scalar(
+        select(PolicySetState.version).where(PolicySetState.id == _STATE_ID)
+    )
+    return version or 0
+
+
+async def bump_policy_set_version(session: AsyncSession) -> int:
+    """Increment the policy-set version in the current transaction.
+
+    The upsert takes a row lock, so concurrent policy changes are
+    serialised and each gets a distinct version.
+    """
+    upsert = insert(PolicySetState).values(id=_STATE_ID, version=1)
+    stmt = upsert.on_conflict_do_update(
+        index_elements=[PolicySetState.id],
+        set_={"version": PolicySetState.version + 1},
+    ).returning(PolicySetState.version)
+    result = await session.execute(stmt)
+    return int(result.scalar_one())
+
+
+async def commit_change(
+    session: AsyncSession,
+    apply: Callable[[AsyncSession, int], Awaitable[PolicySnapshot]],
+) -> PolicySnapshot:
+    """Commit a change to the policy set and apply it to the snapshot.
+
+    The change is committed at the next policy-set version before
+    ``apply(session, version)`` swaps it in, so the snapshot never holds
+    a change that could still roll back.
+    """
+    version = await bump_policy_set_version(session)
+    await session.commit()
+    return await apply(session, version)
+
+
+class PolicyStore:
+    """Holds the current policy snapshot and swaps it on change.
+
+    Readers take ``store.snapshot`` once and use it for the whole
+    evaluation; writers build a new snapshot and replace the reference
+    (copy-on-write), so evaluations never wait on a swap.
+    """
+
+    def __init__(self) -> None:
+        self._snapshot = build_snapshot((), version=0)
+        self._loaded = False
+
+    @property
+    def snapshot(self) -> PolicySnapshot:
+        """The current snapshot."""
+        return self._snapshot
+
+    @property
+    def loaded(self) -> bool:
+        """Whether a snapshot has been loaded from the database."""
+        return self._loaded
+
+    async def get_snapshot(self, session: AsyncSession) -> PolicySnapshot:
+        """Return the current snapshot, loading it on first use."""
+        if not self._loaded:
+            await self.load(session)
+        return self._snapshot
+
+    async def load(self, session: AsyncSession) -> PolicySnapshot:
+        """Load all enabled policies and data documents and swap in a fresh snapshot."""
+        version = await read_policy_set_version(session)
+        result = await session.execute(
+            select(Policy)
+            .where(Policy.enabled == True)  # noqa: E712
+            .order_by(Policy.created_at, Policy.id)
+        )
+        policies = [compile_policy(p) for p in result.scalars().all()]
+        documents = await session.execute(select(DataDocument.name, DataDocument.content))
+        data = load_documents(dict(documents.all()))
+        self._swap(build_snapshot(policies, version, data))
+        self._loaded = True
+        return self._snapshot
+
+    async def refresh(self, session: AsyncSession) -> bool:
+        """Reload the snapshot if the policy-set version has moved.
+
+        Returns:
+            True if a new snapshot was loaded.
+        """
+        version = await read_policy_set_version(session)
+        if self._loaded and version == self._snapshot.version:
+            return False
+        await self.load(session)
+        return True
+
+    async def apply(
+        self,
+        session: AsyncSession,
+        version: int,
+        policy: Policy | None = None,
+        removed_id: str | None = None,
+    ) -> PolicySnapshot:
+        """Apply a committed change to a single policy.
+
+        If ``version`` directly follows the current snapshot, the change
+        is applied copy-on-write; otherwise changes from another worker
+        were missed and the snapshot is reloaded.
+
+        Args:
+            session: Session used if a full reload is needed.
+            version: Policy-set version the change was committed at.
+            policy: The created or updated policy.
+            removed_id: ID of a deleted policy.
+        """
+        current = self._snapshot
+        if not self._loaded or version != current.version + 1:
+            return await self.load(session)
+
+        target_id = policy.id if policy is not None else removed_id
+        compiled: CompiledPolicy | None = None
+        if policy is not None and policy.enabled:
+            compiled = compile_policy(policy)
+
+        policies: list[CompiledPolicy] = []
+        replaced = False
+        for existing in current.all_policies:
+            if existing.id == target_id:
+                replaced = True
+                if compiled is not None:
+                    policies.append(compiled)
+            else:
+                policies.append(existing)
+        if compiled is not None and not replaced:
+            policies.append(compiled)
+
+        self._swap(build_snapshot(policies, version, current.data))
+        return self._snapshot
+
+    async def apply_data(
+        self,
+        session: AsyncSession,
+        version: int,
+        name: str,
+        content: Any = None,
+        removed: bool = False,
+    ) -> PolicySnapshot:
+        """Apply a committed change to a single data document.
+
+        Like ``apply``, falls back to a full reload if changes from
+        another worker were missed.
+
+        Args:
+            session: Session used if a full reload is needed.
+            version: Policy-set version the change was committed at.
+            name: Name of the changed document.
+            content: The document's new content.
+            removed: Whether the document was deleted.
+        """
+        current = self._snapshot
+        if not self._loaded or version != current.version + 1:
+            return await self.load(session)
+
+        data = dict(current.data)
+        if removed:
+            data.pop(name, None)
+        else:
+            data[name] = load_document(content)
+        self._swap(build_snapshot(current.all_policies, version, data))
+        return self._snapshot
+
+    def _swap(self, snapshot: PolicySnapshot) -> None:
+        # Concurrent loads may finish out of order; never go backwards
+        if self._loaded and snapshot.version < self._snapshot.version:
+            return
+        if snapshot.version != self._snapshot.version:
+            logger.debug("Policy snapshot %d -> %d", self._snapshot.version, snapshot.version)
+        self._snapshot = snapshot
+
+    async def watch(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        interval: float,
+    ) -> None:
+        """Poll the policy-set version and reload on change.
+
+        Picks up policy changes committed by other workers.
+        """
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with session_factory() as session:
+                    await self.refresh(session)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Failed to refresh policy snapshot")
+
+
+@contextlib.asynccontextmanager
+async def watching(
+    store: PolicyStore,
+    session_factory: async_sessionmaker[AsyncSession],
+    interval: float,
+) -> AsyncIterator[asyncio.Task[None]]:
+    """Run ``store.watch`` in the background for the duration of the context."""
+    task = asyncio.create_task(store.watch(session_factory, interval))
+    try:
+        yield task
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+
+# Process-wide policy store
+policy_store = PolicyStore()
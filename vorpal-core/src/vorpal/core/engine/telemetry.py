@@ -0,0 +1,417 @@
+"""Per-policy and per-rule evaluation counters and latency histograms.
+
+Every evaluated policy counts its outcome and its evaluation time, and
+every evaluated rule counts whether it failed or raised an error.
+Recording takes no lock: each thread records into its own shard, and
+readers merge the shards. Evaluation worker processes send their counts
+back with each chunk of results.
+
+Latencies go into log-linear histograms in the style of HdrHistogram:
+each power of two is split into ``SUB_BUCKETS`` linear buckets, so any
+percentile is reported within 1 / SUB_BUCKETS of its true value while
+the bucket count grows only with the logarithm of the range.
+
+Each API worker periodically publishes its totals to the
+``worker_telemetry`` table; ``aggregate`` merges the published rows of
+all workers.
+"""
+
+import asyncio
+import contextlib
+import logging
+import os
+import socket
+import threading
+from collections.abc import AsyncIterator, Iterable, Mapping
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from vorpal.core.engine.snapshot import CompiledPolicy
+from vorpal.core.models.telemetry import WorkerTelemetry
+
+logger = logging.getLogger(__name__)
+
+_SUB_BUCKET_BITS = 3
+SUB_BUCKETS = 1 << _SUB_BUCKET_BITS
+
+# Identifies this process's row in ``worker_telemetry``
+WORKER_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+
+
+def bucket_index(micros: int) -> int:
+    """Histogram bucket holding a latency in microseconds."""
+    if micros < SUB_BUCKETS:
+        return max(micros, 0)
+    shift = micros.bit_length() - _SUB_BUCKET_BITS - 1
+    return ((shift + 1) << _SUB_BUCKET_BITS) + (micros >> shift) - SUB_BUCKETS
+
+
+def bucket_bounds(index: int) -> tuple[int, int]:
+    """Lowest and one past the highest latency, in microseconds, of a bucket."""
+    if index < SUB_BUCKETS:
+        return index, index + 1
+    shift = index // SUB_BUCKETS - 1
+    low = (index % SUB_BUCKETS + SUB_BUCKETS) << shift
+    return low, low + (1 << shift)
+
+
+class LatencyHistogram:
+    """Sparse log-linear histogram of latencies."""
+
+    __slots__ = ("counts", "count", "total_us", "max_us")
+
+    def __init__(self) -> None:
+        self.counts: dict[int, int] = {}
+        self.count = 0
+        self.total_us = 0
+        self.max_us = 0
+
+    def record(self, seconds: float, times: int = 1) -> None:
+        """Count ``times`` observations of a latency."""
+        micros = int(seconds * 1_000_000)
+        # bucket_index, inlined: this runs once per evaluated policy
+        if micros < SUB_BUCKETS:
+            index = max(micros, 0)
+        else:
+            shift = micros.bit_length() - _SUB_BUCKET_BITS - 1
+            index = ((shift + 1) << _SUB_BUCKET_BITS) + (micros >> shift) - SUB_BUCKETS
+        counts = self.counts
+        counts[index] = counts.get(index, 0) + times
+        self.count += times
+        self.total_us += micros * times
+        if micros > self.max_us:
+            self.max_us = micros
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        """Add another histogram's observations to this one."""
+        for index, n in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + n
+        self.count += other.count
+        self.total_us += other.total_us
+        self.max_us = max(self.max_us, other.max_us)
+
+    def percentile(self, q: float) -> float:
+        """Latency in milliseconds below which ``q`` percent of observations fall."""
+        if not self.count:
+            return 0.0
+        rank = max(1, round(self.count * q / 100))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                low, high = bucket_bounds(index)
+                return min((low + high - 1) / 2, self.max_us) / 1000
+        return self.max_us / 1000
+
+    def cumulative(self, bounds_us: Iterable[int]) -> list[int]:
+        """Observations at or below each bound, for ascending bounds."""
+        ordered = sorted(self.counts.items())
+        result = []
+        seen = position = 0
+        for bound in bounds_us:
+            while position < len(ordered) and bucket_bounds(ordered[position][0])[1] <= bound + 1:
+                seen += ordered[position][1]
+                position += 1
+            result.append(seen)
+        return result
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "counts": {str(i): n for i, n in self.counts.items()},
+            "count": self.count,
+            "total_us": self.total_us,
+            "max_us": self.max_us,
+        }
+
+    @classmethod
+    def from_dict(cls, payload: Mapping[str, Any]) -> "LatencyHistogram":
+        histogram = cls()
+        histogram.counts = {int(i): n for i, n in payload["counts"].items()}
+        histogram.count = payload["count"]
+        histogram.total_us = payload["total_us"]
+        histogram.max_us = payload["max_us"]
+        return histogram
+
+
+@dataclass(slots=True)
+class RuleCounters:
+    """Outcome counters for one rule."""
+
+    severity: str
+    evaluated: int = 0
+    failed: int = 0
+    errors: int = 0  # Evaluations where the condition raised an error
+
+
+@dataclass(slots=True)
+class PolicyCounters:
+    """Outcome counters and latency histogram for one policy."""
+
+    policy_id: str
+    policy_name: str
+    shadow: bool = False
+    evaluated: int = 0
+    passed: int = 0
+    failed: int = 0
+    latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    rules: dict[str, RuleCounters] = field(default_factory=dict)
+    # Rule counters in rule order for ``compiled``, the policy last recorded
+    compiled: CompiledPolicy | None = None
+    by_position: list[RuleCounters] = field(default_factory=list)
+
+    def bind(self, policy: CompiledPolicy) -> list[RuleCounters]:
+        """Rule counters aligned with a compiled policy's rules."""
+        if self.compiled is not policy:
+            self.policy_name = policy.name
+            self.shadow = policy.shadow
+            self.by_position = []
+            for rule in policy.rules:
+                counters = self.rules.setdefault(rule.name, RuleCounters(rule.severity.value))
+                counters.severity = rule.severity.value
+                self.by_position.append(counters)
+            self.compiled = policy
+        return self.by_position
+
+    def record(self, passed: bool, seconds: float, times: int = 1) -> None:
+        """Count ``times`` evaluations of the policy."""
+        self.evaluated += times
+        if passed:
+            self.passed += times
+        else:
+            self.failed += times
+        self.latency.record(seconds, times)
+
+    def merge(self, other: "PolicyCounters") -> None:
+        """Add another set of counters for the same policy."""
+        self.policy_name = other.policy_name
+        self.shadow = other.shadow
+        self.evaluated += other.evaluated
+        self.passed += other.passed
+        self.failed += other.failed
+        self.latency.merge(other.latency)
+        for name, rule in other.rules.items():
+            mine = self.rules.setdefault(name, RuleCounters(rule.severity))
+            mine.evaluated += rule.evaluated
+            mine.failed += rule.failed
+            mine.errors += rule.errors
+
+    def summary(self) -> dict[str, Any]:
+        """Counters with latency percentiles, in milliseconds."""
+        rule_failures: dict[str, int] = {}
+        for rule in self.rules.values():
+            rule_failures[rule.severity] = rule_failures.get(rule.severity, 0) + rule.failed
+        latency = self.latency
+        return {
+            "policy_id": self.policy_id,
+            "policy_name": self.policy_name,
+            "shadow": self.shadow,
+            "evaluated": self.evaluated,
+            "passed": self.passed,
+            "failed": self.failed,
+            "rule_failures": rule_failures,
+            "latency": {
+                "count": latency.count,
+                "total_ms": latency.total_us / 1000,
+                "mean_ms": latency.total_us / latency.count / 1000 if latency.count else 0.0,
+                "p50_ms": latency.percentile(50),
+                "p90_ms": latency.percentile(90),
+                "p99_ms": latency.percentile(99),
+                "max_ms": latency.max_us / 1000,
+            },
+            "rules": [
+                {
+                    "rule_name": name,
+                    "severity": rule.severity,
+                    "evaluated": rule.evaluated,
+                    "failed": rule.failed,
+                    "errors": rule.errors,
+                }
+                for name, rule in self.rules.items()
+            ],
+        }
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "policy_name": self.policy_name,
+            "shadow": self.shadow,
+            "evaluated": self.evaluated,
+            "passed": self.passed,
+            "failed": self.failed,
+            "latency": self.latency.to_dict(),
+            "rules": {
+                name: [r.severity, r.evaluated, r.failed, r.errors]
+                for name, r in self.rules.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, policy_id: str, payload: Mapping[str, Any]) -> "PolicyCounters":
+        return cls(
+            policy_id,
+            payload["policy_name"],
+            payload["shadow"],
+            payload["evaluated"],
+            payload["passed"],
+            payload["failed"],
+            LatencyHistogram.from_dict(payload["latency"]),
+            {name: RuleCounters(*values) for name, values in payload["rules"].items()},
+        )
+
+
+class TelemetryShard:
+    """Counters recorded by one thread."""
+
+    __slots__ = ("policies",)
+
+    def __init__(self) -> None:
+        self.policies: dict[str, PolicyCounters] = {}
+
+    def policy(self, policy: CompiledPolicy) -> PolicyCounters:
+        """Counters for a policy, created on first use."""
+        counters = self.policies.get(policy.id)
+        if counters is None:
+            counters = self.policies[policy.id] = PolicyCounters(policy.id, policy.name)
+        return counters
+
+
+class PolicyTelemetry:
+    """Process-wide policy counters, sharded by thread."""
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+        self._shards: list[TelemetryShard] = []
+        self._lock = threading.Lock()  # Only taken when a thread adds its shard
+
+    def shard(self) -> TelemetryShard:
+        """The calling thread's shard."""
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._local.shard = TelemetryShard()
+            with self._lock:
+                self._shards.append(shard)
+        return shard
+
+    def totals(self) -> dict[str, PolicyCounters]:
+        """This process's counters by policy ID, merged across threads."""
+        totals: dict[str, PolicyCounters] = {}
+        for shard in list(self._shards):
+            for policy_id, counters in list(shard.policies.items()):
+                merged = totals.get(policy_id)
+                if merged is None:
+                    merged = totals[policy_id] = PolicyCounters(policy_id, counters.policy_name)
+                merged.merge(counters)
+        return totals
+
+    def export(self) -> dict[str, Any]:
+        """This process's counters as JSON-compatible data."""
+        return {policy_id: c.to_dict() for policy_id, c in self.totals().items()}
+
+    def drain(self) -> dict[str, Any]:
+        """Export and reset; used by evaluation workers after each chunk."""
+        exported = self.export()
+        self.reset()
+        return exported
+
+    def merge(self, exported: Mapping[str, Any]) -> None:
+        """Add exported counters, such as a worker's, to the calling thread's shard."""
+        shard = self.shard()
+        for policy_id, payload in exported.items():
+            counters = PolicyCounters.from_dict(policy_id, payload)
+            mine = shard.policies.get(policy_id)
+            if mine is None:
+                shard.policies[policy_id] = counters
+            else:
+                mine.merge(counters)
+
+    def reset(self) -> None:
+        """Discard all counters."""
+        with self._lock:
+            for shard in self._shards:
+                shard.policies = {}
+
+
+def aggregate(exports: Iterable[Mapping[str, Any]]) -> dict[str, PolicyCounters]:
+    """Merge exported counters from several workers by policy ID."""
+    totals: dict[str, PolicyCounters] = {}
+    for exported in exports:
+        for policy_id, payload in exported.items():
+            counters = PolicyCounters.from_dict(policy_id, payload)
+            merged = totals.get(policy_id)
+            if merged is None:
+                totals[policy_id] = counters
+            else:
+                merged.merge(counters)
+    return totals
+
+
+async def publish(session: AsyncSession) -> None:
+    """Store this worker's counters in ``worker_telemetry``."""
+    counters = telemetry.export()
+    stmt = insert(WorkerTelemetry).values(worker_id=WORKER_ID, counters=counters)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[WorkerTelemetry.worker_id],
+        set_={"counters": counters, "updated_at": datetime.now(UTC)},
+    )
+    await session.execute(stmt)
+    await session.commit()
+
+
+async def cluster_totals(
+    session: AsyncSession, max_age: float
+) -> tuple[dict[str, PolicyCounters], int]:
+    """Counters merged across every worker that published within ``max_age`` seconds.
+
+    This worker's own counters are read live rather than from its last
+    published row.
+
+    Returns:
+        The merged counters by policy ID and the number of workers merged.
+    """
+    cutoff = datetime.now(UTC) - timedelta(seconds=max_age)
+    result = await session.execute(
+        select(WorkerTelemetry.counters).where(
+            WorkerTelemetry.updated_at >= cutoff,
+            WorkerTelemetry.worker_id != WORKER_ID,
+        )
+    )
+    exports = [telemetry.export(), *result.scalars().all()]
+    return aggregate(exports), len(exports)
+
+
+@contextlib.asynccontextmanager
+async def publishing(
+    session_factory: async_sessionmaker[AsyncSession], interval: float
+) -> AsyncIterator[None]:
+    """Publish this worker's counters every ``interval`` seconds; 0 disables."""
+    if interval <= 0:
+        yield
+        return
+
+    async def run() -> None:
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                async with session_factory() as session:
+                    await publish(session)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Failed to publish policy telemetry")
+
+    task = asyncio.create_task(run())
+    try:
+        yield
+    finally:
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+
+# Process-wide telemetry
+telemetry = PolicyTelemetry()
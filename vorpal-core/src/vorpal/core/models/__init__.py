@@ -3,8 +3,10 @@
 from vorpal.core.models.base import Base
 from vorpal.core.models.system import AISystem, SystemType, RiskTier, SystemStatus
 from vorpal.core.models.control import Control, ControlCategory, SystemControl, ControlStatus
-from vorpal.core.models.audit import AuditEvent, ActorType
-from vorpal.core.models.policy import Policy
+from vorpal.core.models.audit import AuditCheckpoint, AuditEvent, ActorType
+from vorpal.core.models.policy import Policy, PolicySetState
+from vorpal.core.models.data import DataDocument
+from vorpal.core.models.telemetry import WorkerTelemetry
 from vorpal.core.models.user import User, Team, APIKey
 
 __all__ = [
@@ -18,8 +20,12 @@ __all__ = [
     "SystemControl",
     "ControlStatus",
     "AuditEvent",
+    "AuditCheckpoint",
     "ActorType",
     "Policy",
+    "PolicySetState",
+    "DataDocument",
+    "WorkerTelemetry",
     "User",
     "Team",
     "APIKey",
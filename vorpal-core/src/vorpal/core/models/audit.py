@@ -6,12 +6,18 @@ from datetime import datetime
 from enum import Enum
 from typing import Any
 
-from sqlalchemy import DateTime, ForeignKey, Index, String, Text, func
+from sqlalchemy import BigInteger, DateTime, ForeignKey, Index, String, Text, UniqueConstraint, func
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
 from vorpal.core.models.base import Base
 
+# Chain of the events that do not relate to a system
+GLOBAL_CHAIN = "global"
+
+# Canonical JSON for hashing; reused, as json.dumps builds an encoder per call
+_CANONICAL_JSON = json.JSONEncoder(sort_keys=True, separators=(",", ":"))
+
 
 class ActorType(str, Enum):
     """Type of entity that performed an action."""
@@ -29,6 +35,10 @@ class AuditEvent(Base):
     Each event contains a hash of the previous event,
     creating a tamper-evident chain. Any modification
     to historical events will break the chain.
+
+    Events are partitioned into chains: one per AI system, plus a
+    global chain for events without a system. Each chain has its own
+    head and numbers its events from 1.
     """
 
     __tablename__ = "audit_events"
@@ -86,6 +96,8 @@ class AuditEvent(Base):
     request_id: Mapped[str | None] = mapped_column(String(100), nullable=True)
 
     # Hash chain for integrity
+    chain_id: Mapped[str] = mapped_column(String(36), nullable=False)  # System ID or "global"
+    sequence: Mapped[int] = mapped_column(BigInteger, nullable=False)  # Position in the chain
     previous_hash: Mapped[str | None] = mapped_column(
         String(64),
         nullable=True,
@@ -104,6 +116,8 @@ class AuditEvent(Base):
     )
 
     __table_args__ = (
+        UniqueConstraint("chain_id", "sequence", name="uq_audit_chain_sequence"),
+        Index("idx_audit_timestamp", "timestamp"),
         Index("idx_audit_system_timestamp", "system_id", "timestamp"),
         Index("idx_audit_event_type_timestamp", "event_type", "timestamp"),
         Index("idx_audit_actor_timestamp", "actor_id", "timestamp"),
@@ -137,7 +151,7 @@ class AuditEvent(Base):
             "timestamp": timestamp.isoformat(),
             "previous_hash": previous_hash,
         }
-        serialized = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+        serialized = _CANONICAL_JSON.encode(payload)
         return hashlib.sha256(serialized.encode()).hexdigest()
 
     def verify_hash(self) -> bool:
@@ -157,3 +171,26 @@ class AuditEvent(Base):
 
     def __repr__(self) -> str:
         return f"<AuditEvent(id={self.id}, type={self.event_type}, action={self.action})>"
+
+
+class AuditCheckpoint(Base):
+    """The last verified event of an audit chain.
+
+    Incremental verification trusts a chain up to its checkpoint and
+    checks only the events after it, starting from the recorded hash.
+    """
+
+    __tablename__ = "audit_checkpoints"
+
+    chain_id: Mapped[str] = mapped_column(String(36), primary_key=True)
+    event_id: Mapped[str] = mapped_column(UUID(as_uuid=False), nullable=False)
+    sequence: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    event_hash: Mapped[str] = mapped_column(String(64), nullable=False)
+    verified_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+
+    def __repr__(self) -> str:
+        return f"<AuditCheckpoint(chain_id={self.chain_id}, sequence={self.sequence})>"
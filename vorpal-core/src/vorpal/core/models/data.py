@@ -0,0 +1,30 @@
+"""Reference data documents read by policy rules."""
+
+from typing import Any
+
+from sqlalchemy import Integer, String, Text
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from vorpal.core.models.base import Base, TimestampMixin
+
+
+class DataDocument(Base, TimestampMixin):
+    """A named JSON document that rules read as ``data.<name>``.
+
+    Documents hold reference data shared by many rules, such as
+    approved vendors or blocked regions, so requests do not have to
+    send it in their context.
+    """
+
+    __tablename__ = "data_documents"
+
+    name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    description: Mapped[str | None] = mapped_column(Text, nullable=True)
+    content: Mapped[Any] = mapped_column(JSONB, nullable=False)
+
+    # Incremented every time the content is replaced
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1)
+
+    def __repr__(self) -> str:
+        return f"<DataDocument(name={self.name}, version={self.version})>"
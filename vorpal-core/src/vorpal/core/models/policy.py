@@ -4,7 +4,7 @@ from datetime import datetime
 from enum import Enum
 from typing import Any
 
-from sqlalchemy import Boolean, DateTime, String, Text, func
+from sqlalchemy import BigInteger, Boolean, DateTime, Integer, String, Text, func
 from sqlalchemy.dialects.postgresql import JSONB, UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -41,6 +41,9 @@ class Policy(Base):
     # Whether policy is active
     enabled: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
 
+    # Shadow policies are evaluated in the background and never block
+    shadow: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
+
     # Matching criteria - when should this policy be evaluated
     match_criteria: Mapped[dict[str, Any]] = mapped_column(
         JSONB,
@@ -117,3 +120,20 @@ class Policy(Base):
 
     def __repr__(self) -> str:
         return f"<Policy(id={self.id}, name={self.name})>"
+
+
+class PolicySetState(Base):
+    """Version counter for the enabled policy set.
+
+    A single row whose version is bumped in the same transaction as
+    every policy change. Workers compare it against the version of
+    their in-memory policy snapshot to detect changes made elsewhere.
+    """
+
+    __tablename__ = "policy_set_state"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, default=1)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self) -> str:
+        return f"<PolicySetState(version={self.version})>"
@@ -0,0 +1,31 @@
+"""Policy evaluation telemetry published by each API worker."""
+
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import DateTime, String, func
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from vorpal.core.models.base import Base
+
+
+class WorkerTelemetry(Base):
+    """One worker's cumulative policy evaluation counters.
+
+    Each worker overwrites its own row periodically; readers merge the
+    rows of every worker that published recently.
+    """
+
+    __tablename__ = "worker_telemetry"
+
+    worker_id: Mapped[str] = mapped_column(String(255), primary_key=True)
+    counters: Mapped[Any] = mapped_column(JSONB, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True),
+        server_default=func.now(),
+        nullable=False,
+    )
+
+    def __repr__(self) -> str:
+        return f"<WorkerTelemetry(worker_id={self.worker_id})>"
@@ -1,5 +1,9 @@
 """Tests for vorpal-core API."""
 
+import json
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+
 import pytest
 from fastapi.testclient import TestClient
 
@@ -14,6 +18,22 @@ def client():
         yield client
 
 
+@pytest.fixture
+def owner_id(client):
+    """Create a user to own test systems."""
+    from vorpal.core.db import get_session_context
+    from vorpal.core.models.user import User
+
+    user_id = str(uuid4())
+
+    async def create_user():
+        async with get_session_context() as session:
+            session.add(User(id=user_id, email=f"{user_id}@example.com", name="Test Owner"))
+
+    client.portal.call(create_user)
+    return user_id
+
+
 def test_health_endpoint(client):
     """Test health endpoint returns healthy status."""
     response = client.get("/health")
@@ -53,6 +73,48 @@ class TestSystemsAPI:
         assert "meta" in data
         assert isinstance(data["data"], list)
 
+    def test_system_policies(self, client, owner_id):
+        """Test a system lists the policies that govern it, by action."""
+        tag = f"governed-{uuid4()}"
+        system = client.post(
+            "/api/v1/systems",
+            json={
+                "name": "governed-agent",
+                "type": "agent",
+                "risk_tier": "minimal",
+                "owner_id": owner_id,
+                "tags": [tag],
+            },
+        ).json()
+        policy = client.post(
+            "/api/v1/policies",
+            json={
+                "name": f"governs-{uuid4()}",
+                "match_criteria": {"tags": {"contains": [tag]}, "action": ["deploy"]},
+                "rules": [],
+            },
+        ).json()
+
+        try:
+            response = client.get(f"/api/v1/systems/{system['id']}/policies")
+            assert response.status_code == 200
+            data = response.json()
+            assert data["system_id"] == system["id"]
+            assert policy["id"] in [p["id"] for p in data["actions"]["deploy"]]
+            assert policy["id"] not in [p["id"] for p in data["actions"]["*"]]
+
+            client.patch(f"/api/v1/systems/{system['id']}", json={"tags": []})
+            untagged = client.get(
+                f"/api/v1/systems/{system['id']}/policies", params={"action": "deploy"}
+            ).json()
+            assert list(untagged["actions"]) == ["deploy"]
+            assert policy["id"] not in [p["id"] for p in untagged["actions"]["deploy"]]
+        finally:
+            client.delete(f"/api/v1/policies/{policy['id']}")
+
+        missing = client.get(f"/api/v1/systems/{uuid4()}/policies")
+        assert missing.status_code == 404
+
 
 class TestControlsAPI:
     """Tests for Controls API endpoints."""
@@ -76,3 +138,1130 @@ class TestPoliciesAPI:
         data = response.json()
         assert "data" in data
         assert isinstance(data["data"], list)
+
+    def test_create_policy_invalid_condition(self, client):
+        """Test creating a policy with a malformed CEL condition is rejected."""
+        response = client.post(
+            "/api/v1/policies",
+            json={
+                "name": "invalid-condition-policy",
+                "rules": [
+                    {
+                        "name": "broken",
+                        "condition": "system.autonomy_level <=",
+                        "message": "never stored",
+                    }
+                ],
+            },
+        )
+        assert response.status_code == 422
+        assert response.json()["detail"][0]["rule"] == "broken"
+
+    def test_create_policy_nested_too_deeply(self, client):
+        """Test a condition too deep to compile is rejected rather than failing."""
+        response = client.post(
+            "/api/v1/policies",
+            json={
+                "name": "deep-policy",
+                "rules": [{"name": "deep", "condition": "1" + " + 1" * 5000, "message": "-"}],
+            },
+        )
+        assert response.status_code == 422
+        assert "nested too deeply" in response.json()["detail"][0]["error"]
+
+    def test_create_policy_over_cost_budget(self, client):
+        """Test a rule whose estimated cost exceeds the budget is rejected."""
+        response = client.post(
+            "/api/v1/policies",
+            json={
+                "name": "costly-policy",
+                "rules": [
+                    {
+                        "name": "triple-nested",
+                        "condition": (
+                            "context.a.exists(x, context.b.exists(y, context.c.exists(z,"
+                            " x + y == z)))"
+                        ),
+                        "message": "never stored",
+                    }
+                ],
+            },
+        )
+        assert response.status_code == 422
+        detail = response.json()["detail"][0]
+        assert detail["rule"] == "triple-nested"
+        assert detail["cost"] > 100000
+
+    def test_policy_changes_swap_snapshot(self, client):
+        """Test create/update/delete swap the in-memory policy snapshot."""
+        from vorpal.core.engine.store import policy_store
+
+        before = policy_store.snapshot
+        response = client.post(
+            "/api/v1/policies",
+            json={"name": f"snapshot-{uuid4()}", "rules": []},
+        )
+        assert response.status_code == 201
+        policy_id = response.json()["id"]
+
+        created = policy_store.snapshot
+        assert created.version > before.version
+        assert policy_id in created.by_id
+        assert policy_id not in before.by_id
+
+        response = client.patch(f"/api/v1/policies/{policy_id}", json={"enabled": False})
+        assert response.status_code == 200
+        assert policy_id not in policy_store.snapshot.by_id
+        assert policy_id in created.by_id  # Old snapshot is left untouched
+
+        response = client.delete(f"/api/v1/policies/{policy_id}")
+        assert response.status_code == 204
+        assert policy_store.snapshot.version > created.version
+
+    def test_evaluate_matching_policy(self, client, owner_id):
+        """Test evaluate applies only matching policies and their rules."""
+        system = client.post(
+            "/api/v1/systems",
+            json={
+                "name": "eval-agent",
+                "type": "agent",
+                "risk_tier": "high",
+                "autonomy_level": 4,
+                "owner_id": owner_id,
+                "tags": ["production"],
+            },
+        ).json()
+        policy = client.post(
+            "/api/v1/policies",
+            json={
+                "name": f"autonomy-{uuid4()}",
+                "match_criteria": {"type": ["agent"], "action": ["deploy"]},
+                "rules": [
+                    {
+                        "name": "autonomy-limit",
+                        "condition": "system.autonomy_level <= 3",
+                        "message": "Autonomy above L3 requires approval",
+                    },
+                    {
+                        "name": "prod-tag",
+                        "condition": "'production' in system.tags",
+                        "message": "Must be tagged production",
+                        "severity": "warning",
+                    },
+                ],
+            },
+        ).json()
+
+        try:
+            response = client.post(
+                "/api/v1/policies/evaluate",
+                json={"system_id": system["id"], "action": "deploy"},
+            )
+            assert response.status_code == 200
+            data = response.json()
+            assert data["allowed"] is False
+            assert "Autonomy above L3 requires approval" in data["blocking_failures"]
+            result = next(r for r in data["results"] if r["policy_id"] == policy["id"])
+            assert [r["passed"] for r in result["rule_results"]] == [False, True]
+            # Rules reduced to a constant for this system cost nothing
+            assert data["cost"] == sum(
+                r["cost"] for p in data["results"] for r in p["rule_results"]
+            )
+
+            # Action outside the policy's match criteria
+            response = client.post(
+                "/api/v1/policies/evaluate",
+                json={"system_id": system["id"], "action": "review"},
+            )
+            assert policy["id"] not in [r["policy_id"] for r in response.json()["results"]]
+
+            # Summary mode keeps the verdict but drops per-rule results
+            response = client.post(
+                "/api/v1/policies/evaluate",
+                json={"system_id": system["id"], "action": "deploy", "mode": "summary"},
+            )
+            data = response.json()
+            assert data["mode"] == "summary"
+            assert data["allowed"] is False
+            assert data["results"] == []
+            assert "Autonomy above L3 requires approval" in data["blocking_failures"]
+        finally:
+            client.delete(f"/api/v1/policies/{policy['id']}")
+
+    def test_evaluate_loads_related_data(self, client, owner_id):
+        """Test rules over controls and owner see the system's related rows."""
+        client.post(
+            "/api/v1/controls",
+            json={"id": "CTRL-EVAL-001", "name": "Eval control", "category": "bias"},
+        )
+        system = client.post(
+            "/api/v1/systems",
+            json={
+                "name": "related-model",
+                "type": "model",
+                "risk_tier": "high",
+                "owner_id": owner_id,
+            },
+        ).json()
+        client.post(
+            f"/api/v1/systems/{system['id']}/controls", json={"control_id": "CTRL-EVAL-001"}
+        )
+        policy = client.post(
+            "/api/v1/policies",
+            json={
+                "name": f"related-{uuid4()}",
+                "match_criteria": {"type": ["model"], "action": ["deploy"]},
+                "rules": [
+                    {
+                        "name": "bias-verified",
+                        "condition": (
+                            "system.controls.exists(c, c.id == 'CTRL-EVAL-001'"
+                            " && c.status == 'verified')"
+                        ),
+                        "message": "Bias control must be verified",
+                    },
+                    {
+                        "name": "owner-known",
+                        "condition": "system.owner.email.endsWith('@example.com')",
+                        "message": "Owner must be internal",
+                    },
+                ],
+            },
+        ).json()
+
+        try:
+            data = client.post(
+                "/api/v1/policies/evaluate",
+                json={"system_id": system["id"], "action": "deploy"},
+            ).json()
+            result = next(r for r in data["results"] if r["policy_id"] == policy["id"])
+            assert [(r["passed"], r["error"]) for r in result["rule_results"]] == [
+                (False, None),
+                (True, None),
+            ]
+        finally:
+            client.delete(f"/api/v1/policies/{policy['id']}")
+
+    def test_evaluate_residuals_follow_control_changes(self, client, owner_id):
+        """Test partially evaluated rules are rebuilt when a system's controls change."""
+        client.post(
+            "/api/v1/controls",
+            json={"id": "CTRL-RESID-001", "name": "Residual control", "category": "bias"},
+        )
+        system = client.post(
+            "/api/v1/systems",
+            json={
+                "name": "residual-model",
+                "type": "model",
+                "risk_tier": "high",
+                "owner_id": owner_id,
+            },
+        ).json()
+        policy = client.post(
+            "/api/v1/policies",
+            json={
+                "name": f"residual-{uuid4()}",
+                "match_criteria": {"type": ["model"], "action": ["deploy"]},
+                "rules": [
+                    {
+                        "name": "control-assigned",
+                        "condition": "system.controls.exists(c, c.id == context.control)",
+                        "message": "Control must be assigned",
+                    }
+                ],
+            },
+        ).json()
+
+        def allowed(ticket):
+            return client.post(
+                "/api/v1/policies/evaluate",
+                json={
+                    "system_id": system["id"],
+                    "action": "deploy",
+                    "context": {"control": "CTRL-RESID-001", "ticket": ticket},
+                },
+            ).json()["allowed"]
+
+        try:
+            assert allowed(1) is False
+            assert allowed(2) is False
+            client.post(
+                f"/api/v1/systems/{system['id']}/controls", json={"control_id": "CTRL-RESID-001"}
+            )
+            assert allowed(3) is True
+        finally:
+            client.delete(f"/api/v1/policies/{policy['id']}")
+
+    def test_evaluate_follows_catalog_control_changes(self, client, owner_id):
+        """Test editing a catalog control invalidates the systems it is assigned to."""
+        control_id = "CTRL-CATALOG-001"
+        client.post(
+            "/api/v1/controls",
+            json={"id": control_id, "name": "Catalog control", "category": "bias"},
+        )
+        client.patch(f"/api/v1/controls/{control_id}", json={"mandatory": False})
+        system = client.post(
+            "/api/v1/systems",
+            json={
+                "name": "catalog-model",
+                "type": "model",
+                "risk_tier": "high",
+                "owner_id": owner_id,
+            },
+        ).json()
+        client.post(f"/api/v1/systems/{system['id']}/controls", json={"control_id": control_id})
+        policy = client.post(
+            "/api/v1/policies",
+            json={
+                "name": f"catalog-{uuid4()}",
+                "match_criteria": {"type": ["model"], "action": ["deploy"]},
+                "rules": [
+                    {
+                        "name": "mandatory-controls",
+                        "condition": "system.controls.exists(c, c.mandatory)",
+                        "message": "A mandatory control must be assigned",
+                    }
+                ],
+            },
+        ).json()
+
+        def allowed():
+            return client.post(
+                "/api/v1/policies/evaluate",
+                json={"system_id": system["id"], "action": "deploy"},
+            ).json()["allowed"]
+
+        try:
+            assert allowed() is False
+            assert allowed() is False
+            client.patch(f"/api/v1/controls/{control_id}", json={"mandatory": True})
+            assert allowed() is True
+        finally:
+            client.delete(f"/api/v1/policies/{policy['id']}")
+
+    def test_invalidation_waits_for_commit(self, client):
+        """Test systems are invalidated only once the change is committed."""
+        from vorpal.core.db import get_session_context
+        from vorpal.core.engine.invalidation import invalidate_systems
+        from vorpal.core.engine.partial import residual_store
+
+        system_id = str(uuid4())
+        before = residual_store.generation(system_id)
+
+        async def change(fail):
+            async with get_session_context() as session:
+                invalidate_systems(session, [system_id])
+                assert residual_store.generation(system_id) == before
+                if fail:
+                    raise RuntimeError("rolled back")
+
+        with pytest.raises(RuntimeError):
+            client.portal.call(change, True)
+        assert residual_store.generation(system_id) == before
+        client.portal.call(change, False)
+        assert residual_store.generation(system_id) == before + 1
+
+    def test_evaluate_batch(self, client, owner_id):
+        """Test batch evaluation keeps request order and reports per-item errors."""
+        system_ids = [
+            client.post(
+                "/api/v1/systems",
+                json={
+                    "name": f"batch-{level}",
+                    "type": "agent",
+                    "risk_tier": "limited",
+                    "autonomy_level": level,
+                    "owner_id": owner_id,
+                },
+            ).json()["id"]
+            for level in (2, 5)
+        ]
+        policy = client.post(
+            "/api/v1/policies",
+            json={
+                "name": f"batch-{uuid4()}",
+                "match_criteria": {"type": ["agent"]},
+                "rules": [
+                    {
+                        "name": "autonomy-limit",
+                        "condition": "system.autonomy_level <= 3",
+                        "message": "Autonomy too high",
+                    }
+                ],
+            },
+        ).json()
+
+        try:
+            response = client.post(
+                "/api/v1/policies/evaluate/batch",
+                json={
+                    "items": [
+                        {"system_id": system_ids[1], "action": "deploy"},
+                        {"system_id": str(uuid4()), "action": "deploy"},
+                        {"system_id": "not-a-uuid", "action": "deploy"},
+                        {"system_id": system_ids[0], "action": "deploy"},
+                    ]
+                },
+            )
+            assert response.status_code == 200
+            data = response.json()
+            assert data["evaluated"] == 2
+            assert data["errors"] == 2
+            results = data["results"]
+            assert [r["index"] for r in results] == [0, 1, 2, 3]
+            assert results[0]["result"]["allowed"] is False
+            assert results[1]["error"].endswith("not found")
+            assert results[2]["result"] is None
+            assert results[3]["result"]["allowed"] is True
+        finally:
+            client.delete(f"/api/v1/policies/{policy['id']}")
+
+    def test_evaluate_decision_cache(self, client, owner_id):
+        """Test repeated evaluations are cached until the system changes."""
+        system = client.post(
+            "/api/v1/systems",
+            json={
+                "name": "cached-agent",
+                "type": "agent",
+                "risk_tier": "minimal",
+                "autonomy_level": 5,
+                "owner_id": owner_id,
+            },
+        ).json()
+        policy = client.post(
+            "/api/v1/policies",
+            json={
+                "name": f"cache-{uuid4()}",
+                "match_criteria": {"type": ["agent"]},
+                "rules": [
+                    {
+                        "name": "autonomy-limit",
+                        "condition": "system.autonomy_level <= 3",
+                        "message": "Autonomy too high",
+                    }
+                ],
+            },
+        ).json()
+        request = {"system_id": system["id"], "action": "deploy", "context": {"ticket": 1}}
+
+        try:
+            first = client.post("/api/v1/policies/evaluate", json=request).json()
+            second = client.post("/api/v1/policies/evaluate", json=request).json()
+            assert first["cached"] is False
+            assert second["cached"] is True
+            assert second["allowed"] is first["allowed"] is False
+
+            # Different context is a different decision
+            other = {**request, "context": {"ticket": 2}}
+            assert client.post("/api/v1/policies/evaluate", json=other).json()["cached"] is False
+
+            client.patch(f"/api/v1/systems/{system['id']}", json={"autonomy_level": 2})
+            third = client.post("/api/v1/policies/evaluate", json=request).json()
+            assert third["cached"] is False
+            assert third["allowed"] is True
+
+            stats = client.get("/api/v1/policies/evaluate/cache").json()
+            assert stats["hits"] >= 1
+            assert stats["misses"] >= 3
+        finally:
+            client.delete(f"/api/v1/policies/{policy['id']}")
+
+    def test_evaluate_degraded(self, client, owner_id, monkeypatch):
+        """Test a missed deadline or unavailable database degrades the decision."""
+        import asyncio
+
+        from sqlalchemy.exc import OperationalError
+
+        from vorpal.core.api.routes import policies as routes
+
+        system = client.post(
+            "/api/v1/systems",
+            json={
+                "name": "degraded-agent",
+                "type": "agent",
+                "risk_tier": "minimal",
+                "owner_id": owner_id,
+            },
+        ).json()
+        request = {"system_id": system["id"], "action": "deploy"}
+        fresh = client.post("/api/v1/policies/evaluate", json=request).json()
+        assert fresh["degraded"] is False
+
+        async def unavailable(_db, _request):
+            raise OperationalError("SELECT 1", {}, Exception("connection refused"))
+
+        monkeypatch.setattr(routes, "_evaluate_one", unavailable)
+        last_known = client.post("/api/v1/policies/evaluate", json=request).json()
+        assert last_known["degraded"] is True
+        assert last_known["allowed"] is fresh["allowed"]
+        assert last_known["decision_age_ms"] >= 0
+
+        async def slow(_db, _request):
+            await asyncio.sleep(1)
+
+        monkeypatch.setattr(routes, "_evaluate_one", slow)
+        response = client.post(
+            "/api/v1/policies/evaluate", json={**request, "action": "retire", "timeout_ms": 20}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["degraded"] is True
+        assert data["allowed"] is False
+        assert data["decision_age_ms"] is None
+        assert data["blocking_failures"] == [
+            "Policy decision unavailable: deadline of 20 ms exceeded"
+        ]
+
+    def test_evaluate_inline_system(self, client):
+        """Test an unregistered system document is evaluated in memory."""
+        policy = client.post(
+            "/api/v1/policies",
+            json={
+                "name": f"inline-{uuid4()}",
+                "match_criteria": {"type": ["agent"]},
+                "rules": [
+                    {
+                        "name": "autonomy-limit",
+                        "condition": "system.autonomy_level <= 3",
+                        "message": "Autonomy too high",
+                    },
+                    {
+                        "name": "bias-tested",
+                        "condition": (
+                            'system.controls.exists(c, c.id == "CTRL-BIAS-001" '
+                            '&& c.status == "verified")'
+                        ),
+                        "message": "Bias testing not verified",
+                    },
+                ],
+            },
+        ).json()
+        candidate = {
+            "name": "ci-candidate",
+            "type": "agent",
+            "risk_tier": "high",
+            "autonomy_level": 2,
+            "controls": [{"id": "CTRL-BIAS-001", "status": "verified"}],
+        }
+        unverified = {**candidate, "id": "candidate", "controls": []}
+
+        try:
+            response = client.post(
+                "/api/v1/policies/evaluate", json={"system": candidate, "action": "deploy"}
+            )
+            assert response.status_code == 200
+            data = response.json()
+            assert data["allowed"] is True
+            assert data["system_id"] is None
+            assert data["policies_evaluated"] >= 1
+
+            batch = client.post(
+                "/api/v1/policies/evaluate/batch",
+                json={
+                    "items": [
+                        {"system": candidate, "action": "deploy"},
+                        {"system": unverified, "action": "deploy"},
+                        {"system_id": str(uuid4()), "action": "deploy"},
+                    ]
+                },
+            ).json()
+            results = batch["results"]
+            assert results[0]["result"]["allowed"] is True
+            assert results[0]["result"]["cached"] is True
+            assert results[1]["system_id"] == "candidate"
+            assert results[1]["result"]["allowed"] is False
+            assert results[2]["error"] is not None
+        finally:
+            client.delete(f"/api/v1/policies/{policy['id']}")
+
+    def test_evaluate_requires_one_system(self, client):
+        """Test exactly one of system_id and an inline system is accepted."""
+        system = {"name": "x", "type": "agent", "risk_tier": "minimal"}
+        for body in (
+            {"action": "deploy"},
+            {"system_id": str(uuid4()), "system": system, "action": "deploy"},
+        ):
+            assert client.post("/api/v1/policies/evaluate", json=body).status_code == 422
+
+    def test_evaluate_reads_data_documents(self, client, owner_id):
+        """Test rules read data documents and see their changes."""
+        name = f"vendors_{uuid4().hex}"
+        created = client.put(f"/api/v1/data/{name}", json={"content": ["acme", "globex"]})
+        assert created.status_code == 201
+        assert created.json()["version"] == 1
+
+        system = client.post(
+            "/api/v1/systems",
+            json={
+                "name": "vendor-agent",
+                "type": "agent",
+                "risk_tier": "minimal",
+                "metadata": {"vendor": "acme"},
+                "owner_id": owner_id,
+            },
+        ).json()
+        policy = client.post(
+            "/api/v1/policies",
+            json={
+                "name": f"data-{uuid4()}",
+                "match_criteria": {"type": ["agent"]},
+                "rules": [
+                    {
+                        "name": "approved-vendor",
+                        "condition": f"system.metadata.vendor in data.{name}",
+                        "message": "Vendor not approved",
+                    }
+                ],
+            },
+        ).json()
+        request = {"system_id": system["id"], "action": "deploy"}
+
+        try:
+            assert client.post("/api/v1/policies/evaluate", json=request).json()["allowed"]
+
+            replaced = client.put(f"/api/v1/data/{name}", json={"content": ["globex"]})
+            assert replaced.status_code == 200
+            assert replaced.json()["version"] == 2
+            assert client.get(f"/api/v1/data/{name}").json()["content"] == ["globex"]
+            names = [d["name"] for d in client.get("/api/v1/data?page_size=100").json()["data"]]
+            assert name in names
+
+            denied = client.post("/api/v1/policies/evaluate", json=request).json()
+            assert denied["allowed"] is False
+            assert denied["cached"] is False
+        finally:
+            client.delete(f"/api/v1/policies/{policy['id']}")
+            assert client.delete(f"/api/v1/data/{name}").status_code == 204
+        assert client.get(f"/api/v1/data/{name}").status_code == 404
+        assert client.put("/api/v1/data/not-an-identifier", json={"content": []}).status_code == 422
+
+    def test_shadow_policy(self, client, owner_id):
+        """Test a shadow policy is evaluated in the background without blocking."""
+        import time
+
+        system = client.post(
+            "/api/v1/systems",
+            json={
+                "name": "shadowed-agent",
+                "type": "agent",
+                "risk_tier": "minimal",
+                "owner_id": owner_id,
+            },
+        ).json()
+        policy = client.post(
+            "/api/v1/policies",
+            json={
+                "name": f"shadow-{uuid4()}",
+                "shadow": True,
+                "match_criteria": {"type": ["agent"]},
+                "rules": [{"name": "never", "condition": "false", "message": "Trial rule"}],
+            },
+        ).json()
+        assert policy["shadow"] is True
+
+        try:
+            result = client.post(
+                "/api/v1/policies/evaluate",
+                json={"system_id": system["id"], "action": "deploy"},
+            ).json()
+            assert "Trial rule" not in result["blocking_failures"]
+            assert policy["id"] not in [r["policy_id"] for r in result["results"]]
+
+            for _ in range(100):
+                stats = client.get("/api/v1/policies/evaluate/shadow").json()
+                trial = [p for p in stats["policies"] if p["policy_id"] == policy["id"]]
+                if trial:
+                    break
+                time.sleep(0.01)
+            assert trial[0]["failed"] >= 1
+            assert trial[0]["rule_failures"]["never"] >= 1
+        finally:
+            client.delete(f"/api/v1/policies/{policy['id']}")
+
+    def test_decision_log(self, client, owner_id, monkeypatch, tmp_path):
+        """Test evaluations are logged and streamed back from the decision log."""
+        import asyncio
+
+        from vorpal.core.api.routes import policies as routes
+        from vorpal.core.engine.decision_log import DecisionLog
+
+        assert client.get("/api/v1/policies/evaluate/decisions").status_code == 404
+
+        log = DecisionLog(str(tmp_path))
+        monkeypatch.setattr(routes, "decision_log", log)
+        system = client.post(
+            "/api/v1/systems",
+            json={
+                "name": "logged-agent",
+                "type": "agent",
+                "risk_tier": "minimal",
+                "owner_id": owner_id,
+            },
+        ).json()
+        request = {"system_id": system["id"], "action": "deploy", "context": {"env": "prod"}}
+        result = client.post("/api/v1/policies/evaluate", json=request).json()
+        for _ in range(2):
+            client.post("/api/v1/policies/evaluate", json={**request, "mode": "summary"})
+        asyncio.run(log.flush())
+
+        response = client.get("/api/v1/policies/evaluate/decisions")
+        assert response.status_code == 200
+        record, summary, cached = [json.loads(line) for line in response.text.splitlines()]
+        assert record["system_id"] == system["id"]
+        assert record["allowed"] is result["allowed"]
+        assert record["latency_ms"] >= 0
+        assert len(record["input"]) == 32
+        assert record["policy_set_version"] == routes.policy_store.snapshot.version
+        assert record["blocking_failures"] == result["blocking_failures"]
+        assert [p["policy_id"] for p in record["policies"]] == [
+            r["policy_id"] for r in result["results"]
+        ]
+        # Summary responses have no results; the log still names the policies
+        assert summary["mode"] == "summary"
+        assert summary["policies"]
+        assert [p["policy_id"] for p in summary["policies"]] == [
+            p["policy_id"] for p in record["policies"]
+        ]
+        assert summary["blocking_failures"] == record["blocking_failures"]
+        assert cached["cached"] is True
+        assert cached["policies"] == summary["policies"]
+        assert cached["policy_set_version"] == summary["policy_set_version"]
+
+        future = client.get("/api/v1/policies/evaluate/decisions?since=2999-01-01T00:00:00")
+        assert future.text == ""
+
+    def test_policy_telemetry(self, client, owner_id):
+        """Test evaluations are counted per policy and exposed as metrics."""
+        system = client.post(
+            "/api/v1/systems",
+            json={
+                "name": "measured-agent",
+                "type": "agent",
+                "risk_tier": "minimal",
+                "owner_id": owner_id,
+            },
+        ).json()
+        policy = client.post(
+            "/api/v1/policies",
+            json={
+                "name": f"telemetry-{uuid4()}",
+                "match_criteria": {"type": ["agent"]},
+                "rules": [
+                    {
+                        "name": "ticket",
+                        "condition": "context.ticket != ''",
+                        "message": "Ticket required",
+                        "severity": "warning",
+                    }
+                ],
+            },
+        ).json()
+
+        try:
+            for context in ({"ticket": "T-1"}, {}):
+                client.post(
+                    "/api/v1/policies/evaluate",
+                    json={"system_id": system["id"], "action": "deploy", "context": context},
+                )
+
+            response = client.get("/api/v1/policies/evaluate/telemetry")
+            assert response.status_code == 200
+            data = response.json()
+            assert data["workers"] >= 1
+            [stats] = [p for p in data["policies"] if p["policy_id"] == policy["id"]]
+            assert (stats["evaluated"], stats["passed"]) == (2, 2)
+            assert stats["rule_failures"] == {"warning": 1}
+            assert stats["latency"]["count"] == 2
+            assert stats["rules"][0]["errors"] == 1
+
+            metrics = client.get("/metrics")
+            assert metrics.headers["content-type"].startswith("text/plain")
+            labels = f'policy_id="{policy["id"]}",policy="{policy["name"]}"'
+            assert f'vorpal_policy_evaluations_total{{{labels},outcome="passed"}} 2' in metrics.text
+            assert f"vorpal_policy_evaluation_seconds_count{{{labels}}} 2" in metrics.text
+        finally:
+            client.delete(f"/api/v1/policies/{policy['id']}")
+
+    def test_scan_streams_ndjson(self, client, owner_id):
+        """Test a fleet scan streams one line per system and a summary."""
+        tag = f"scan-{uuid4()}"
+        for level in (1, 2, 5):
+            client.post(
+                "/api/v1/systems",
+                json={
+                    "name": f"scan-{level}",
+                    "type": "agent",
+                    "risk_tier": "limited",
+                    "autonomy_level": level,
+                    "owner_id": owner_id,
+                    "tags": [tag],
+                },
+            )
+        policy = client.post(
+            "/api/v1/policies",
+            json={
+                "name": f"scan-{uuid4()}",
+                "match_criteria": {"tags": {"contains": [tag]}},
+                "rules": [
+                    {
+                        "name": "autonomy-limit",
+                        "condition": "system.autonomy_level <= 3",
+                        "message": "Autonomy too high",
+                    }
+                ],
+            },
+        ).json()
+
+        try:
+            response = client.get("/api/v1/policies/scan", params={"action": "deploy", "tag": tag})
+            assert response.status_code == 200
+            assert response.headers["content-type"].startswith("application/x-ndjson")
+            lines = [json.loads(line) for line in response.text.splitlines()]
+            results, summary = lines[:-1], lines[-1]
+            assert sorted(r["system_name"] for r in results) == ["scan-1", "scan-2", "scan-5"]
+            assert all(r["type"] == "result" and r["results"] == [] for r in results)
+            assert summary["type"] == "summary"
+            assert (summary["scanned"], summary["allowed"], summary["denied"]) == (3, 2, 1)
+        finally:
+            client.delete(f"/api/v1/policies/{policy['id']}")
+
+
+class TestAuditAPI:
+    """Tests for Audit API endpoints."""
+
+    def test_upgrade_backfills_chains(self, client):
+        """Test an upgrade backfills the columns tables had before this version.
+
+        Events written before per-system chains become the global chain
+        and are indexed by time, and existing policies are not shadow
+        policies.
+        """
+        from datetime import UTC, datetime, timedelta
+
+        from sqlalchemy import text
+
+        from vorpal.core.db import engine, upgrade_db
+
+        start = datetime(2026, 1, 1, tzinfo=UTC)
+
+        async def upgrade():
+            async with engine.connect() as conn, conn.begin() as transaction:
+                # Audit and policy tables as they were, in a schema dropped on rollback
+                await conn.execute(text("CREATE SCHEMA upgrade_test"))
+                await conn.execute(text("SET LOCAL search_path TO upgrade_test"))
+                await conn.execute(
+                    text(
+                        "CREATE TABLE audit_events (id UUID PRIMARY KEY, "
+                        "timestamp TIMESTAMPTZ NOT NULL, previous_hash VARCHAR(64), "
+                        "event_hash VARCHAR(64) NOT NULL)"
+                    )
+                )
+                for minutes in (2, 0, 1):  # Inserted out of order
+                    await conn.execute(
+                        text("INSERT INTO audit_events VALUES (:id, :ts, NULL, :hash)"),
+                        {
+                            "id": str(uuid4()),
+                            "ts": start + timedelta(minutes=minutes),
+                            "hash": uuid4().hex * 2,
+                        },
+                    )
+                await conn.execute(
+                    text("CREATE TABLE policies (id UUID PRIMARY KEY, name VARCHAR(255) NOT NULL)")
+                )
+                await conn.execute(
+                    text("INSERT INTO policies VALUES (:id, 'existing')"), {"id": str(uuid4())}
+                )
+                await upgrade_db(conn)
+                await upgrade_db(conn)
+                rows = await conn.execute(
+                    text("SELECT chain_id, sequence, timestamp FROM audit_events ORDER BY sequence")
+                )
+                result = [tuple(row) for row in rows]
+                shadow = (await conn.execute(text("SELECT shadow FROM policies"))).scalars().all()
+                indexes = await conn.execute(
+                    text("SELECT indexname FROM pg_indexes WHERE schemaname = 'upgrade_test'")
+                )
+                index_names = set(indexes.scalars())
+                await transaction.rollback()
+                return result, shadow, index_names
+
+        rows, shadow, index_names = client.portal.call(upgrade)
+        assert shadow == [False]
+        assert "idx_audit_timestamp" in index_names
+        assert [(chain, sequence) for chain, sequence, _ in rows] == [
+            ("global", 1),
+            ("global", 2),
+            ("global", 3),
+        ]
+        assert [timestamp for _, _, timestamp in rows] == sorted(t for _, _, t in rows)
+
+    def test_concurrent_appends_keep_chains(self, client, owner_id):
+        """Test concurrent appends are batched into one valid chain per system."""
+        from vorpal.core.engine.audit import audit_writer
+
+        systems = [
+            client.post(
+                "/api/v1/systems",
+                json={"name": name, "type": "agent", "risk_tier": "minimal", "owner_id": owner_id},
+            ).json()["id"]
+            for name in ("audited-a", "audited-b")
+        ]
+
+        def append(i: int):
+            return client.post(
+                "/api/v1/audit",
+                json={
+                    "system_id": systems[i % 3] if i % 3 < 2 else None,
+                    "event_type": "policy.evaluated",
+                    "actor_type": "agent",
+                    "action": "evaluate",
+                    "details": {"n": i},
+                },
+                headers={"X-Request-ID": f"req-{i}"},
+            )
+
+        batches = audit_writer.batches
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            responses = list(pool.map(append, range(60)))
+        assert all(r.status_code == 201 for r in responses)
+        assert audit_writer.batches - batches < 60
+
+        for system_id in systems:
+            events = sorted(
+                (e for e in (r.json() for r in responses) if e["system_id"] == system_id),
+                key=lambda e: e["sequence"],
+            )
+            assert [e["chain_id"] for e in events] == [system_id] * 20
+            assert [e["sequence"] for e in events] == list(range(1, 21))
+            assert events[0]["previous_hash"] is None
+            for previous, event in zip(events, events[1:], strict=False):
+                assert event["timestamp"] > previous["timestamp"]
+                assert event["previous_hash"] == previous["event_hash"]
+
+            verification = client.get(
+                "/api/v1/audit/verify/chain", params={"system_id": system_id}
+            ).json()
+            assert verification["verified"], verification
+            assert verification["total_events"] == 20
+
+    def test_writers_bounded(self, client, owner_id):
+        """Test at most ``max_writers`` batches are written at once."""
+        import asyncio
+
+        from vorpal.core.db import async_session_maker
+        from vorpal.core.engine.audit import AuditWriter
+
+        systems = [
+            client.post(
+                "/api/v1/systems",
+                json={
+                    "name": f"bounded-{i}",
+                    "type": "agent",
+                    "risk_tier": "minimal",
+                    "owner_id": owner_id,
+                },
+            ).json()["id"]
+            for i in range(6)
+        ]
+        writer = AuditWriter(flush_interval=0, max_writers=2)
+        insert = writer._insert
+        writing = [0, 0]  # Now, most at once
+
+        async def tracked(*args):
+            writing[0] += 1
+            writing[1] = max(writing)
+            try:
+                await asyncio.sleep(0.01)
+                return await insert(*args)
+            finally:
+                writing[0] -= 1
+
+        async def append_all():
+            writer._insert = tracked
+            async with writer.running(async_session_maker):
+                return await asyncio.gather(
+                    *(
+                        writer.append(
+                            system_id=system_id,
+                            event_type="policy.evaluated",
+                            actor_type="agent",
+                            action="evaluate",
+                        )
+                        for system_id in systems * 3
+                    )
+                )
+
+        events = client.portal.call(append_all)
+        assert len(events) == 18
+        assert writing[1] == 2
+
+    def test_verify_detects_tampering(self, client, owner_id):
+        """Test a modified event breaks its system's chain."""
+        from sqlalchemy import update
+
+        from vorpal.core.db import get_session_context
+        from vorpal.core.models.audit import AuditEvent
+
+        system_id = client.post(
+            "/api/v1/systems",
+            json={
+                "name": "tampered",
+                "type": "agent",
+                "risk_tier": "minimal",
+                "owner_id": owner_id,
+            },
+        ).json()["id"]
+        events = [
+            client.post(
+                "/api/v1/audit",
+                json={
+                    "system_id": system_id,
+                    "event_type": "system.updated",
+                    "actor_type": "user",
+                    "action": "update",
+                    "details": {"n": i},
+                },
+            ).json()
+            for i in range(3)
+        ]
+
+        async def tamper():
+            async with get_session_context() as session:
+                await session.execute(
+                    update(AuditEvent)
+                    .where(AuditEvent.id == events[1]["id"])
+                    .values(details={"n": 99})
+                )
+
+        client.portal.call(tamper)
+        verification = client.get(
+            "/api/v1/audit/verify/chain", params={"system_id": system_id}
+        ).json()
+        assert not verification["verified"]
+        assert (verification["valid_events"], verification["invalid_events"]) == (2, 1)
+        assert verification["first_invalid_event_id"] == events[1]["id"]
+
+    def test_verify_streams_progress_and_resumes(self, client, owner_id):
+        """Test verification streams NDJSON progress and resumes after an event."""
+        system_id = client.post(
+            "/api/v1/systems",
+            json={
+                "name": "streamed",
+                "type": "agent",
+                "risk_tier": "minimal",
+                "owner_id": owner_id,
+            },
+        ).json()["id"]
+        events = [
+            client.post(
+                "/api/v1/audit",
+                json={
+                    "system_id": system_id,
+                    "event_type": "policy.evaluated",
+                    "actor_type": "agent",
+                    "action": "evaluate",
+                },
+            ).json()
+            for _ in range(5)
+        ]
+
+        response = client.get(
+            "/api/v1/audit/verify/chain", params={"system_id": system_id, "progress": True}
+        )
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert [line["type"] for line in lines] == ["progress", "result"]
+        assert lines[0]["last_event_id"] == events[-1]["id"]
+        assert lines[-1]["verified"] and lines[-1]["total_events"] == 5
+
+        resumed = client.get(
+            "/api/v1/audit/verify/chain",
+            params={"system_id": system_id, "after": events[2]["id"]},
+        ).json()
+        assert resumed["verified"] and resumed["total_events"] == 2
+        assert resumed["last_event_id"] == events[-1]["id"]
+
+        missing = client.get("/api/v1/audit/verify/chain", params={"after": str(uuid4())})
+        assert missing.status_code == 404
+
+    def test_verify_from_checkpoints(self, client, owner_id):
+        """Test verification checks only events after the chain checkpoint unless full."""
+        from sqlalchemy import update
+
+        from vorpal.core.db import get_session_context
+        from vorpal.core.models.audit import AuditEvent
+
+        system_id = client.post(
+            "/api/v1/systems",
+            json={
+                "name": "checkpointed",
+                "type": "agent",
+                "risk_tier": "minimal",
+                "owner_id": owner_id,
+            },
+        ).json()["id"]
+
+        def append(count):
+            return [
+                client.post(
+                    "/api/v1/audit",
+                    json={
+                        "system_id": system_id,
+                        "event_type": "system.updated",
+                        "actor_type": "user",
+                        "action": "update",
+                        "details": {"n": i},
+                    },
+                ).json()
+                for i in range(count)
+            ]
+
+        def verify(**params):
+            return client.get(
+                "/api/v1/audit/verify/chain", params={"system_id": system_id, **params}
+            ).json()
+
+        events = append(3)
+        first = verify()
+        assert first["verified"] and first["incremental"] and first["total_events"] == 3
+
+        events += append(2)
+        second = verify()
+        assert second["verified"] and second["total_events"] == 2
+        assert second["last_event_id"] == events[-1]["id"]
+        assert verify()["total_events"] == 0
+
+        full = verify(full=True)
+        assert full["verified"] and not full["incremental"] and full["total_events"] == 5
+
+        async def tamper(event):
+            async with get_session_context() as session:
+                await session.execute(
+                    update(AuditEvent).where(AuditEvent.id == event["id"]).values(details={})
+                )
+
+        client.portal.call(tamper, events[1])
+        assert verify()["verified"]  # Before the checkpoint
+        assert verify(full=True)["first_invalid_event_id"] == events[1]["id"]
+
+        client.portal.call(tamper, events[-1])
+        anchored = verify()
+        assert not anchored["verified"] and anchored["invalid_events"] == 1
+        assert anchored["first_invalid_event_id"] == events[-1]["id"]
+
+    def test_unknown_system_fails_alone(self, client):
+        """Test an event for an unknown system does not fail its batch."""
+        events = [
+            {"event_type": "auth.login", "actor_type": "user", "action": "login"},
+            {
+                "system_id": str(uuid4()),
+                "event_type": "system.updated",
+                "actor_type": "user",
+                "action": "update",
+            },
+        ]
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            ok, missing = pool.map(lambda e: client.post("/api/v1/audit", json=e), events)
+        assert ok.status_code == 201
+        assert missing.status_code == 404
+        assert client.get(f"/api/v1/audit/{ok.json()['id']}").status_code == 200
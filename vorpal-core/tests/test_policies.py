@@ -0,0 +1,1195 @@
+"""Tests for policy rule compilation and evaluation."""
+
+import asyncio
+import json
+import pickle
+import random
+from datetime import UTC, datetime, timedelta
+
+import pytest
+
+from vorpal.core.engine import (
+    CelSyntaxError,
+    ProgramCache,
+    compile_expression,
+    evaluate_rule,
+    parse,
+)
+from vorpal.core.engine.activation import required_relations
+from vorpal.core.engine.audit_verify import (
+    ChainEvent,
+    ChainVerifier,
+    VerificationExecutor,
+    event_hash,
+)
+from vorpal.core.engine.columnar import vectorize
+from vorpal.core.engine.compiler import shared_subexpressions
+from vorpal.core.engine.cost import ASSUMED_SIZE, estimate_cost
+from vorpal.core.engine.data import StringSet, load_document, load_documents
+from vorpal.core.engine.decision_log import DecisionLog, read_segments, segment_paths
+from vorpal.core.engine.decisions import DecisionCache, LastKnownDecisions
+from vorpal.core.engine.effective import EffectivePolicies
+from vorpal.core.engine.evaluator import EvaluationMode, evaluate
+from vorpal.core.engine.executor import EvaluationExecutor, evaluate_columnar, pack_decision
+from vorpal.core.engine.index import MatchIndex, policy_matches
+from vorpal.core.engine.partial import ResidualStore, SystemResiduals, residualize
+from vorpal.core.engine.shadow import ShadowEvaluator
+from vorpal.core.engine.snapshot import build_snapshot, compile_definition
+from vorpal.core.engine.telemetry import (
+    LatencyHistogram,
+    PolicyTelemetry,
+    aggregate,
+    bucket_bounds,
+    bucket_index,
+)
+from vorpal.core.models.policy import PolicySeverity
+
+
+@pytest.fixture
+def activation():
+    """Rule inputs for a high-risk agent."""
+    return {
+        "system": {
+            "id": "sys-1",
+            "type": "agent",
+            "risk_tier": "high",
+            "status": "approved",
+            "autonomy_level": 3,
+            "tags": ["production", "customer-facing"],
+            "metadata": {"hitl_enabled": True},
+            "controls": [
+                {"id": "CTRL-BIAS-001", "status": "verified"},
+                {"id": "CTRL-ACC-001", "status": "pending"},
+            ],
+        },
+        "context": {"environment": "production"},
+    }
+
+
+class TestCelEvaluation:
+    """Tests for CEL expression semantics."""
+
+    @pytest.mark.parametrize(
+        ("condition", "expected"),
+        [
+            ("true", True),
+            ("system.autonomy_level <= 3", True),
+            ("system.autonomy_level < 3", False),
+            ('system.risk_tier == "high"', True),
+            ('"production" in system.tags', True),
+            ("system.metadata.hitl_enabled == true", True),
+            ("system.controls.exists(c, c.id == 'CTRL-BIAS-001' && c.status == 'verified')", True),
+            ("system.controls.all(c, c.status == 'verified')", False),
+            ("system.controls.exists_one(c, c.status == 'pending')", True),
+            ("size(system.tags) == 2 && system.tags[0].startsWith('prod')", True),
+            ("has(system.metadata.reviewer)", False),
+            ("context.environment in ['staging', 'production']", True),
+            ("system.risk_tier == 'high' ? system.autonomy_level <= 3 : true", True),
+            ("system.name.matches('^x')", False),
+        ],
+    )
+    def test_conditions(self, activation, condition, expected):
+        """Test conditions evaluate to the expected result."""
+        if "system.name" in condition:
+            activation["system"]["name"] = "assistant"
+        passed, error = evaluate_rule(compile_expression(condition), activation)
+        assert error is None
+        assert passed is expected
+
+    def test_missing_field_fails_closed(self, activation):
+        """Test a rule referencing a missing field fails instead of passing."""
+        passed, error = evaluate_rule(
+            compile_expression("system.metadata.approved == true"), activation
+        )
+        assert passed is False
+        assert "no such key" in error
+
+    def test_error_absorbed_by_logical_or(self, activation):
+        """Test `true || error` is true, as in CEL."""
+        program = compile_expression("system.metadata.missing || system.autonomy_level <= 3")
+        assert evaluate_rule(program, activation) == (True, None)
+
+    def test_non_boolean_result_fails(self, activation):
+        """Test a condition must evaluate to a bool."""
+        passed, error = evaluate_rule(compile_expression("system.autonomy_level"), activation)
+        assert passed is False
+        assert "expected bool" in error
+
+    def test_mixed_type_equality_is_false(self, activation):
+        """Test values of different types never compare equal."""
+        program = compile_expression("system.autonomy_level == '3' || 1 == true")
+        assert evaluate_rule(program, activation) == (False, None)
+
+    @pytest.mark.parametrize(
+        "condition",
+        ["", "system.", "unknown.field", "size()", "system.tags.exists(1, 2)", "'a'.matches('(')"],
+    )
+    def test_invalid_conditions_rejected(self, condition):
+        """Test malformed conditions fail to compile."""
+        with pytest.raises(CelSyntaxError):
+            compile_expression(condition)
+
+    @pytest.mark.parametrize(
+        "condition",
+        [
+            "!" * 5000 + "true",
+            "-" * 5000 + "1",
+            "system" + ".c" * 3000,
+            "1" + " + 1" * 5000,
+            "(" * 5000 + "true" + ")" * 5000,
+        ],
+    )
+    def test_deep_nesting_rejected(self, condition):
+        """Test conditions too deep to compile are rejected as syntax errors."""
+        with pytest.raises(CelSyntaxError, match="nested too deeply"):
+            compile_expression(condition)
+
+    def test_long_chains_accepted(self, activation):
+        """Test operator chains up to the height limit still compile."""
+        program = compile_expression(" && ".join(["system.autonomy_level <= 3"] * 60))
+        assert evaluate_rule(program, activation) == (True, None)
+
+    @pytest.mark.parametrize(
+        ("condition", "relations"),
+        [
+            ("system.autonomy_level <= 3", set()),
+            ("system.controls.exists(c, c.status == 'verified')", {"controls"}),
+            ("has(system.team) && system.team.name == 'ml'", {"team"}),
+            ("system['owner'].role == 'admin' || size(system.tags) > 0", {"owner"}),
+            ("context.controls == 1", set()),
+            ("size(system) > 0", {"controls", "team", "owner"}),
+        ],
+    )
+    def test_required_relations(self, condition, relations):
+        """Test rules declare the related data they read."""
+        assert required_relations(compile_expression(condition).ast) == relations
+
+
+class TestProgramCache:
+    """Tests for the compiled program cache."""
+
+    def test_program_reused(self):
+        """Test the same rule returns the same compiled program."""
+        cache = ProgramCache()
+        first = cache.get("p1", "1.0.0", "rule", "true")
+        assert cache.get("p1", "1.0.0", "rule", "true") is first
+
+    def test_changed_condition_recompiled(self):
+        """Test an edited condition is recompiled under the same version."""
+        cache = ProgramCache()
+        first = cache.get("p1", "1.0.0", "rule", "true")
+        second = cache.get("p1", "1.0.0", "rule", "false")
+        assert second is not first
+        assert second.source == "false"
+
+    def test_compile_errors_cached(self):
+        """Test invalid conditions raise on every lookup."""
+        cache = ProgramCache()
+        for _ in range(2):
+            with pytest.raises(CelSyntaxError):
+                cache.get("p1", "1.0.0", "rule", "system.")
+
+    def test_invalidate(self):
+        """Test invalidating a policy drops its programs."""
+        cache = ProgramCache()
+        cache.get("p1", "1.0.0", "a", "true")
+        cache.get("p2", "1.0.0", "a", "true")
+        cache.invalidate("p1")
+        assert len(cache) == 1
+
+
+def _policy(policy_id, match_criteria, rules=(), shadow=False):
+    return compile_definition(
+        policy_id,
+        policy_id,
+        "1.0.0",
+        match_criteria,
+        [
+            {"name": name, "condition": condition, "message": name, "severity": severity}
+            for name, condition, severity in rules
+        ],
+        PolicySeverity.ERROR,
+        shadow,
+    )
+
+
+class TestMatchIndex:
+    """Tests for the match-criteria index."""
+
+    def test_candidates(self):
+        """Test only policies whose criteria apply are returned, in order."""
+        policies = [
+            _policy("any", {}),
+            _policy("high-deploy", {"risk_tier": ["high"], "action": ["deploy"]}),
+            _policy("agents", {"type": "agent"}),
+            _policy("prod", {"tags": {"contains": ["production"]}}),
+            _policy("nothing", {"risk_tier": []}),
+        ]
+        index = MatchIndex(policies)
+
+        found = [p.id for p in index.candidates("high", "agent", "deploy", ["production"])]
+        assert found == ["any", "high-deploy", "agents", "prod"]
+
+        found = [p.id for p in index.candidates("minimal", "model", "deploy", [])]
+        assert found == ["any"]
+
+    def test_agrees_with_linear_matching(self):
+        """Test the index returns exactly what per-policy matching returns."""
+        rng = random.Random(7)
+        tiers = ["prohibited", "high", "limited", "minimal"]
+        types = ["model", "application", "agent", "pipeline"]
+        actions = ["deploy", "update", "delete", "approve"]
+        tags = ["production", "pii", "internal", "beta"]
+
+        policies = []
+        for i in range(200):
+            criteria = {}
+            if rng.random() < 0.5:
+                criteria["risk_tier"] = rng.sample(tiers, rng.randint(1, 2))
+            if rng.random() < 0.5:
+                criteria["type"] = rng.choice(types)
+            if rng.random() < 0.5:
+                criteria["action"] = rng.sample(actions, rng.randint(1, 3))
+            if rng.random() < 0.3:
+                criteria["tags"] = {"contains": rng.sample(tags, rng.randint(1, 2))}
+            policies.append(_policy(f"p{i}", criteria))
+        index = MatchIndex(policies)
+
+        for _ in range(200):
+            tier, kind, action = rng.choice(tiers), rng.choice(types), rng.choice(actions)
+            system_tags = rng.sample(tags, rng.randint(0, 2))
+            expected = [
+                p.id
+                for p in policies
+                if policy_matches(p.match_criteria, tier, kind, action, system_tags)
+            ]
+            found = [p.id for p in index.candidates(tier, kind, action, system_tags)]
+            assert found == expected
+
+
+class TestEffectivePolicies:
+    """Tests for precomputed effective policy sets."""
+
+    @pytest.fixture
+    def policies(self):
+        return [
+            _policy("all", {}),
+            _policy("high-deploy", {"risk_tier": ["high"], "action": ["deploy", "update"]}),
+            _policy("tagged", {"tags": {"contains": ["production"]}}),
+            _policy("model", {"type": "model"}),
+        ]
+
+    def _ids(self, actions):
+        return {action: [p.id for p in policies] for action, policies in actions.items()}
+
+    def test_policies_by_action(self, policies, activation):
+        """Test effective policies match snapshot.matching for every action."""
+        snapshot = build_snapshot(policies, version=1)
+        effective = EffectivePolicies()
+        system = activation["system"]
+
+        assert self._ids(effective.policies(snapshot, system)) == {
+            "*": ["all", "tagged"],
+            "deploy": ["all", "high-deploy", "tagged"],
+            "update": ["all", "high-deploy", "tagged"],
+        }
+        for action in ("deploy", "update", "retire"):
+            expected = sorted(p.id for p in snapshot.matching(system, action))
+            [listed] = effective.policies(snapshot, system, action).values()
+            assert [p.id for p in listed] == expected
+
+        # Systems with the same risk tier, type and tags share an entry
+        effective.policies(snapshot, {**system, "id": "sys-2", "name": "other"})
+        assert (len(effective), effective.hits, effective.misses) == (1, 4, 1)
+
+    def test_incremental_update(self, policies, activation):
+        """Test only changed policies are re-matched when the policy set changes."""
+        effective = EffectivePolicies()
+        system = activation["system"]
+        effective.policies(build_snapshot(policies, version=1), system)
+
+        changed = [
+            *policies[:2],
+            _policy("tagged", {"tags": {"contains": ["internal"]}}),
+            policies[3],
+            _policy("agents", {"type": ["agent"], "action": "retire"}),
+        ]
+        snapshot = build_snapshot(changed, version=2)
+        assert self._ids(effective.policies(snapshot, system)) == {
+            "*": ["all"],
+            "deploy": ["all", "high-deploy"],
+            "retire": ["agents", "all"],
+            "update": ["all", "high-deploy"],
+        }
+        assert effective.misses == 1  # Updated in place, not rebuilt
+
+        moved = {**system, "risk_tier": "minimal", "tags": ["internal"]}
+        assert self._ids(effective.policies(snapshot, moved, "deploy")) == {
+            "deploy": ["all", "tagged"]
+        }
+
+
+class TestEvaluationModes:
+    """Tests for full, summary and fail-fast evaluation."""
+
+    @pytest.fixture
+    def snapshot(self):
+        return build_snapshot(
+            [
+                _policy("docs", {}, [("warn", "false", PolicySeverity.WARNING)]),
+                _policy(
+                    "autonomy",
+                    {},
+                    [
+                        ("limit", "system.autonomy_level < 3", PolicySeverity.ERROR),
+                        ("tagged", "size(system.tags) > 5", PolicySeverity.ERROR),
+                    ],
+                ),
+                _policy("later", {}, [("never", "false", PolicySeverity.ERROR)]),
+            ],
+            version=1,
+        )
+
+    def test_full(self, snapshot, activation):
+        """Test full mode reports every rule of every policy."""
+        decision = evaluate(snapshot, activation["system"], "deploy", {})
+        assert [len(p.rules) for p in decision.policies] == [1, 2, 1]
+        assert decision.blocking_failures == ["limit", "tagged", "never"]
+        assert decision.warnings == ["warn"]
+
+    def test_summary(self, snapshot, activation):
+        """Test summary mode keeps counts and messages but no rule outcomes."""
+        decision = evaluate(snapshot, activation["system"], "deploy", {}, EvaluationMode.SUMMARY)
+        assert all(p.rules == [] for p in decision.policies)
+        assert decision.policies_failed == 2
+        assert decision.blocking_failures == ["limit", "tagged", "never"]
+
+    def test_fail_fast(self, snapshot, activation):
+        """Test fail-fast mode stops at the first blocking failure."""
+        decision = evaluate(snapshot, activation["system"], "deploy", {}, EvaluationMode.FAIL_FAST)
+        assert [p.policy.id for p in decision.policies] == ["docs", "autonomy"]
+        assert decision.blocking_failures == ["limit"]
+        assert decision.allowed is False
+
+
+class TestEvaluationExecutor:
+    """Tests for process-pool evaluation."""
+
+    @pytest.fixture
+    def snapshot(self):
+        return build_snapshot(
+            [
+                _policy(
+                    "limit", {}, [("limit", "system.autonomy_level <= 3", PolicySeverity.ERROR)]
+                ),
+                _policy("broken", {}, [("broken", "system.missing", PolicySeverity.WARNING)]),
+            ],
+            version=3,
+        )
+
+    def test_snapshot_pickles(self, snapshot):
+        """Test snapshots survive pickling with programs recompiled."""
+        restored = pickle.loads(pickle.dumps(snapshot))
+        assert restored.version == 3
+        assert [p.id for p in restored.policies] == ["limit", "broken"]
+        assert restored.policies[0].rules[0].program is not None
+
+    async def test_pool_matches_inline(self, snapshot):
+        """Test chunked evaluation in worker processes matches inline evaluation."""
+        jobs = [
+            (
+                {"id": f"s{i}", "risk_tier": "high", "type": "agent", "autonomy_level": i % 5},
+                "deploy",
+                {},
+                EvaluationMode.FULL,
+            )
+            for i in range(20)
+        ]
+        inline = await EvaluationExecutor(workers=0).evaluate(snapshot, jobs)
+
+        executor = EvaluationExecutor(workers=2, chunk_size=4)
+        try:
+            pooled = await executor.evaluate(snapshot, jobs)
+        finally:
+            executor.shutdown()
+
+        assert _decision_summary(pooled) == _decision_summary(inline)
+        assert pooled[0].policies[0].policy is snapshot.policies[0]
+
+    async def test_pool_kept_across_versions(self, snapshot):
+        """Test a new policy-set version is shipped to the running workers."""
+        jobs = [
+            (
+                {"id": f"s{i}", "risk_tier": "high", "type": "agent", "autonomy_level": i % 5},
+                "deploy",
+                {},
+                EvaluationMode.FULL,
+            )
+            for i in range(20)
+        ]
+        stricter = build_snapshot(
+            [_policy("limit", {}, [("limit", "system.autonomy_level <= 1", PolicySeverity.ERROR)])],
+            version=4,
+        )
+
+        executor = EvaluationExecutor(workers=2, chunk_size=4)
+        try:
+            await executor.evaluate(snapshot, jobs)
+            pool = executor._pool
+            pooled = await executor.evaluate(stricter, jobs)
+            assert executor._pool is pool
+            assert list(executor._snapshots) == [4]
+        finally:
+            executor.shutdown()
+
+        assert executor._directory is None
+        inline = await EvaluationExecutor(workers=0).evaluate(stricter, jobs)
+        assert _decision_summary(pooled) == _decision_summary(inline)
+
+
+def _decision_summary(decisions):
+    return [
+        (
+            d.allowed,
+            d.blocking_failures,
+            d.warnings,
+            [
+                (p.policy.id, p.passed, [(r.rule.name, r.passed, r.error) for r in p.rules])
+                for p in d.policies
+            ],
+        )
+        for d in decisions
+    ]
+
+
+class TestColumnarEvaluation:
+    """Tests for vectorised evaluation of simple rules."""
+
+    @pytest.mark.parametrize(
+        ("condition", "vectorized"),
+        [
+            ("system.autonomy_level <= 3", True),
+            ("3 > system.autonomy_level", True),
+            ("system.risk_tier in ['high', 'limited'] && system.status != 'draft'", True),
+            ("!(system.type == 'agent') || system.autonomy_level == 1", True),
+            ("system.autonomy_level <= 3.5", False),
+            ("'production' in system.tags", False),
+            ("system.risk_tier == 'high' && size(system.tags) > 0", False),
+        ],
+    )
+    def test_vectorize(self, condition, vectorized):
+        """Test which rules get a columnar form."""
+        assert (vectorize(compile_expression(condition).ast) is not None) is vectorized
+
+    @pytest.mark.parametrize("mode", list(EvaluationMode))
+    def test_matches_per_row_evaluation(self, mode):
+        """Test columnar evaluation gives exactly the per-row decisions."""
+        rng = random.Random(11)
+        conditions = [
+            "system.autonomy_level <= 3",
+            "system.autonomy_level != 2 && system.risk_tier in ['high', 'limited']",
+            "system.status == 'approved' || system.autonomy_level > 4",
+            "!(system.type == 'agent')",
+            "system.autonomy_level >= 2 || system.status == 'draft'",
+            "size(system.tags) > 0",
+            "system.metadata.reviewed == true",
+        ]
+        severities = list(PolicySeverity)
+        policies = [
+            _policy(
+                f"p{i}",
+                rng.choice([{}, {"risk_tier": ["high", "limited"]}, {"action": ["deploy"]}]),
+                [
+                    (f"r{i}-{j}", rng.choice(conditions), rng.choice(severities))
+                    for j in range(rng.randint(1, 3))
+                ],
+            )
+            for i in range(12)
+        ]
+        snapshot = build_snapshot(policies, version=1)
+        assert snapshot.vectorized
+
+        jobs = []
+        for i in range(300):
+            system = {
+                "id": f"s{i}",
+                "type": rng.choice(["agent", "model"]),
+                "status": rng.choice(["draft", "approved"]),
+                "risk_tier": rng.choice(["high", "limited", "minimal"]),
+                "autonomy_level": rng.choice([None, 1, 2, 3, 4, 5]),
+                "tags": rng.sample(["production", "pii"], rng.randint(0, 2)),
+                "metadata": rng.choice([{}, {"reviewed": True}]),
+            }
+            if rng.random() < 0.05:
+                del system["autonomy_level"]
+            jobs.append((system, rng.choice(["deploy", "update"]), {}, mode))
+
+        expected = [evaluate(snapshot, *job) for job in jobs]
+        actual = evaluate_columnar(snapshot, jobs)
+        assert [pack_decision(d) for d in actual] == [pack_decision(d) for d in expected]
+
+
+class TestPartialEvaluation:
+    """Tests for partial evaluation of rules against a known system."""
+
+    @pytest.mark.parametrize(
+        ("condition", "residual"),
+        [
+            ("system.autonomy_level <= 3", "true"),
+            ("system.autonomy_level < 3 && context.environment == 'production'", "false"),
+            (
+                "system.autonomy_level <= 3 && context.environment == 'production'",
+                "true && context.environment == 'production'",
+            ),
+            (
+                "context.environment in system.tags",
+                "context.environment in ['production', 'customer-facing']",
+            ),
+            (
+                "system.risk_tier == 'high' ? context.approved == true : true",
+                "context.approved == true",
+            ),
+            ("context.items.all(system, system > 1)", "context.items.all(system, system > 1)"),
+            (
+                "system.missing > 1 || context.override == true",
+                "system.missing > 1 || context.override == true",
+            ),
+        ],
+    )
+    def test_residualize(self, activation, condition, residual):
+        """Test system-only sub-expressions fold and the rest is kept."""
+        folded = residualize(compile_expression(condition).ast, activation["system"])
+        expected = residualize(compile_expression(residual).ast, activation["system"])
+        assert folded == expected
+
+    def test_constant_rules(self, activation):
+        """Test rules that only read the system become stored outcomes."""
+        policy = _policy(
+            "p",
+            {},
+            [
+                ("static", "system.autonomy_level <= 3", PolicySeverity.ERROR),
+                ("error", "system.missing > 1", PolicySeverity.ERROR),
+                ("dynamic", "context.environment != 'production'", PolicySeverity.ERROR),
+            ],
+        )
+        residuals = SystemResiduals(activation["system"], version=1)
+        static, error, dynamic = residuals.rules(policy)
+        assert (static.program, static.outcome) == (None, (True, None))
+        assert error.program is None and error.outcome[0] is False
+        assert dynamic.program is not None
+        assert residuals.rules(policy) is residuals.rules(policy)
+
+    @pytest.mark.parametrize("mode", list(EvaluationMode))
+    def test_matches_full_evaluation(self, mode):
+        """Test evaluating residuals gives exactly the full decisions."""
+        rng = random.Random(5)
+        conditions = [
+            "system.autonomy_level <= 3",
+            "system.autonomy_level <= 3 && context.environment == 'production'",
+            "context.environment in system.tags || system.status == 'approved'",
+            "system.controls.exists(c, c.id == context.control && c.status == 'verified')",
+            "system.metadata.reviewed == true || context.override == true",
+            "system.risk_tier == 'high' ? size(context.approvers) >= 2 : true",
+            "system.autonomy_level > context.max_autonomy",
+        ]
+        policies = [
+            _policy(
+                f"p{i}",
+                rng.choice([{}, {"risk_tier": ["high"]}]),
+                [
+                    (f"r{i}-{j}", rng.choice(conditions), rng.choice(list(PolicySeverity)))
+                    for j in range(rng.randint(1, 3))
+                ],
+            )
+            for i in range(8)
+        ]
+        snapshot = build_snapshot(policies, version=1)
+
+        for i in range(40):
+            system = {
+                "id": f"s{i}",
+                "type": "agent",
+                "status": rng.choice(["draft", "approved"]),
+                "risk_tier": rng.choice(["high", "minimal"]),
+                "autonomy_level": rng.choice([None, 1, 3, 5]),
+                "tags": rng.sample(["production", "staging"], rng.randint(0, 2)),
+                "metadata": rng.choice([{}, {"reviewed": True}]),
+                "controls": [{"id": "CTRL-1", "status": rng.choice(["verified", "pending"])}],
+            }
+            residuals = SystemResiduals(system, snapshot.version)
+            for _ in range(3):
+                context = rng.choice(
+                    [
+                        {},
+                        {"environment": "production", "control": "CTRL-1", "approvers": []},
+                        {"environment": "staging", "override": True, "max_autonomy": 3},
+                    ]
+                )
+                expected = evaluate(snapshot, system, "deploy", context, mode)
+                actual = evaluate(snapshot, system, "deploy", context, mode, residuals=residuals)
+                assert _decision_summary([actual]) == _decision_summary([expected])
+
+    def test_store(self, activation):
+        """Test stored residuals are reused only while still valid."""
+        now = [0.0]
+        store = ResidualStore(max_size=2, ttl=10.0, clock=lambda: now[0])
+        system = {k: v for k, v in activation["system"].items() if k != "controls"}
+        store.put(SystemResiduals(activation["system"], version=1, relations={"controls"}))
+
+        assert store.get(system, 1, {"controls"}) is not None
+        assert store.get(system, 1, {"controls", "team"}) is None
+        store.put(SystemResiduals(activation["system"], version=1, relations={"controls"}))
+        assert store.get({**system, "autonomy_level": 4}, 1) is None
+        store.put(SystemResiduals(activation["system"], version=1))
+        assert store.get(system, 2) is None
+
+        store.put(SystemResiduals(activation["system"], version=1))
+        store.invalidate_system(system["id"])
+        assert store.get(system, 1) is None
+
+        # Built from data read before the system was invalidated
+        generation = store.generation(system["id"])
+        store.invalidate_system(system["id"])
+        store.put(SystemResiduals(activation["system"], version=1), generation)
+        assert store.get(system, 1) is None
+
+        store.put(SystemResiduals(activation["system"], version=1))
+        now[0] = 10.0
+        assert store.get(system, 1) is None
+        assert len(store) == 0
+
+
+class TestSharedSubexpressions:
+    """Tests for evaluating sub-expressions shared across policies once."""
+
+    def test_shared_subexpressions(self):
+        """Test repeated sub-expressions get memo slots, except where pointless."""
+        bias = "system.controls.exists(c, c.id == 'CTRL-BIAS-001' && c.status == 'verified')"
+        asts = [
+            parse(bias),
+            parse(f"({bias}) && system.autonomy_level <= 3"),
+            parse("system.controls.exists(c, c.status == 'verified')"),
+            parse('system.autonomy_level <= 3 || context.override == "yes"'),
+        ]
+        shared = shared_subexpressions(asts)
+        assert parse(bias) in shared
+        assert parse("system.autonomy_level <= 3") in shared
+        # Reads the comprehension variable, and only inside the shared call
+        assert parse("c.status == 'verified'") not in shared
+        assert parse("c.id == 'CTRL-BIAS-001'") not in shared
+
+    def test_evaluated_once_per_request(self, activation):
+        """Test a check repeated across policies is evaluated once and shared."""
+        reads = []
+
+        class Context(dict):
+            def __getitem__(self, key):
+                reads.append(key)
+                return super().__getitem__(key)
+
+        check = "context.environment == 'production' && system.autonomy_level <= 3"
+        policies = [
+            _policy(
+                f"p{i}",
+                {},
+                [
+                    (f"r{i}", check, PolicySeverity.ERROR),
+                    (f"missing{i}", "context.missing > 1", PolicySeverity.WARNING),
+                ],
+            )
+            for i in range(5)
+        ]
+        snapshot = build_snapshot(policies, version=1)
+        context = Context(environment="production")
+
+        decision = evaluate(snapshot, activation["system"], "deploy", context)
+        assert decision.allowed
+        assert reads == ["environment", "missing"]
+        errors = {r.error for p in decision.policies for r in p.rules if not r.passed}
+        assert errors == {"no such key: 'missing'"}
+
+    def test_cost_limit_not_shared(self, activation):
+        """Test a rule that runs out of budget in a shared check does not fail the next."""
+        shared = "context.items.all(i, i >= 0)"
+        policy = _policy(
+            "p",
+            {},
+            [
+                ("over", f"context.items.exists(i, i < 0) || {shared}", PolicySeverity.ERROR),
+                ("under", shared, PolicySeverity.ERROR),
+            ],
+        )
+        snapshot = build_snapshot([policy], version=1)
+        context = {"items": list(range(300))}
+
+        decision = evaluate(snapshot, activation["system"], "deploy", context, cost_limit=1000)
+        over, under = decision.policies[0].rules
+        assert over.error == "cost limit of 1000 steps exceeded"
+        assert under.passed and under.error is None
+        assert under.cost > 300
+
+    def test_rebuild_reuses_programs(self, activation):
+        """Test rebuilding a snapshot only recompiles rules whose shared checks changed."""
+        check = "system.autonomy_level <= 3"
+        policies = [
+            _policy("a", {}, [("a", f"{check} && context.x == 1", PolicySeverity.ERROR)]),
+            _policy("b", {}, [("b", f"{check} || context.y == 1", PolicySeverity.ERROR)]),
+            _policy("c", {}, [("c", "context.z == 1", PolicySeverity.ERROR)]),
+        ]
+        first = build_snapshot(policies, version=1)
+        programs = [p.rules[0].program for p in first.policies]
+        assert programs[0].memo_slots and programs[1].memo_slots
+
+        edited = _policy("c", {}, [("c", "context.z == 2", PolicySeverity.ERROR)])
+        second = build_snapshot([*first.policies[:2], edited], version=2)
+        assert [p.rules[0].program for p in second.policies[:2]] == programs[:2]
+
+        # b no longer shares its check with anyone, so it stops memoizing it
+        unshared = _policy("a", {}, [("a", "context.x == 1", PolicySeverity.ERROR)])
+        third = build_snapshot([unshared, *second.policies[1:]], version=3)
+        b = third.policies[1].rules[0].program
+        assert b is not programs[1] and not b.memo_slots
+        context = {"x": 1, "y": 0, "z": 2}
+        assert evaluate(third, activation["system"], "deploy", context).allowed
+
+
+class TestCostLimits:
+    """Tests for static cost estimates and runtime cost limits."""
+
+    def test_estimate_cost(self):
+        """Test nested comprehensions over unknown lists dominate the estimate."""
+        flat = estimate_cost(parse("system.autonomy_level <= 3"))
+        single = estimate_cost(parse("context.items.exists(i, i > 1)"))
+        nested = estimate_cost(parse("context.items.exists(i, context.items.exists(j, i == j))"))
+        literal = estimate_cost(parse("[1, 2, 3].exists(i, i > 1)"))
+        assert flat == 4
+        assert literal < single < nested
+        assert nested > ASSUMED_SIZE * ASSUMED_SIZE
+
+    def test_runtime_limit(self, activation):
+        """Test a runaway rule is aborted and fails with its own severity."""
+        runaway = "context.items.exists(i, context.items.exists(j, i + j < 0))"
+        policy = _policy(
+            "p",
+            {},
+            [
+                ("cheap", "system.autonomy_level <= 3", PolicySeverity.ERROR),
+                ("runaway-warning", runaway, PolicySeverity.WARNING),
+                ("runaway-absorbed", f"({runaway}) || true", PolicySeverity.ERROR),
+            ],
+        )
+        snapshot = build_snapshot([policy], version=1)
+        context = {"items": list(range(200))}
+
+        decision = evaluate(snapshot, activation["system"], "deploy", context, cost_limit=1000)
+        cheap, warning, absorbed = decision.policies[0].rules
+        assert (cheap.passed, cheap.error, cheap.cost) == (True, None, 4)
+        assert not warning.passed
+        assert warning.error == "cost limit of 1000 steps exceeded"
+        assert 1000 < warning.cost < 1100
+        # The limit is never absorbed by || or a comprehension
+        assert not absorbed.passed and absorbed.error == warning.error
+        assert decision.warnings == ["runaway-warning"]
+        assert decision.blocking_failures == ["runaway-absorbed"]
+        assert decision.cost == cheap.cost + warning.cost + absorbed.cost
+
+        unlimited = evaluate(snapshot, activation["system"], "deploy", context, cost_limit=0)
+        assert unlimited.allowed
+        assert unlimited.policies[0].rules[1].cost > 200 * 200
+
+    def test_residuals_metered(self, activation):
+        """Test an over-budget rule over the system fails the same way with residuals."""
+        runaway = "system.tags.all(a, system.tags.all(b, a + b != ''))"
+        policy = _policy(
+            "p",
+            {},
+            [
+                ("runaway", runaway, PolicySeverity.ERROR),
+                ("cheap", "system.autonomy_level <= 3", PolicySeverity.ERROR),
+            ],
+        )
+        snapshot = build_snapshot([policy], version=1)
+        system = {**activation["system"], "tags": [f"tag-{i}" for i in range(150)]}
+
+        full = evaluate(snapshot, system, "deploy", {}, cost_limit=1000)
+        residuals = SystemResiduals(system, snapshot.version, cost_limit=1000)
+        residual = evaluate(snapshot, system, "deploy", {}, residuals=residuals, cost_limit=1000)
+        assert not full.allowed
+        assert _decision_summary([residual]) == _decision_summary([full])
+        assert residual.policies[0].rules[0].error == "cost limit of 1000 steps exceeded"
+        assert residuals.rules(policy)[1].program is None  # Still folded
+
+
+class TestDataDocuments:
+    """Tests for data documents read as ``data``."""
+
+    @pytest.fixture
+    def snapshot(self):
+        return build_snapshot(
+            [
+                _policy(
+                    "vendors",
+                    {},
+                    [
+                        (
+                            "approved-vendor",
+                            "system.metadata.vendor in data.approved_vendors",
+                            PolicySeverity.ERROR,
+                        ),
+                        (
+                            "region",
+                            "!(context.region in data.limits.blocked_regions)",
+                            PolicySeverity.ERROR,
+                        ),
+                    ],
+                )
+            ],
+            version=1,
+            data=load_documents(
+                {
+                    "approved_vendors": ["acme", "globex"],
+                    "limits": {"blocked_regions": ["xx"], "max_level": 3},
+                }
+            ),
+        )
+
+    def test_string_lists_are_sets(self):
+        """Test string lists get set membership and stay CEL lists."""
+        loaded = load_document({"vendors": ["acme", "globex"], "mixed": ["a", 1]})
+        assert isinstance(loaded["vendors"], StringSet)
+        assert "acme" in loaded["vendors"] and 1 not in loaded["vendors"]
+        assert not isinstance(loaded["mixed"], StringSet)
+        program = compile_expression('data.v[1] == "b" && size(data.v) == 2 && "a" in data.v')
+        assert program.evaluate({"data": {"v": StringSet(["a", "b"])}}) is True
+
+    def test_rules_read_data(self, snapshot, activation):
+        """Test rules read data documents, with and without residuals."""
+        system = {**activation["system"], "metadata": {"vendor": "acme"}}
+        for residuals in (None, SystemResiduals(system, 1, data=snapshot.data)):
+            allowed = evaluate(snapshot, system, "deploy", {"region": "eu"}, residuals=residuals)
+            blocked = evaluate(snapshot, system, "deploy", {"region": "xx"}, residuals=residuals)
+            assert allowed.allowed is True
+            assert blocked.allowed is False
+
+        other = {**system, "metadata": {"vendor": "initech"}}
+        assert evaluate(snapshot, other, "deploy", {"region": "eu"}).allowed is False
+        # The vendor check folds to a constant against the system
+        [vendor, _] = SystemResiduals(other, 1, data=snapshot.data).rules(snapshot.policies[0])
+        assert vendor.program is None
+
+    def test_snapshot_pickles_data(self, snapshot):
+        """Test data documents survive pickling to evaluation workers."""
+        restored = pickle.loads(pickle.dumps(snapshot))
+        assert isinstance(restored.data["approved_vendors"], StringSet)
+        assert "globex" in restored.data["approved_vendors"]
+
+
+class TestShadowPolicies:
+    """Tests for shadow policies."""
+
+    @pytest.fixture
+    def snapshot(self):
+        return build_snapshot(
+            [
+                _policy(
+                    "enforced", {}, [("level", "system.autonomy_level <= 3", PolicySeverity.ERROR)]
+                ),
+                _policy(
+                    "trial",
+                    {},
+                    [("strict", "system.autonomy_level <= 1", PolicySeverity.ERROR)],
+                    shadow=True,
+                ),
+            ],
+            version=2,
+        )
+
+    def test_shadow_policies_never_decide(self, snapshot, activation):
+        """Test shadow policies are split off and do not affect decisions."""
+        assert [p.id for p in snapshot.policies] == ["enforced"]
+        assert [p.id for p in snapshot.shadow.policies] == ["trial"]
+        assert [p.id for p in snapshot.all_policies] == ["enforced", "trial"]
+        assert pickle.loads(pickle.dumps(snapshot)).shadow.policies[0].id == "trial"
+
+        decision = evaluate(snapshot, activation["system"], "deploy", {})
+        assert decision.allowed is True
+        assert [o.policy.id for o in decision.policies] == ["enforced"]
+
+    async def test_background_evaluation(self, snapshot, activation):
+        """Test queued shadow evaluations are counted and sampled."""
+        shadow = ShadowEvaluator(queue_size=10, sample_rate=1.0, rng=lambda: 0.0)
+        shadow.submit(snapshot, activation["system"], "deploy", {})
+        assert shadow.dropped == 1  # Not running yet
+
+        async with shadow.running(session_factory=None):
+            for level in (1, 3):
+                system = {**activation["system"], "autonomy_level": level}
+                shadow.submit(snapshot, system, "deploy", {})
+            for _ in range(100):
+                if shadow.evaluated == 2:
+                    break
+                await asyncio.sleep(0.01)
+
+        stats = shadow.stats()
+        assert (stats["submitted"], stats["evaluated"]) == (3, 2)
+        [trial] = stats["policies"]
+        assert (trial["policy_id"], trial["passed"], trial["failed"]) == ("trial", 1, 1)
+        assert trial["rule_failures"] == {"strict": 1}
+        assert [s["policies"][0]["passed"] for s in stats["samples"]] == [True, False]
+
+
+class TestDecisionLog:
+    """Tests for the decision log."""
+
+    async def test_flush_rotate_and_read(self, tmp_path):
+        """Test buffered decisions are written to rotating segments and read back."""
+        log = DecisionLog(str(tmp_path), buffer_size=3, segment_bytes=1, max_segments=2)
+        for i in range(4):
+            log.record({"system_id": str(i), "allowed": True})
+        assert log.dropped == 1  # The ring buffer keeps the newest three
+
+        assert await log.flush() == 3
+        log.record({"system_id": "4", "allowed": False})
+        await log.flush()
+        log.record({"system_id": "5", "allowed": False})
+        await log.flush()
+
+        assert len(segment_paths(tmp_path)) == 2  # The oldest segment was deleted
+        assert [r["system_id"] for r in read_segments(tmp_path)] == ["4", "5"]
+        assert [r["system_id"] for r in read_segments(tmp_path, limit=1)] == ["4"]
+
+    async def test_sampling_and_appending(self, tmp_path):
+        """Test unsampled decisions are skipped and flushes append to a segment."""
+        draws = iter([0.1, 0.9, 0.3])
+        log = DecisionLog(str(tmp_path), sample_rate=0.5, rng=lambda: next(draws))
+        for i in range(3):
+            if log.sampled():
+                log.record({"system_id": str(i)})
+            await log.flush()
+
+        assert len(segment_paths(tmp_path)) == 1
+        assert [r["system_id"] for r in read_segments(tmp_path)] == ["0", "2"]
+        assert DecisionLog(None).enabled is False
+        assert DecisionLog(None).sampled() is False
+
+
+class TestPolicyTelemetry:
+    """Tests for policy evaluation telemetry."""
+
+    def test_histogram_buckets(self):
+        """Test latencies land in buckets within an eighth of their value."""
+        for micros in (0, 7, 8, 15, 16, 1000, 123_456, 10**9):
+            low, high = bucket_bounds(bucket_index(micros))
+            assert low <= micros < high
+            assert high - low <= max(1, micros / 8)
+
+        histogram = LatencyHistogram()
+        for micros in range(1, 1001):
+            histogram.record(micros / 1_000_000)
+        assert histogram.percentile(50) == pytest.approx(0.5, rel=1 / 8)
+        assert histogram.percentile(99) == pytest.approx(0.99, rel=1 / 8)
+        assert histogram.percentile(100) <= 1.0
+        assert histogram.cumulative([100, 2000]) == [
+            sum(n for i, n in histogram.counts.items() if bucket_bounds(i)[1] <= 101),
+            1000,
+        ]
+
+    def test_evaluation_counters(self, activation, monkeypatch):
+        """Test evaluations count policy and rule outcomes per policy."""
+        from vorpal.core.engine import evaluator, executor
+
+        recorder = PolicyTelemetry()
+        monkeypatch.setattr(evaluator, "telemetry", recorder)
+        monkeypatch.setattr(executor, "telemetry", recorder)
+        snapshot = build_snapshot(
+            [
+                _policy(
+                    "p",
+                    {},
+                    [
+                        ("level", "system.autonomy_level <= 2", PolicySeverity.ERROR),
+                        ("note", "context.ticket != ''", PolicySeverity.WARNING),
+                    ],
+                )
+            ],
+            version=1,
+        )
+        for level in (1, 2, 3):
+            system = {**activation["system"], "autonomy_level": level}
+            evaluate(snapshot, system, "deploy", {}, EvaluationMode.SUMMARY)
+        system = {**activation["system"], "autonomy_level": 1}
+        jobs = [(system, "deploy", {"ticket": "T-1"}, EvaluationMode.FULL)] * 4
+        evaluate_columnar(snapshot, jobs)
+
+        [counters] = aggregate([json.loads(json.dumps(recorder.drain()))]).values()
+        assert (counters.evaluated, counters.passed, counters.failed) == (7, 6, 1)
+        assert counters.latency.count == 7
+        level, note = counters.rules["level"], counters.rules["note"]
+        assert (level.severity, level.evaluated, level.failed) == ("error", 7, 1)
+        assert (note.evaluated, note.failed, note.errors) == (7, 3, 3)  # No ticket in context
+        assert counters.summary()["rule_failures"] == {"error": 1, "warning": 3}
+        assert recorder.totals() == {}
+
+
+class TestDecisionCache:
+    """Tests for the decision cache."""
+
+    @pytest.fixture
+    def clock(self):
+        now = [0.0]
+        return now
+
+    @pytest.fixture
+    def cache(self, clock):
+        return DecisionCache(max_size=2, ttl=10.0, clock=lambda: clock[0])
+
+    def test_hit_and_miss(self, cache, activation):
+        """Test identical requests hit and different contexts miss."""
+        system = activation["system"]
+        key = cache.key(system, "deploy", {"env": "prod"}, 1)
+        assert cache.get(key) is None
+        cache.put(key, "decision")
+        assert cache.get(cache.key(system, "deploy", {"env": "prod"}, 1)) == "decision"
+        assert cache.get(cache.key(system, "deploy", {"env": "dev"}, 1)) is None
+        assert (cache.hits, cache.misses) == (1, 2)
+
+    def test_system_fields_in_key(self, cache, activation):
+        """Test a changed system field produces a different key."""
+        system = activation["system"]
+        key = cache.key(system, "deploy", {}, 1)
+        assert cache.key({**system, "autonomy_level": 4}, "deploy", {}, 1) != key
+        assert cache.key(system, "deploy", {}, 1, "summary") != key
+
+    def test_ttl_expiry(self, cache, clock, activation):
+        """Test entries expire after the TTL."""
+        key = cache.key(activation["system"], "deploy", {}, 1)
+        cache.put(key, "decision")
+        clock[0] = 10.0
+        assert cache.get(key) is None
+        assert len(cache) == 0
+
+    def test_lru_eviction(self, cache, activation):
+        """Test the least recently used entry is evicted."""
+        system = activation["system"]
+        keys = [cache.key(system, action, {}, 1) for action in ("a", "b", "c")]
+        cache.put(keys[0], 0)
+        cache.put(keys[1], 1)
+        cache.get(keys[0])
+        cache.put(keys[2], 2)
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[0]) == 0
+        assert cache.evictions == 1
+
+    def test_invalidation(self, cache, activation):
+        """Test system invalidation and policy-set version changes."""
+        system = activation["system"]
+        key = cache.key(system, "deploy", {}, 1)
+        cache.put(key, "decision")
+        cache.invalidate_system(system["id"])
+        assert cache.get(cache.key(system, "deploy", {}, 1)) is None
+
+        key = cache.key(system, "deploy", {}, 1)
+        cache.put(key, "decision")
+        cache.get(cache.key(system, "deploy", {}, 2))
+        assert len(cache) == 0
+
+    def test_last_known_decisions(self, clock):
+        """Test last known decisions are returned with their age until too old."""
+        known = LastKnownDecisions(max_size=2, clock=lambda: clock[0])
+        known.put("sys-1", "deploy", "allowed")
+        clock[0] = 5.0
+        assert known.get("sys-1", "deploy", max_age=10.0) == ("allowed", 5.0)
+        assert known.get("sys-1", "deploy", max_age=1.0) is None
+        assert known.get("sys-1", "retire", max_age=10.0) is None
+
+        known.put("sys-2", "deploy", "denied")
+        known.put("sys-3", "deploy", "denied")
+        assert known.get("sys-1", "deploy", max_age=10.0) is None
+        assert len(known) == 2
+
+
+def _audit_chain(chain_id: str, length: int) -> list[ChainEvent]:
+    """A valid audit chain of ``length`` events."""
+    events: list[ChainEvent] = []
+    for sequence in range(1, length + 1):
+        event = ChainEvent(
+            id=f"{chain_id}-{sequence}",
+            chain_id=chain_id,
+            sequence=sequence,
+            event_type="system.updated",
+            action="update",
+            actor_id="user-1",
+            resource_type=None,
+            resource_id=None,
+            details={"n": sequence},
+            timestamp=datetime(2026, 1, 1, tzinfo=UTC) + timedelta(seconds=sequence),
+            previous_hash=events[-1].event_hash if events else None,
+            event_hash="",
+        )
+        events.append(event._replace(event_hash=event_hash(event)))
+    return events
+
+
+class TestAuditVerification:
+    """Tests for streaming audit chain verification."""
+
+    def test_chains_verified_in_chunks(self):
+        """Test chains fed a chunk at a time verify, and breaks are found."""
+        events = _audit_chain("a", 5) + _audit_chain("b", 3)
+        verifier = ChainVerifier()
+        for start in range(0, len(events), 3):
+            verifier.feed(events[start : start + 3])
+        assert verifier.result()["verified"]
+        assert verifier.result()["last_event_id"] == "b-3"
+
+        tampered = list(events)
+        tampered[1] = tampered[1]._replace(details={"n": 99})
+        del tampered[6]  # A gap in chain b
+        verifier = ChainVerifier()
+        verifier.feed(tampered)
+        result = verifier.result()
+        assert (result["valid_events"], result["invalid_events"]) == (5, 2)
+        assert result["first_invalid_event_id"] == "a-2"
+
+        verifier = ChainVerifier()
+        verifier.feed(events[2:5])  # A chain that does not start at 1
+        assert verifier.invalid_events == 1
+        verifier = ChainVerifier(mid_chain=True)
+        verifier.feed(events[2:5])
+        assert verifier.verified
+
+    def test_resume_after_event(self):
+        """Test a resumed verification checks the link to the event it resumes after."""
+        events = _audit_chain("a", 4)
+        verifier = ChainVerifier(previous=events[1])
+        verifier.feed(events[2:])
+        assert verifier.verified and verifier.total_events == 2
+
+        verifier = ChainVerifier(previous=events[0])
+        verifier.feed(events[2:])
+        assert verifier.first_invalid_event_id == "a-3"
+
+    async def test_pool_matches_inline(self):
+        """Test chunks checked on worker processes stitch into the inline result."""
+        events = _audit_chain("a", 10) + _audit_chain("b", 7)
+        del events[4]  # A gap at the start of the second chunk
+        events[11] = events[11]._replace(action="delete")
+
+        async def chunks():
+            for start in range(0, len(events), 4):
+                yield events[start : start + 4]
+
+        results = []
+        for workers in (0, 2):
+            executor = VerificationExecutor(workers=workers, chunk_size=4)
+            try:
+                verifier = ChainVerifier()
+                progress = [v.total_events async for v in executor.verify(chunks(), verifier)]
+            finally:
+                executor.shutdown()
+            assert progress == [4, 8, 12, 16]
+            results.append(verifier.result())
+        assert results[0] == results[1]
+        assert (results[0]["valid_events"], results[0]["invalid_events"]) == (14, 2)
+        assert results[0]["first_invalid_event_id"] == "a-6"
@@ -3,10 +3,16 @@
 from vorpal.client import VorpalClient
 from vorpal.types import (
     AISystem,
+    BatchEvaluationItem,
     Control,
+    DataDocument,
+    EffectivePolicy,
+    EvaluationMode,
     Policy,
     PolicyEvaluationResult,
     RiskTier,
+    ScanResult,
+    ScanSummary,
     SystemStatus,
     SystemType,
 )
@@ -16,10 +22,16 @@ __version__ = "0.1.0"
 __all__ = [
     "VorpalClient",
     "AISystem",
+    "BatchEvaluationItem",
     "Control",
+    "DataDocument",
+    "EffectivePolicy",
+    "EvaluationMode",
     "Policy",
     "PolicyEvaluationResult",
     "RiskTier",
+    "ScanResult",
+    "ScanSummary",
     "SystemStatus",
     "SystemType",
 ]
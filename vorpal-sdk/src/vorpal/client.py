@@ -1,17 +1,28 @@
 """Vorpal SDK client for interacting with Vorpal Core API."""
 
+from __future__ import annotations
+
+import builtins
+import json
+from collections.abc import Iterator, Sequence
 from typing import Any
 
 import httpx
 
 from vorpal.types import (
     AISystem,
+    BatchEvaluationItem,
     Control,
+    DataDocument,
+    EffectivePolicy,
+    EvaluationMode,
     PaginatedResponse,
     PaginationMeta,
     Policy,
     PolicyEvaluationResult,
     RiskTier,
+    ScanResult,
+    ScanSummary,
     SystemStatus,
     SystemType,
 )
@@ -41,7 +52,7 @@ class VorpalConflictError(VorpalError):
 class SystemsAPI:
     """API for managing AI systems."""
 
-    def __init__(self, client: "VorpalClient"):
+    def __init__(self, client: VorpalClient):
         self._client = client
 
     def list(
@@ -155,11 +166,27 @@ class SystemsAPI:
         """Archive (soft delete) an AI system."""
         self._client._request("DELETE", f"/api/v1/systems/{system_id}")
 
+    def policies(
+        self, system_id: str, action: str | None = None
+    ) -> dict[str, builtins.list[EffectivePolicy]]:
+        """List the policies that govern a system, by action.
+
+        Key ``"*"`` holds the policies that apply to every action.
+        """
+        params = {"action": action} if action else None
+        response = self._client._request(
+            "GET", f"/api/v1/systems/{system_id}/policies", params=params
+        )
+        return {
+            name: [EffectivePolicy.model_validate(p) for p in policies]
+            for name, policies in response["actions"].items()
+        }
+
 
 class ControlsAPI:
     """API for managing governance controls."""
 
-    def __init__(self, client: "VorpalClient"):
+    def __init__(self, client: VorpalClient):
         self._client = client
 
     def list(
@@ -217,10 +244,53 @@ class ControlsAPI:
         return Control.model_validate(response)
 
 
+class DataAPI:
+    """API for managing data documents read by policy rules."""
+
+    def __init__(self, client: VorpalClient):
+        self._client = client
+
+    def list(
+        self,
+        page: int = 1,
+        page_size: int = 50,
+    ) -> tuple[list[DataDocument], PaginationMeta]:
+        """List data documents, without their content."""
+        params: dict[str, Any] = {"page": page, "page_size": page_size}
+        response = self._client._request("GET", "/api/v1/data", params=params)
+        documents = [DataDocument.model_validate(d) for d in response["data"]]
+        meta = PaginationMeta.model_validate(response["meta"])
+        return documents, meta
+
+    def get(self, name: str) -> DataDocument:
+        """Get a data document, with its content."""
+        response = self._client._request("GET", f"/api/v1/data/{name}")
+        return DataDocument.model_validate(response)
+
+    def put(self, name: str, content: Any, description: str | None = None) -> DataDocument:
+        """Create or replace a data document.
+
+        Args:
+            name: Document name; rules read it as ``data.<name>``.
+            content: Any JSON value.
+            description: Optional description.
+        """
+        payload: dict[str, Any] = {"content": content}
+        if description:
+            payload["description"] = description
+
+        response = self._client._request("PUT", f"/api/v1/data/{name}", json=payload)
+        return DataDocument.model_validate(response)
+
+    def delete(self, name: str) -> None:
+        """Delete a data document."""
+        self._client._request("DELETE", f"/api/v1/data/{name}")
+
+
 class PoliciesAPI:
     """API for managing governance policies."""
 
-    def __init__(self, client: "VorpalClient"):
+    def __init__(self, client: VorpalClient):
         self._client = client
 
     def list(
@@ -252,16 +322,121 @@ class PoliciesAPI:
         system_id: str,
         action: str,
         context: dict[str, Any] | None = None,
+        mode: EvaluationMode = EvaluationMode.FULL,
+        timeout_ms: int | None = None,
     ) -> PolicyEvaluationResult:
-        """Evaluate policies for a system action."""
-        payload = {
+        """Evaluate policies for a system action.
+
+        Args:
+            system_id: System to evaluate.
+            action: Action being performed.
+            context: Additional context for rules.
+            mode: ``SUMMARY`` omits per-rule results; ``FAIL_FAST`` also
+                stops at the first blocking failure.
+            timeout_ms: Deadline for the decision. If it is missed, the
+                result is ``degraded``: the last known decision, or a
+                denial if there is none.
+        """
+        payload: dict[str, Any] = {
             "system_id": system_id,
             "action": action,
             "context": context or {},
+            "mode": mode.value,
         }
+        if timeout_ms is not None:
+            payload["timeout_ms"] = timeout_ms
         response = self._client._request("POST", "/api/v1/policies/evaluate", json=payload)
         return PolicyEvaluationResult.model_validate(response)
 
+    def evaluate_document(
+        self,
+        system: dict[str, Any],
+        action: str,
+        context: dict[str, Any] | None = None,
+        mode: EvaluationMode = EvaluationMode.FULL,
+    ) -> PolicyEvaluationResult:
+        """Evaluate policies for a system that is not registered.
+
+        Args:
+            system: System document with the fields of ``systems.create``,
+                plus ``controls`` as ``{"id": ..., "status": ...}`` dicts.
+            action: Action being performed.
+            context: Additional context for rules.
+            mode: Evaluation mode (see ``evaluate``).
+        """
+        payload = {
+            "system": system,
+            "action": action,
+            "context": context or {},
+            "mode": mode.value,
+        }
+        response = self._client._request("POST", "/api/v1/policies/evaluate", json=payload)
+        return PolicyEvaluationResult.model_validate(response)
+
+    def evaluate_many(
+        self,
+        items: Sequence[
+            tuple[str | dict[str, Any], str]
+            | tuple[str | dict[str, Any], str, dict[str, Any] | None]
+        ],
+        mode: EvaluationMode = EvaluationMode.FULL,
+    ) -> builtins.list[BatchEvaluationItem]:
+        """Evaluate policies for many system actions in one request.
+
+        Args:
+            items: ``(system, action)`` or ``(system, action, context)``
+                tuples, where ``system`` is a system ID or a document as
+                accepted by ``evaluate_document``.
+            mode: Evaluation mode applied to every item (see ``evaluate``).
+
+        Returns:
+            One result per item, in the same order. Items whose system
+            does not exist have ``error`` set instead of ``result``.
+        """
+        payload = {
+            "items": [
+                {
+                    ("system" if isinstance(item[0], dict) else "system_id"): item[0],
+                    "action": item[1],
+                    "context": (item[2] if len(item) > 2 else None) or {},
+                    "mode": mode.value,
+                }
+                for item in items
+            ]
+        }
+        response = self._client._request("POST", "/api/v1/policies/evaluate/batch", json=payload)
+        return [BatchEvaluationItem.model_validate(r) for r in response["results"]]
+
+    def scan(
+        self,
+        action: str,
+        status: SystemStatus | None = None,
+        risk_tier: RiskTier | None = None,
+        team_id: str | None = None,
+        tag: str | None = None,
+        mode: EvaluationMode = EvaluationMode.SUMMARY,
+    ) -> Iterator[ScanResult | ScanSummary]:
+        """Evaluate an action against every matching system.
+
+        Results are yielded as the server streams them, one per system,
+        followed by a final ``ScanSummary``.
+        """
+        params: dict[str, Any] = {"action": action, "mode": mode.value}
+        if status:
+            params["status"] = status.value
+        if risk_tier:
+            params["risk_tier"] = risk_tier.value
+        if team_id:
+            params["team_id"] = team_id
+        if tag:
+            params["tag"] = tag
+
+        for line in self._client._stream_lines("GET", "/api/v1/policies/scan", params=params):
+            if line.get("type") == "summary":
+                yield ScanSummary.model_validate(line)
+            else:
+                yield ScanResult.model_validate(line)
+
 
 class VorpalClient:
     """Client for interacting with Vorpal Core API."""
@@ -293,6 +468,7 @@ class VorpalClient:
         self.systems = SystemsAPI(self)
         self.controls = ControlsAPI(self)
         self.policies = PoliciesAPI(self)
+        self.data = DataAPI(self)
 
     def _get_headers(self) -> dict[str, str]:
         """Get default headers for requests."""
@@ -324,23 +500,45 @@ class VorpalClient:
             return response.json()
 
         except httpx.HTTPStatusError as e:
-            if e.response.status_code == 404:
-                raise VorpalNotFoundError(
-                    f"Resource not found: {path}",
-                    code="not_found",
-                ) from e
-            elif e.response.status_code == 409:
-                raise VorpalConflictError(
-                    "Resource conflict",
-                    code="conflict",
-                ) from e
-            else:
-                error_data = e.response.json() if e.response.content else {}
-                raise VorpalError(
-                    error_data.get("message", str(e)),
-                    code=error_data.get("code"),
-                    details=error_data.get("details"),
-                ) from e
+            raise self._error(e, path) from e
+
+    def _stream_lines(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any] | None = None,
+    ) -> Iterator[Any]:
+        """Make a request with an NDJSON response, yielding each line as it arrives."""
+        with self._client.stream(method, path, params=params) as response:
+            try:
+                response.raise_for_status()
+            except httpx.HTTPStatusError as e:
+                response.read()
+                raise self._error(e, path) from e
+
+            for line in response.iter_lines():
+                if line:
+                    yield json.loads(line)
+
+    def _error(self, e: httpx.HTTPStatusError, path: str) -> VorpalError:
+        """Map an HTTP error response to an SDK exception."""
+        if e.response.status_code == 404:
+            return VorpalNotFoundError(
+                f"Resource not found: {path}",
+                code="not_found",
+            )
+        elif e.response.status_code == 409:
+            return VorpalConflictError(
+                "Resource conflict",
+                code="conflict",
+            )
+        else:
+            error_data = e.response.json() if e.response.content else {}
+            return VorpalError(
+                error_data.get("message", str(e)),
+                code=error_data.get("code"),
+                details=error_data.get("details"),
+            )
 
     def health(self) -> dict[str, str]:
         """Check API health."""
@@ -354,7 +552,7 @@ class VorpalClient:
         """Close the client connection."""
         self._client.close()
 
-    def __enter__(self) -> "VorpalClient":
+    def __enter__(self) -> VorpalClient:
         return self
 
     def __exit__(self, *args: Any) -> None:
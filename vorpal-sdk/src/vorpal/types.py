@@ -1,7 +1,7 @@
 """Type definitions for Vorpal SDK."""
 
 from datetime import datetime
-from enum import Enum
+from enum import Enum, StrEnum
 from typing import Any
 
 from pydantic import BaseModel, ConfigDict, Field
@@ -67,6 +67,14 @@ class PolicySeverity(str, Enum):
     INFO = "info"
 
 
+class EvaluationMode(StrEnum):
+    """How much detail a policy evaluation returns."""
+
+    FULL = "full"
+    SUMMARY = "summary"
+    FAIL_FAST = "fail_fast"
+
+
 class BaseType(BaseModel):
     """Base type with common configuration."""
 
@@ -124,6 +132,17 @@ class SystemControl(BaseType):
     updated_at: datetime
 
 
+class DataDocument(BaseType):
+    """Reference data document read by rules as ``data.<name>``."""
+
+    name: str
+    description: str | None = None
+    version: int
+    content: Any = None  # Not included when listing
+    created_at: datetime
+    updated_at: datetime
+
+
 class PolicyRule(BaseType):
     """Policy rule definition."""
 
@@ -141,6 +160,7 @@ class Policy(BaseType):
     description: str | None = None
     version: str
     enabled: bool
+    shadow: bool = False
     match_criteria: dict[str, Any]
     rules: list[PolicyRule]
     default_severity: PolicySeverity
@@ -151,6 +171,17 @@ class Policy(BaseType):
     updated_at: datetime
 
 
+class EffectivePolicy(BaseType):
+    """A policy whose match criteria apply to a system."""
+
+    id: str
+    name: str
+    version: str
+    shadow: bool = False
+    default_severity: PolicySeverity
+    rule_count: int
+
+
 class RuleResult(BaseType):
     """Result of evaluating a single rule."""
 
@@ -158,6 +189,8 @@ class RuleResult(BaseType):
     passed: bool
     message: str | None = None
     severity: PolicySeverity
+    error: str | None = None
+    cost: int = 0
 
 
 class PolicyResult(BaseType):
@@ -173,14 +206,45 @@ class PolicyEvaluationResult(BaseType):
     """Result of policy evaluation."""
 
     allowed: bool
-    system_id: str
+    system_id: str | None  # None for an unregistered system without an ID
     action: str
     policies_evaluated: int
     policies_passed: int
     policies_failed: int
-    results: list[PolicyResult]
+    results: list[PolicyResult] = Field(default_factory=list)
     blocking_failures: list[str]
     warnings: list[str]
+    mode: EvaluationMode = EvaluationMode.FULL
+    cached: bool = False
+    cost: int = 0
+    degraded: bool = False
+    decision_age_ms: float | None = None
+
+
+class ScanResult(PolicyEvaluationResult):
+    """One system's result from a fleet scan."""
+
+    system_name: str
+
+
+class ScanSummary(BaseType):
+    """Totals reported at the end of a fleet scan."""
+
+    action: str
+    scanned: int
+    allowed: int
+    denied: int
+    duration_ms: float
+
+
+class BatchEvaluationItem(BaseType):
+    """Result for one item of a batch policy evaluation."""
+
+    index: int
+    system_id: str | None
+    action: str
+    result: PolicyEvaluationResult | None = None
+    error: str | None = None
 
 
 class PaginationMeta(BaseType):
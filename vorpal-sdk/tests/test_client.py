@@ -1,11 +1,20 @@
 """Tests for vorpal-sdk client."""
 
+import json
+
 import pytest
 import respx
 from httpx import Response
 
 from vorpal import VorpalClient
-from vorpal.types import RiskTier, SystemStatus, SystemType
+from vorpal.types import (
+    EvaluationMode,
+    RiskTier,
+    ScanResult,
+    ScanSummary,
+    SystemStatus,
+    SystemType,
+)
 
 
 @pytest.fixture
@@ -125,6 +134,36 @@ class TestSystemsAPI:
         assert system.name == "New System"
         assert system.risk_tier == RiskTier.HIGH
 
+    @respx.mock
+    def test_system_policies(self, client):
+        """Test listing the policies that govern a system."""
+        route = respx.get("http://test-api/api/v1/systems/sys-1/policies").mock(
+            return_value=Response(
+                200,
+                json={
+                    "system_id": "sys-1",
+                    "policy_set_version": 7,
+                    "actions": {
+                        "deploy": [
+                            {
+                                "id": "pol-1",
+                                "name": "High-Risk Deployment",
+                                "version": "1.0.0",
+                                "shadow": False,
+                                "default_severity": "error",
+                                "rule_count": 2,
+                            }
+                        ]
+                    },
+                },
+            )
+        )
+
+        policies = client.systems.policies("sys-1", action="deploy")
+        assert route.calls.last.request.url.params["action"] == "deploy"
+        assert [p.id for p in policies["deploy"]] == ["pol-1"]
+        assert policies["deploy"][0].rule_count == 2
+
 
 class TestPoliciesAPI:
     """Tests for Policies API."""
@@ -156,3 +195,147 @@ class TestPoliciesAPI:
         assert result.allowed is True
         assert result.policies_evaluated == 2
         assert result.policies_failed == 0
+
+    @respx.mock
+    def test_evaluate_document(self, client):
+        """Test evaluating an unregistered system sends the document inline."""
+        route = respx.post("http://test-api/api/v1/policies/evaluate").mock(
+            return_value=Response(
+                200,
+                json={
+                    "allowed": False,
+                    "system_id": None,
+                    "action": "deploy",
+                    "policies_evaluated": 1,
+                    "policies_passed": 0,
+                    "policies_failed": 1,
+                    "blocking_failures": ["Needs bias testing"],
+                    "warnings": [],
+                },
+            )
+        )
+
+        system = {"name": "candidate", "type": "agent", "risk_tier": "high"}
+        result = client.policies.evaluate_document(system, "deploy")
+
+        sent = json.loads(route.calls.last.request.content)
+        assert sent["system"] == system
+        assert "system_id" not in sent
+        assert result.allowed is False
+        assert result.system_id is None
+
+    @respx.mock
+    def test_put_data_document(self, client):
+        """Test replacing a data document sends its content."""
+        route = respx.put("http://test-api/api/v1/data/approved_vendors").mock(
+            return_value=Response(
+                200,
+                json={
+                    "name": "approved_vendors",
+                    "description": None,
+                    "version": 2,
+                    "content": ["acme", "globex"],
+                    "created_at": "2024-01-01T00:00:00Z",
+                    "updated_at": "2024-01-02T00:00:00Z",
+                },
+            )
+        )
+
+        document = client.data.put("approved_vendors", ["acme", "globex"])
+
+        assert json.loads(route.calls.last.request.content) == {"content": ["acme", "globex"]}
+        assert document.version == 2
+        assert document.content == ["acme", "globex"]
+
+    @respx.mock
+    def test_evaluate_many(self, client):
+        """Test batch policy evaluation keeps request order and per-item errors."""
+        route = respx.post("http://test-api/api/v1/policies/evaluate/batch").mock(
+            return_value=Response(
+                200,
+                json={
+                    "results": [
+                        {
+                            "index": 0,
+                            "system_id": "sys-1",
+                            "action": "deploy",
+                            "result": {
+                                "allowed": False,
+                                "system_id": "sys-1",
+                                "action": "deploy",
+                                "policies_evaluated": 1,
+                                "policies_passed": 0,
+                                "policies_failed": 1,
+                                "results": [],
+                                "blocking_failures": ["Needs bias testing"],
+                                "warnings": [],
+                            },
+                            "error": None,
+                        },
+                        {
+                            "index": 1,
+                            "system_id": "missing",
+                            "action": "deploy",
+                            "result": None,
+                            "error": "System missing not found",
+                        },
+                    ],
+                    "evaluated": 1,
+                    "errors": 1,
+                },
+            )
+        )
+
+        results = client.policies.evaluate_many(
+            [("sys-1", "deploy", {"env": "prod"}), ("missing", "deploy")],
+            mode=EvaluationMode.SUMMARY,
+        )
+
+        sent = json.loads(route.calls.last.request.content)
+        assert sent["items"][0]["mode"] == "summary"
+        assert sent["items"][0]["context"] == {"env": "prod"}
+        assert sent["items"][1]["context"] == {}
+        assert [r.system_id for r in results] == ["sys-1", "missing"]
+        assert results[0].result.allowed is False
+        assert results[1].result is None
+        assert results[1].error == "System missing not found"
+
+    @respx.mock
+    def test_scan(self, client):
+        """Test a fleet scan yields streamed results then the summary."""
+        result = {
+            "type": "result",
+            "allowed": True,
+            "system_id": "sys-1",
+            "system_name": "assistant",
+            "action": "deploy",
+            "policies_evaluated": 1,
+            "policies_passed": 1,
+            "policies_failed": 0,
+            "blocking_failures": [],
+            "warnings": [],
+            "mode": "summary",
+        }
+        summary = {
+            "type": "summary",
+            "action": "deploy",
+            "scanned": 1,
+            "allowed": 1,
+            "denied": 0,
+            "duration_ms": 1.5,
+        }
+        route = respx.get("http://test-api/api/v1/policies/scan").mock(
+            return_value=Response(
+                200,
+                text="\n".join(json.dumps(line) for line in (result, summary)) + "\n",
+                headers={"content-type": "application/x-ndjson"},
+            )
+        )
+
+        items = list(client.policies.scan("deploy", risk_tier=RiskTier.HIGH))
+
+        assert route.calls.last.request.url.params["risk_tier"] == "high"
+        assert isinstance(items[0], ScanResult)
+        assert items[0].system_name == "assistant"
+        assert isinstance(items[1], ScanSummary)
+        assert items[1].scanned == 1